@@ -0,0 +1,284 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dotenv import load_dotenv
+
+from bm25 import BM25Index, TITLES_CSV
+from claim_cache import SemanticClaimCache
+from claim_extraction import make_claim_extractor
+from fact_checker import FactChecker
+from llm_scheduler import LLMScheduler
+from metrics import Metrics
+import registry
+from retrieval import DOCS_FILE, NUMPY_INDEX_PATH, open_backend
+
+load_dotenv()
+
+CHROMA_PATH = "app/chroma_db"
+COLLECTION_NAME = "pib_titles"
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+
+
+class Overloaded(Exception):
+    pass
+
+
+class CorpusWatcher:
+    """
+    Reloads the checker when scrape_chroma.py (cron, another process) has
+    changed the corpus on disk. Every ingest that changes anything rewrites
+    data/pib_titles.csv and then the numpy index's docs.json, so their
+    mtime/size is the signature; it is re-read at most once per interval
+    seconds. A change reloads the backend (which clears the claim cache and
+    bumps corpus_version) and adds the new titles to the BM25 index.
+    """
+
+    def __init__(self, checker, paths=(TITLES_CSV, os.path.join(NUMPY_INDEX_PATH, DOCS_FILE)), interval=5.0):
+        self.checker = checker
+        self.paths = paths
+        self.interval = interval
+        self._signature = self._read_signature()
+        self._checked_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def _read_signature(self):
+        signature = []
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def check(self):
+        """Reload if the corpus files changed since the last check; returns True when it reloaded"""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked_at < self.interval:
+                return False
+            self._checked_at = now
+            signature = self._read_signature()
+            if signature == self._signature:
+                return False
+            self._signature = signature
+            self.checker.reload()
+            if self.checker.lexical_index is not None:
+                self.checker.lexical_index.update_from_csv()
+            self.reloads += 1
+            print(f"Corpus changed on disk; reloaded (corpus version {self.checker.corpus_version})")
+            return True
+
+    def stats(self):
+        return {"version": self.checker.corpus_version, "reloads": self.reloads}
+
+
+class VerificationService:
+    """
+    Runs verify_claim on one shared FactChecker. Identical in-flight requests
+    share a single computation, and at most max_concurrent + max_queue distinct
+    requests are admitted at once; the rest are rejected with Overloaded.
+    A CorpusWatcher passed in is checked before each request.
+    """
+
+    def __init__(self, checker, max_concurrent=4, max_queue=16, corpus_watcher=None):
+        self.checker = checker
+        self.corpus_watcher = corpus_watcher
+        self.capacity = max_concurrent + max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+        self.rejected = 0
+
+    def submit(self, text, confidence_threshold=0.5, include_timings=False):
+        if self.corpus_watcher is not None:
+            self.corpus_watcher.check()
+        key = (text, confidence_threshold, include_timings)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            if len(self._inflight) >= self.capacity:
+                self.rejected += 1
+                raise Overloaded()
+            future = self._executor.submit(self.checker.verify_claim, text, confidence_threshold, include_timings)
+            self._inflight[key] = future
+        future.add_done_callback(lambda _: self._release(key))
+        return future
+
+    def _release(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            inflight = len(self._inflight)
+        return {
+            "inflight": inflight,
+            "capacity": self.capacity,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected
+        }
+
+
+def make_handler(service, request_timeout=120):
+    class VerifyHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                embedder = service.checker.embedder
+                claim_cache = service.checker.claim_cache
+                self._send_json(200, {
+                    "status": "ok",
+                    **service.stats(),
+                    "llm": service.checker.scheduler.stats(),
+                    **({"embedding": embedder.stats()} if hasattr(embedder, "stats") else {}),
+                    **({"claim_cache": claim_cache.stats()} if claim_cache is not None else {}),
+                    "claim_extraction": service.checker.claim_extractor.stats(),
+                    **({"corpus": service.corpus_watcher.stats()} if service.corpus_watcher is not None else {})
+                })
+            elif self.path == "/metrics":
+                body = service.checker.metrics.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self._send_json(404, {"error": "Not found"})
+
+        def do_POST(self):
+            if self.path != "/verify":
+                self._send_json(404, {"error": "Not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                text = payload["text"]
+                confidence_threshold = float(payload.get("confidence_threshold", 0.5))
+                include_timings = bool(payload.get("include_timings", False))
+            except (ValueError, KeyError, TypeError):
+                self._send_json(400, {"error": "Expected JSON body with a 'text' field"})
+                return
+            if not isinstance(text, str) or not text.strip():
+                self._send_json(400, {"error": "Please enter a claim to verify"})
+                return
+
+            try:
+                future = service.submit(text, confidence_threshold, include_timings)
+            except Overloaded:
+                self._send_json(503, {"error": "Server overloaded, retry later"}, {"Retry-After": "1"})
+                return
+            try:
+                result = future.result(timeout=request_timeout)
+            except Exception as e:
+                self._send_json(500, {"error": f"Verification failed: {str(e)}"})
+                return
+            service.checker.metrics.maybe_export_csv()
+            self._send_json(200, result)
+
+    return VerifyHandler
+
+
+def build_checker(llm_base_url=GROQ_BASE_URL, api_key=None, max_workers=4, metrics_enabled=False,
+                  batch_entities=False, hybrid=True, backend="chroma", embed_batch_size=32, embed_batch_window=0.005,
+                  llm_rpm=None, llm_tpm=None, llm_hedge_after=None, claim_cache_threshold=0.95,
+                  claim_extractor="sentences"):
+    metrics = Metrics(enabled=metrics_enabled)
+    llm_client = registry.get_llm_client(llm_base_url, api_key)
+    return FactChecker(
+        chroma_path=CHROMA_PATH,
+        collection_name=COLLECTION_NAME,
+        groq_client=llm_client,
+        scheduler=LLMScheduler(llm_client, requests_per_minute=llm_rpm, tokens_per_minute=llm_tpm,
+                               hedge_after=llm_hedge_after, metrics=metrics),
+        max_workers=max_workers,
+        metrics=metrics,
+        batch_entities=batch_entities,
+        lexical_index=BM25Index.from_csv() if hybrid else None,
+        backend=open_backend(backend, CHROMA_PATH, COLLECTION_NAME),
+        embedder=registry.get_embedding_service(max_batch=embed_batch_size, max_wait=embed_batch_window),
+        claim_cache=SemanticClaimCache(threshold=claim_cache_threshold) if claim_cache_threshold else None,
+        claim_extractor=make_claim_extractor(claim_extractor)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON HTTP API for the fact checker")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--llm-base-url", default=os.getenv("GROQ_BASE_URL", GROQ_BASE_URL),
+                        help="OpenAI-compatible endpoint, e.g. a local stub_llm.py")
+    parser.add_argument("--max-concurrent", type=int, default=4, help="verify_claim calls run at once")
+    parser.add_argument("--max-queue", type=int, default=16, help="Admitted requests waiting for a slot")
+    parser.add_argument("--workers", type=int, default=4, help="LLM calls per request")
+    parser.add_argument("--metrics", action="store_true", default=os.getenv("FACTCHECK_METRICS") == "1",
+                        help="Record stage histograms (GET /metrics, data/metrics_log.csv)")
+    parser.add_argument("--batch-entities", action="store_true",
+                        default=os.getenv("FACTCHECK_BATCH_ENTITIES") == "1",
+                        help="Verify all entities of a request in one LLM call")
+    parser.add_argument("--no-hybrid", action="store_true", default=os.getenv("FACTCHECK_HYBRID") == "0",
+                        help="Vector-only retrieval (skip the BM25 index over data/pib_titles.csv)")
+    parser.add_argument("--backend", choices=["chroma", "numpy", "int8"], default=os.getenv("FACTCHECK_BACKEND", "chroma"),
+                        help="Vector search backend (numpy = exact search over data/vector_index, "
+                             "int8 = quantized scan + float32 rescoring)")
+    parser.add_argument("--embed-batch-size", type=int, default=int(os.getenv("FACTCHECK_EMBED_BATCH_SIZE", "32")),
+                        help="Query texts encoded together across concurrent requests")
+    parser.add_argument("--embed-batch-window-ms", type=float,
+                        default=float(os.getenv("FACTCHECK_EMBED_BATCH_WINDOW_MS", "5")),
+                        help="Longest a query embedding waits for other requests to batch with (0 = no wait)")
+    parser.add_argument("--llm-rpm", type=int, default=int(os.getenv("FACTCHECK_LLM_RPM", "30")),
+                        help="LLM requests per minute to stay within (0 = no limit)")
+    parser.add_argument("--llm-tpm", type=int, default=int(os.getenv("FACTCHECK_LLM_TPM", "6000")),
+                        help="LLM tokens per minute to stay within (0 = no limit)")
+    parser.add_argument("--llm-hedge-ms", type=float, default=float(os.getenv("FACTCHECK_LLM_HEDGE_MS", "0")),
+                        help="Send a duplicate of an LLM call still unanswered after this long (0 = off)")
+    parser.add_argument("--claim-cache-threshold", type=float,
+                        default=float(os.getenv("FACTCHECK_CLAIM_CACHE_THRESHOLD", "0.95")),
+                        help="Cosine similarity at which a reworded claim reuses a cached verdict (0 = off)")
+    parser.add_argument("--claim-extractor", choices=["sentences", "t5"],
+                        default=os.getenv("FACTCHECK_CLAIM_EXTRACTOR", "sentences"),
+                        help="Split input into one claim per sentence, or with the T5 claim extractor")
+    parser.add_argument("--corpus-check-interval", type=float,
+                        default=float(os.getenv("FACTCHECK_CORPUS_CHECK_INTERVAL", "5")),
+                        help="Seconds between checks for a re-scraped corpus on disk (0 = never reload)")
+    args = parser.parse_args()
+
+    checker = build_checker(args.llm_base_url, max_workers=args.workers, metrics_enabled=args.metrics,
+                            batch_entities=args.batch_entities, hybrid=not args.no_hybrid,
+                            backend=args.backend, embed_batch_size=args.embed_batch_size,
+                            embed_batch_window=args.embed_batch_window_ms / 1000,
+                            llm_rpm=args.llm_rpm or None, llm_tpm=args.llm_tpm or None,
+                            llm_hedge_after=args.llm_hedge_ms / 1000 or None,
+                            claim_cache_threshold=args.claim_cache_threshold,
+                            claim_extractor=args.claim_extractor)
+    corpus_watcher = CorpusWatcher(checker, interval=args.corpus_check_interval) if args.corpus_check_interval else None
+    service = VerificationService(checker, args.max_concurrent, args.max_queue, corpus_watcher)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    server.daemon_threads = True
+    print(f"Fact checker API listening on http://{args.host}:{args.port} (POST /verify, GET /health, GET /metrics)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,225 @@
 import streamlit as st
+from bm25 import BM25Index, TITLES_CSV
+from claim_cache import SemanticClaimCache
+from claim_extraction import make_claim_extractor
 from fact_checker import FactChecker
-from openai import OpenAI
+from feedback_store import FeedbackStore
+from llm_scheduler import LLMScheduler
+from retrieval import open_backend
+from title_catalog import TitleCatalog
+from llm_cache import LLMCache
+from metrics import Metrics
+import registry
+from scrape_chroma import start_background_refresh
 import os
 from dotenv import load_dotenv
-import csv
-from datetime import datetime
-import pandas as pd
+import html
+import math
 import random
 
 load_dotenv()
 
-def store_feedback_csv(claim, result, feedback, csv_file="data/feedback_log.csv"):
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    row = [
-        now,
-        claim,
-        result.get("verdict", ""),
-        result.get("confidence", ""),
-        "|".join(result.get("evidence", [])),
-        result.get("reasoning", ""),
-        feedback
-    ]
-    header = ["datetime", "claim", "verdict", "confidence", "evidence", "reasoning", "feedback"]
-    
-    # Create file if it doesn't exist
-    if not os.path.exists(csv_file):
-        with open(csv_file, "w", newline='', encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(header)
-    
-    # Append to existing file
-    with open(csv_file, "a", newline='', encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(row)
+# Load the models now, in the background, if serve.py has not already (plain "streamlit run app.py")
+registry.start_warmup()
 
+@st.cache_resource
+def get_feedback_store():
+    # One writer per process; imports data/feedback_log.csv the first time
+    return FeedbackStore()
+
+@st.cache_resource
 def initialize_services():
-    return FactChecker(
+    # Built once per process and shared by every session; reruns reuse it
+    registry.warmup()
+    metrics = Metrics(enabled=os.getenv("FACTCHECK_METRICS") == "1")
+    llm_client = registry.get_llm_client("https://api.groq.com/openai/v1", os.getenv("GROQ_API_KEY"))
+    claim_cache_threshold = float(os.getenv("FACTCHECK_CLAIM_CACHE_THRESHOLD", "0.95"))
+    checker = FactChecker(
         chroma_path="app/chroma_db",
         collection_name="pib_titles",
-        groq_client=OpenAI(
-            api_key=os.getenv("GROQ_API_KEY"),
-            base_url="https://api.groq.com/openai/v1"
-        )
+        groq_client=llm_client,
+        # Stay inside the Groq rate limits (free tier for llama3-8b-8192 by default; 0 = no limit),
+        # retry 429/5xx, and optionally hedge calls slower than FACTCHECK_LLM_HEDGE_MS
+        scheduler=LLMScheduler(
+            llm_client,
+            requests_per_minute=int(os.getenv("FACTCHECK_LLM_RPM", "30")),
+            tokens_per_minute=int(os.getenv("FACTCHECK_LLM_TPM", "6000")),
+            hedge_after=float(os.getenv("FACTCHECK_LLM_HEDGE_MS", "0")) / 1000 or None,
+            metrics=metrics
+        ),
+        llm_cache=LLMCache(),
+        metrics=metrics,
+        batch_entities=os.getenv("FACTCHECK_BATCH_ENTITIES") == "1",
+        # Hybrid BM25 + vector retrieval unless FACTCHECK_HYBRID=0
+        lexical_index=BM25Index.from_csv() if os.getenv("FACTCHECK_HYBRID", "1") != "0" else None,
+        # FACTCHECK_BACKEND=numpy|int8 serves vector search from the memory-mapped index in data/vector_index
+        backend=open_backend(os.getenv("FACTCHECK_BACKEND", "chroma"), "app/chroma_db", "pib_titles"),
+        # Query embeddings from concurrent sessions are encoded together
+        embedder=registry.get_embedding_service(
+            max_batch=int(os.getenv("FACTCHECK_EMBED_BATCH_SIZE", "32")),
+            max_wait=float(os.getenv("FACTCHECK_EMBED_BATCH_WINDOW_MS", "5")) / 1000
+        ),
+        # Reworded claims reuse an earlier verdict (FACTCHECK_CLAIM_CACHE_THRESHOLD=0 turns this off)
+        claim_cache=SemanticClaimCache(threshold=claim_cache_threshold) if claim_cache_threshold else None,
+        # One claim per sentence; FACTCHECK_CLAIM_EXTRACTOR=t5 uses the seq2seq claim extractor (loaded on first use)
+        claim_extractor=make_claim_extractor(os.getenv("FACTCHECK_CLAIM_EXTRACTOR", "sentences"))
     )
+    # Fast boot: serve the last persisted collection now; serve.py started ingesting fresh PIB
+    # titles in the background at process start (this starts it under plain "streamlit run")
+    if os.getenv("BACKGROUND_REFRESH") == "1":
+        start_background_refresh(on_complete=lambda stats: on_refresh(checker, stats))
+    return checker
+
+def on_refresh(checker, stats):
+    # Reload (and drop cached claim verdicts) only if the refresh changed the corpus
+    if stats.get("added") or stats.get("updated"):
+        checker.reload()
+        if checker.lexical_index is not None:
+            checker.lexical_index.update_from_csv()
+
+TITLES_PAGE_SIZE = 50
+
+@st.cache_resource(max_entries=1)
+def load_title_catalog(path, mtime):
+    # mtime is part of the cache key, so a rewritten CSV is parsed once and the old catalog dropped
+    return TitleCatalog.from_csv(path)
+
+@st.cache_resource(max_entries=64)
+def search_titles(path, mtime, query):
+    # Shared across sessions; paging through results reruns without searching again
+    return load_title_catalog(path, mtime).search(query)
+
+def render_entity_result(idx, entity_result):
+    st.markdown(f"### Entity {idx}: {entity_result.get('entity', '')} ({entity_result.get('type', '')})")
+
+    if "error" in entity_result:
+        st.error(f"Error: {entity_result['error']}")
+        if "raw_response" in entity_result:
+            with st.expander("Show raw LLM response"):
+                st.code(entity_result["raw_response"])
+        return
+
+    verdict_color = {
+        "Valid": "green",
+        "Invalid": "red",
+        "Unverified": "orange"
+    }.get(entity_result.get("verdict", ""), "gray")
+    st.markdown(f"**Verdict:** :{verdict_color}[{entity_result.get('verdict', 'Unknown')}]")
+
+    # Confidence
+    st.metric("Confidence Score", f"{entity_result.get('confidence', 0):.2f}")
+
+    # Evidence
+    with st.expander("View Supporting Evidence"):
+        for i, evidence in enumerate(entity_result.get("evidence", []), 1):
+            st.markdown(f"{i}. {evidence}")
+
+    # Reasoning
+    st.markdown("**Analysis:**")
+    st.write(entity_result.get("reasoning", "No reasoning provided"))
+
+def render_claim_result(idx, claim_result, live=False):
+    # live: a streamed partial verdict whose reasoning is still arriving
+    st.markdown(f"### Claim {idx}")
+    st.markdown(f"> {claim_result.get('claim', '')}")
+
+    if "error" in claim_result:
+        st.error(f"Error: {claim_result['error']}")
+        if "raw_response" in claim_result:
+            with st.expander("Show raw LLM response"):
+                st.code(claim_result["raw_response"])
+        return
+
+    verdict_color = {
+        "True": "green",
+        "False": "red",
+        "Unverifiable": "orange"
+    }.get(claim_result.get("verdict", ""), "gray")
+    st.markdown(f"**Verdict:** :{verdict_color}[{claim_result.get('verdict', 'Unknown')}]")
+    if live:
+        st.write(claim_result.get("reasoning", "") + " ▌")
+        return
+
+    # Confidence
+    st.metric("Confidence Score", f"{claim_result.get('confidence', 0):.2f}")
+
+    # Evidence
+    with st.expander("View Supporting Evidence"):
+        for i, evidence in enumerate(claim_result.get("evidence", []), 1):
+            st.markdown(f"{i}. {evidence}")
+
+    # Reasoning
+    st.markdown("**Analysis:**")
+    st.write(claim_result.get("reasoning", "No reasoning provided"))
+
+def verify_streaming(checker, claim, confidence_threshold):
+    """
+    Render checker.verify_claim_stream as it runs: every claim and entity gets
+    its slot (in document order) when queued, claims show their streamed
+    verdict, and each slot is filled in when its result arrives. Clicking Stop
+    reruns the script, which closes the stream and so stops the LLM calls in
+    flight. Returns a verify_claim-style result of what finished.
+    """
+    st.button("Stop")  # any click ends this run; closing the stream cancels the rest
+    st.subheader("Entity Verification Results")
+    entity_area = st.container()
+    st.subheader("Detected Claims and Verification Results")
+    claim_area = st.container()
+    status = st.empty()
+    status.caption("Analyzing...")
+
+    slots, texts = {}, {}
+    finished = {"entity": {}, "claim": {}}
+    summary = None
+    stream = checker.verify_claim_stream(claim, confidence_threshold)
+    try:
+        for event in stream:
+            if event["event"] == "summary":
+                summary = event
+                continue
+            kind, item_id = event["kind"], event["id"]
+            number = int(item_id.rsplit("-", 1)[1]) + 1
+            if event["event"] == "queued":
+                texts[item_id] = event["text"]
+                slots[item_id] = (entity_area if kind == "entity" else claim_area).empty()
+                with slots[item_id].container():
+                    if kind == "entity":
+                        st.markdown(f"### Entity {number}: {event['text']}")
+                    else:
+                        st.markdown(f"### Claim {number}")
+                        st.markdown(f"> {event['text']}")
+                    st.caption("Verifying...")
+            elif event["event"] == "update":
+                with slots[item_id].container():
+                    render_claim_result(number, {**event["result"], "claim": texts[item_id]}, live=True)
+            else:
+                finished[kind][item_id] = event["result"]
+                with slots[item_id].container():
+                    if kind == "entity":
+                        render_entity_result(number, event["result"])
+                    else:
+                        render_claim_result(number, event["result"])
+    finally:
+        stream.close()
+
+    if not finished["entity"]:
+        entity_area.write("No entities detected or verified.")
+    if not finished["claim"]:
+        claim_area.info("No check-worthy claims detected in the input.")
+    status.caption(f"{summary['claims']} claims and {summary['entities']} entities verified"
+                   + (" (stopped)" if summary["cancelled"] else ""))
+    if summary["claims_skipped"]:
+        claim_area.warning(f"{summary['claims_skipped']} more claims were found but not verified "
+                           f"(only the first {checker.max_claims} are checked).")
+
+    def in_order(results):
+        return [results[key] for key in sorted(results, key=lambda key: int(key.rsplit("-", 1)[1]))]
+
+    return {
+        "entities": in_order(finished["entity"]),
+        "claims": in_order(finished["claim"]),
+        "entity_selection": summary["entity_selection"]
+    }
 
 def main():
     # Add sticky title using HTML and CSS
@@ -148,87 +325,12 @@ button[kind="primary"] {
                 st.error("Please enter a claim to verify")
                 return
 
-            with st.spinner("Analyzing..."):
-                # Store result in session state
-                st.session_state.result = checker.verify_claim(claim, confidence_threshold)
-                st.session_state.last_claim = claim
-                st.session_state.feedback_submitted = False  # Reset feedback state for new claim
-
-            # Display results from session state
-            if st.session_state.result:
-                result = st.session_state.result
-
-                # Show entity verification results
-                st.subheader("Entity Verification Results")
-                entities = result.get("entities", [])
-                if entities:
-                    for idx, entity_result in enumerate(entities, 1):
-                        st.markdown(f"### Entity {idx}: {entity_result.get('entity', '')} ({entity_result.get('type', '')})")
-
-                        if "error" in entity_result:
-                            st.error(f"Error: {entity_result['error']}")
-                            if "raw_response" in entity_result:
-                                with st.expander("Show raw LLM response"):
-                                    st.code(entity_result["raw_response"])
-                            continue
-
-                        verdict_color = {
-                            "Valid": "green",
-                            "Invalid": "red",
-                            "Unverified": "orange"
-                        }.get(entity_result.get("verdict", ""), "gray")
-                        st.markdown(f"**Verdict:** :{verdict_color}[{entity_result.get('verdict', 'Unknown')}]")
-
-                        # Confidence
-                        st.metric("Confidence Score", f"{entity_result.get('confidence', 0):.2f}")
-
-                        # Evidence
-                        with st.expander("View Supporting Evidence"):
-                            for i, evidence in enumerate(entity_result.get("evidence", []), 1):
-                                st.markdown(f"{i}. {evidence}")
-
-                        # Reasoning
-                        st.markdown("**Analysis:**")
-                        st.write(entity_result.get("reasoning", "No reasoning provided"))
-                else:
-                    st.write("No entities detected or verified.")
-
-                # Show claim verification results
-                st.subheader("Detected Claims and Verification Results")
-                claims = result.get("claims", [])
-                if not claims:
-                    st.info("No check-worthy claims detected in the input.")
-                else:
-                    for idx, claim_result in enumerate(claims, 1):
-                        st.markdown(f"### Claim {idx}")
-                        st.markdown(f"> {claim_result.get('claim', '')}")
-
-                        if "error" in claim_result:
-                            st.error(f"Error: {claim_result['error']}")
-                            if "raw_response" in claim_result:
-                                with st.expander("Show raw LLM response"):
-                                    st.code(claim_result["raw_response"])
-                            continue
-
-                        verdict_color = {
-                            "True": "green",
-                            "False": "red",
-                            "Unverifiable": "orange"
-                        }.get(claim_result.get("verdict", ""), "gray")
-                        st.markdown(f"**Verdict:** :{verdict_color}[{claim_result.get('verdict', 'Unknown')}]")
-
-                        # Confidence
-                        st.metric("Confidence Score", f"{claim_result.get('confidence', 0):.2f}")
-
-                        # Evidence
-                        with st.expander("View Supporting Evidence"):
-                            for i, evidence in enumerate(claim_result.get("evidence", []), 1):
-                                st.markdown(f"{i}. {evidence}")
-
-                        # Reasoning
-                        st.markdown("**Analysis:**")
-                        st.write(claim_result.get("reasoning", "No reasoning provided"))
-
+            # Results are rendered as they stream in and kept in session state
+            st.session_state.result = verify_streaming(checker, claim, confidence_threshold)
+            checker.metrics.maybe_export_csv()
+            st.session_state.last_claim = claim
+            st.session_state.feedback_submitted = False  # Reset feedback state for new claim
+            result = st.session_state.result
 
             # Feedback system
             feedback_key = f"feedback_radio_{st.session_state.last_claim}"
@@ -241,7 +343,8 @@ button[kind="primary"] {
                 )
                 
                 if feedback:
-                    store_feedback_csv(st.session_state.last_claim, result, feedback)
+                    # One row per verified claim, each with its own verdict
+                    get_feedback_store().record(text=st.session_state.last_claim, result=result, feedback=feedback)
                     st.session_state.feedback_submitted = True
                     st.rerun()  # Use st.rerun() instead of experimental_rerun()
             else:
@@ -251,9 +354,20 @@ button[kind="primary"] {
         
         st.markdown("### 📋 All Claims")
         try:
-            df = pd.read_csv("data/pib_titles.csv")["title"].to_frame()
-            if not df.empty:
-                st.markdown("""
+            # Only the current page is rendered, as one block; search runs on the cached catalog
+            mtime = os.path.getmtime(TITLES_CSV) if os.path.exists(TITLES_CSV) else 0
+            catalog = load_title_catalog(TITLES_CSV, mtime)
+            query = st.text_input("Search claims", key="claims_search").strip()
+            rows = search_titles(TITLES_CSV, mtime, query)
+            pages = max(1, math.ceil(len(rows) / TITLES_PAGE_SIZE))
+            page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1,
+                                   key=f"claims_page_{query}")
+            st.caption(f"{len(rows)} of {len(catalog)} claims")
+            cells = "".join(
+                f'<div class="scrollable-cell">{html.escape(title)}</div>'
+                for title in catalog.page(rows, page - 1, TITLES_PAGE_SIZE)
+            )
+            st.markdown("""
 <style>
 .scrollable-cell {
     overflow-x: auto;
@@ -265,19 +379,10 @@ button[kind="primary"] {
     background: #fafafa;
 }
 </style>
-""", unsafe_allow_html=True)
-
-            
-
-            # Render each row as a scrollable div
-            for idx, row in df.iterrows():
-                st.markdown(
-                    f'<div class="scrollable-cell">{row["title"]}</div>',
-                    unsafe_allow_html=True
-    )
+""" + cells, unsafe_allow_html=True)
         except Exception as e:
             st.warning(f"Unable to display full dataset: {e}")
-    
+
 
 
 if __name__ == "__main__":
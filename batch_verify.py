@@ -0,0 +1,105 @@
+import argparse
+import csv
+import json
+import os
+from collections import deque
+
+from dotenv import load_dotenv
+
+import registry
+from fact_checker import FactChecker
+
+load_dotenv()
+
+CHROMA_PATH = "app/chroma_db"
+COLLECTION_NAME = "pib_titles"
+
+
+def read_records(path, text_field="claim", id_field="id"):
+    """Yield (record_id, text) from a CSV or JSONL file; ids default to the row number"""
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for i, line in enumerate(f):
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if isinstance(record, str):
+                    yield str(i), record
+                else:
+                    yield str(record.get(id_field, i)), record.get(text_field, "")
+    else:
+        with open(path, newline='', encoding="utf-8") as f:
+            for i, row in enumerate(csv.DictReader(f)):
+                yield str(row.get(id_field) or i), row.get(text_field, "")
+
+
+def completed_ids(output_path):
+    """Ids already written to the output file, so an interrupted run can resume"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    # Drop a partial last line left by a crash so appended records start on a fresh line
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["id"])
+            except (ValueError, KeyError):
+                continue
+    return done
+
+
+def run_batch(checker, input_path, output_path, text_field="claim", id_field="id",
+              confidence_threshold=0.5, batch_size=32):
+    done = completed_ids(output_path)
+    ids = deque()
+
+    def pending_texts():
+        for record_id, text in read_records(input_path, text_field, id_field):
+            if record_id in done or not text.strip():
+                continue
+            ids.append(record_id)
+            yield text
+
+    written = 0
+    with open(output_path, "a", encoding="utf-8") as out:
+        for result in checker.verify_many(pending_texts(), confidence_threshold, batch_size):
+            out.write(json.dumps({"id": ids.popleft(), **result}, ensure_ascii=False) + "\n")
+            # Each line is a checkpoint
+            out.flush()
+            written += 1
+            if written % 100 == 0:
+                print(f"Verified {written} records...")
+
+    print(f"Batch complete. {written} records verified, {len(done)} already done.")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fact-check a CSV/JSONL file of claims in bulk")
+    parser.add_argument("input", help="Input .csv or .jsonl file")
+    parser.add_argument("output", help="Output .jsonl file (appended to; reruns resume)")
+    parser.add_argument("--text-field", default="claim", help="Column/key holding the text to verify")
+    parser.add_argument("--id-field", default="id", help="Column/key holding a stable record id")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Confidence threshold")
+    parser.add_argument("--batch-size", type=int, default=32, help="Texts per NER/retrieval batch")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent LLM calls")
+    args = parser.parse_args()
+
+    checker = FactChecker(
+        chroma_path=CHROMA_PATH,
+        collection_name=COLLECTION_NAME,
+        # Pooled client with the SDK's retries off; the LLM scheduler does the retrying
+        groq_client=registry.get_llm_client("https://api.groq.com/openai/v1", os.getenv("GROQ_API_KEY")),
+        max_workers=args.workers
+    )
+    run_batch(checker, args.input, args.output, args.text_field, args.id_field,
+              args.threshold, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
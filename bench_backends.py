@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import registry
+from benchmark import COLLECTION_NAME, build_corpus, summarize
+from retrieval import ChromaBackend, NumpyBackend, build_numpy_index
+
+# Chroma (persistent client + HNSW) vs NumpyBackend (memory-mapped exact search)
+# on benchmark.py's synthetic corpus: cold start in a fresh interpreter, single
+# query latency and batched throughput. Queries are pre-embedded so the
+# embedding model does not dominate either side.
+
+COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+import numpy as np
+kind, path, queries_path = sys.argv[1:4]
+query = np.load(queries_path)[:1].tolist()
+if kind == "numpy":
+    from retrieval import NumpyBackend
+    backend = NumpyBackend(path)
+    loaded = time.perf_counter()
+    backend.query(query_embeddings=query, n_results=3)
+else:
+    # No embedding function: the queries are pre-embedded and model load time is not the backend's
+    import chromadb
+    collection = chromadb.PersistentClient(path=path).get_collection("pib_titles", embedding_function=None)
+    loaded = time.perf_counter()
+    collection.query(query_embeddings=query, n_results=3)
+done = time.perf_counter()
+print(json.dumps({"load_seconds": loaded - start, "first_query_seconds": done - loaded, "total_seconds": done - start}))
+"""
+
+
+def cold_start(kind, path, queries_path):
+    """Open the backend and answer one query in a fresh interpreter"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.dirname(os.path.abspath(__file__))] + sys.path))
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_START, kind, path, queries_path],
+        check=True, capture_output=True, text=True, env=env
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(backend, queries, batch_size, k):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        backend.query(query_embeddings=[query], n_results=k)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for offset in range(0, len(queries), batch_size):
+        backend.query(query_embeddings=queries[offset:offset + batch_size], n_results=k)
+    elapsed = time.perf_counter() - start
+    return {"single_query": summarize(latencies), "batch_queries_per_s": len(queries) / elapsed if elapsed else 0.0}
+
+
+def overlap(chroma_results, numpy_results):
+    """Share of Chroma's top-k that the exact search also returns (HNSW is approximate)"""
+    shared = sum(len(set(a) & set(b)) for a, b in zip(chroma_results["ids"], numpy_results["ids"]))
+    total = sum(len(a) for a in chroma_results["ids"])
+    return shared / total if total else 1.0
+
+
+def run(sizes, query_count, batch_size, k):
+    report = {"queries": query_count, "batch_size": batch_size, "k": k, "runs": []}
+    for size in sizes:
+        workdir = tempfile.mkdtemp(prefix="fc_bench_backends_")
+        try:
+            print(f"Building synthetic corpus of {size} titles...")
+            chroma_path = os.path.join(workdir, "chroma")
+            index_path = os.path.join(workdir, "vector_index")
+            sample = build_corpus(chroma_path, size)
+            chroma = ChromaBackend(chroma_path, COLLECTION_NAME)
+            build_numpy_index(chroma.collection, index_path)
+            numpy_backend = NumpyBackend(index_path)
+
+            queries = registry.get_embedding_function()((sample * (query_count // len(sample) + 1))[:query_count])
+            queries = [list(map(float, q)) for q in queries]
+            queries_path = os.path.join(workdir, "queries.npy")
+            np.save(queries_path, np.asarray(queries, dtype=np.float32))
+
+            run_report = {
+                "corpus_size": size,
+                "index_bytes": os.path.getsize(os.path.join(index_path, "embeddings.npy")),
+                "chroma": {"cold_start": cold_start("chroma", chroma_path, queries_path),
+                           **measure(chroma, queries, batch_size, k)},
+                "numpy": {"cold_start": cold_start("numpy", index_path, queries_path),
+                          **measure(numpy_backend, queries, batch_size, k)},
+                "top_k_overlap": overlap(chroma.query(query_embeddings=queries, n_results=k),
+                                         numpy_backend.query(query_embeddings=queries, n_results=k))
+            }
+            report["runs"].append(run_report)
+            for kind in ("chroma", "numpy"):
+                r = run_report[kind]
+                print(f"  size={size} {kind}: cold start {r['cold_start']['total_seconds'] * 1000:.0f}ms, "
+                      f"p50 {r['single_query']['p50_ms']:.2f}ms, batched {r['batch_queries_per_s']:.0f} q/s")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the Chroma and NumPy exact-search retrieval backends")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated corpus sizes")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--output", default="bench_backends_results.json")
+    args = parser.parse_args()
+
+    report = run([int(s) for s in args.sizes.split(",")], args.queries, args.batch_size, args.k)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
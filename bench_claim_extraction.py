@@ -0,0 +1,111 @@
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import time
+
+from openai import OpenAI
+
+from benchmark import COLLECTION_NAME, build_corpus, make_claims, summarize
+from claim_extraction import T5_CLAIM_MODEL, make_claim_extractor
+from fact_checker import FactChecker
+from metrics import collect_request_timings
+from stub_llm import start_stub_server
+
+# Per-stage cost of each claim extractor on multi-sentence "articles" built
+# from synthetic titles, end to end against the local stub LLM: extraction
+# time, claims per article, and what the extra claims cost downstream in
+# retrieval and LLM time. "whole" is the old behaviour (the input is one claim).
+
+
+class WholeText:
+    name = "whole"
+
+    def extract_batch(self, texts, docs=None):
+        return [[text] for text in texts]
+
+    def stats(self):
+        return {"extractor": self.name}
+
+
+def make_articles(sample, count, sentences, seed=2):
+    rng = random.Random(seed)
+    claims = make_claims(sample, count * sentences, seed)
+    rng.shuffle(claims)
+    return [". ".join(claims[i:i + sentences]) + "." for i in range(0, len(claims), sentences)]
+
+
+def measure(checker, articles):
+    latencies, claim_counts, stage_totals = [], [], {}
+    for article in articles:
+        start = time.perf_counter()
+        result, timings = collect_request_timings(checker.verify_claim, article, 0.5)
+        latencies.append(time.perf_counter() - start)
+        claim_counts.append(len(result["claims"]))
+        for stage, ms in timings["total_ms_by_stage"].items():
+            stage_totals[stage] = stage_totals.get(stage, 0.0) + ms
+    return {
+        "articles": len(articles),
+        "claims_per_article": sum(claim_counts) / len(articles),
+        "latency": summarize(latencies),
+        "mean_ms_by_stage": {stage: total / len(articles) for stage, total in stage_totals.items()},
+        "extractor": checker.claim_extractor.stats()
+    }
+
+
+def run(extractors, article_count, sentences, latency, t5_model):
+    server, base_url = start_stub_server(latency=latency)
+    workdir = tempfile.mkdtemp(prefix="fc_bench_claims_")
+    try:
+        sample = build_corpus(workdir, 2000)
+        articles = make_articles(sample, article_count, sentences)
+        report = {"articles": article_count, "sentences_per_article": sentences, "latency": latency, "runs": {}}
+        for kind in extractors:
+            if kind == "whole":
+                extractor = WholeText()
+            elif kind == "t5":
+                extractor = make_claim_extractor("t5", model_name=t5_model)
+            else:
+                extractor = make_claim_extractor(kind)
+            checker = FactChecker(
+                chroma_path=workdir,
+                collection_name=COLLECTION_NAME,
+                groq_client=OpenAI(api_key="stub", base_url=base_url),
+                fast_path=False,
+                claim_extractor=extractor
+            )
+            # Warm-up request: loads the models, so load time is reported separately
+            checker.verify_claim(articles[0], 0.5)
+            report["runs"][kind] = run_report = measure(checker, articles)
+            stages = run_report["mean_ms_by_stage"]
+            print(f"{kind}: {run_report['claims_per_article']:.1f} claims/article, "
+                  f"p50 {run_report['latency']['p50_ms']:.0f}ms, "
+                  f"extraction {stages.get('claim_extraction', 0):.2f}ms, "
+                  f"retrieval {stages.get('embedding', 0) + stages.get('vector_query', 0):.1f}ms, "
+                  f"llm {stages.get('llm', 0):.0f}ms per article")
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage cost of each claim extractor")
+    parser.add_argument("--extractors", nargs="+", default=["whole", "sentences"],
+                        choices=["whole", "sentences", "t5"])
+    parser.add_argument("--articles", type=int, default=20)
+    parser.add_argument("--sentences", type=int, default=5, help="Sentences (claims) per article")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub LLM latency in seconds")
+    parser.add_argument("--t5-model", default=T5_CLAIM_MODEL, help="Hub name or local path of the T5 extractor")
+    parser.add_argument("--output", default="bench_claim_extraction_results.json")
+    args = parser.parse_args()
+
+    report = run(args.extractors, args.articles, args.sentences, args.latency, args.t5_model)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from cryptography.fernet import Fernet
+
+# Compares the original whole-file, serial Fernet scripts with the chunked,
+# parallel format in chroma_crypto. Each mode runs in a fresh subprocess so
+# its peak RSS (including worker processes) is measured in isolation.
+
+MODES = ["legacy-encrypt", "legacy-decrypt", "chunked-encrypt", "chunked-decrypt", "chunked-reencrypt"]
+
+
+def make_corpus(path, files, size_mb):
+    os.makedirs(path, exist_ok=True)
+    block = os.urandom(1024 * 1024)
+    for i in range(files):
+        with open(os.path.join(path, f"segment_{i}.bin"), "wb") as f:
+            for _ in range(size_mb):
+                f.write(block)
+
+
+def legacy_encrypt(key, chroma_path):
+    # Same algorithm as the original encrypt_chroma.py
+    fernet = Fernet(key)
+    for root, _, files in os.walk(chroma_path):
+        for file in files:
+            if file.endswith(".enc"):
+                continue
+            file_path = os.path.join(root, file)
+            with open(file_path, "rb") as f:
+                data = f.read()
+            with open(f"{file_path}.enc", "wb") as f:
+                f.write(fernet.encrypt(data))
+            os.remove(file_path)
+
+
+def legacy_decrypt(key, chroma_path):
+    # Same algorithm as the original decrypt_chroma.py
+    fernet = Fernet(key)
+    for root, _, files in os.walk(chroma_path):
+        for file in files:
+            if not file.endswith(".enc"):
+                continue
+            encrypted_path = os.path.join(root, file)
+            with open(encrypted_path, "rb") as f:
+                data = f.read()
+            with open(encrypted_path[:-4], "wb") as f:
+                f.write(fernet.decrypt(data))
+            os.remove(encrypted_path)
+
+
+def run_mode(mode, workdir, workers):
+    """Executed inside the measurement subprocess"""
+    # cwd is workdir, so the scripts' relative app/ paths resolve inside it
+    import encrypt_chroma
+    import decrypt_chroma
+    chroma_path = os.path.join(workdir, "app", "chroma_db")
+    manifest_file = os.path.join(workdir, "app", "chroma_manifest.json")
+    with open(os.path.join(workdir, "app", "chroma_key.key"), "rb") as f:
+        key = f.read()
+
+    start = time.perf_counter()
+    if mode == "legacy-encrypt":
+        legacy_encrypt(key, chroma_path)
+    elif mode == "legacy-decrypt":
+        legacy_decrypt(key, chroma_path)
+    elif mode in ("chunked-encrypt", "chunked-reencrypt"):
+        encrypt_chroma.encrypt_chroma_files(chroma_path, manifest_file, workers)
+    elif mode == "chunked-decrypt":
+        decrypt_chroma.decrypt_chroma_files(chroma_path, manifest_file, workers)
+    elapsed = time.perf_counter() - start
+
+    peak_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return {"seconds": elapsed, "peak_rss_mb": peak_kb / 1024}
+
+
+def measure(mode, workdir, workers):
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run", mode, "--workdir", workdir, "--workers", str(workers)],
+        capture_output=True, text=True, check=True, cwd=workdir,
+        env={**os.environ, "PYTHONPATH": os.path.dirname(os.path.abspath(__file__))}
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ChromaDB encryption formats")
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--size-mb", type=int, default=64, help="Size of each synthetic file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--run", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        sys.stdout = sys.stderr
+        result = run_mode(args.run, args.workdir, args.workers)
+        sys.stdout = sys.__stdout__
+        print(json.dumps(result))
+        return
+
+    total_mb = args.files * args.size_mb
+    results = {"files": args.files, "size_mb": args.size_mb, "workers": args.workers, "modes": {}}
+    workdir = tempfile.mkdtemp(prefix="bench_crypto_")
+    try:
+        os.makedirs(os.path.join(workdir, "app"))
+        with open(os.path.join(workdir, "app", "chroma_key.key"), "wb") as f:
+            f.write(Fernet.generate_key())
+        make_corpus(os.path.join(workdir, "app", "chroma_db"), args.files, args.size_mb)
+
+        # Legacy round trip, chunked round trip, then a re-encrypt where every chunk is unchanged
+        for mode in MODES:
+            stats = measure(mode, workdir, args.workers)
+            stats["throughput_mb_s"] = total_mb / stats["seconds"] if stats["seconds"] else 0.0
+            results["modes"][mode] = stats
+            print(f"{mode:>18}: {stats['seconds']:7.2f}s  {stats['throughput_mb_s']:8.1f} MB/s  "
+                  f"peak RSS {stats['peak_rss_mb']:7.1f} MB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
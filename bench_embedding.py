@@ -0,0 +1,94 @@
+import argparse
+import json
+import random
+import threading
+import time
+
+import registry
+from benchmark import SUBJECTS, PLACES, summarize
+from embedding_service import MicroBatcher
+
+# Query-embedding throughput and latency under concurrent load: every caller
+# encoding its own one or two strings vs the shared MicroBatcher, for a range of
+# concurrency levels and batch windows. Uses the real embedding model.
+
+
+def make_requests(count, seed=0):
+    """One claim, sometimes with an entity, like a FactChecker.retrieve call"""
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(count):
+        claim = f"Government announces {rng.choice(SUBJECTS)} in {rng.choice(PLACES)}"
+        requests.append([claim, rng.choice(PLACES)] if rng.random() < 0.5 else [claim])
+    return requests
+
+
+def load_test(embed, requests, concurrency):
+    """Run requests through embed from concurrency threads; per-request latency and throughput"""
+    latencies = []
+    lock = threading.Lock()
+    pending = iter(requests)
+
+    def worker():
+        while True:
+            with lock:
+                texts = next(pending, None)
+            if texts is None:
+                return
+            start = time.perf_counter()
+            embed(texts)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {**summarize(latencies), "requests_per_s": len(requests) / elapsed if elapsed else 0.0}
+
+
+def run(concurrency_levels, request_count, windows_ms, max_batch):
+    embed_fn = registry.get_embedding_function()
+    embed_fn(["warmup"])
+    requests = make_requests(request_count)
+    report = {"requests": request_count, "max_batch": max_batch, "runs": []}
+    for concurrency in concurrency_levels:
+        direct = load_test(embed_fn, requests, concurrency)
+        run_report = {"concurrency": concurrency, "direct": direct, "batched": {}}
+        print(f"concurrency={concurrency} direct: {direct['requests_per_s']:.0f} req/s, "
+              f"p99 {direct['p99_ms']:.1f}ms")
+        for window_ms in windows_ms:
+            batcher = MicroBatcher(embed_fn, max_batch=max_batch, max_wait=window_ms / 1000)
+            try:
+                batched = {**load_test(batcher, requests, concurrency), **batcher.stats()}
+            finally:
+                batcher.close()
+            run_report["batched"][f"{window_ms:g}ms"] = batched
+            print(f"  window={window_ms:g}ms: {batched['requests_per_s']:.0f} req/s, p99 {batched['p99_ms']:.1f}ms, "
+                  f"mean batch {batched['mean_batch_size']:.1f} texts")
+        report["runs"].append(run_report)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark micro-batched query embedding under concurrent load")
+    parser.add_argument("--concurrency", default="1,4,16,64", help="Comma-separated caller thread counts")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--windows-ms", default="0,2,5,10", help="Comma-separated batch windows")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--output", default="bench_embedding_results.json")
+    args = parser.parse_args()
+
+    report = run([int(c) for c in args.concurrency.split(",")], args.requests,
+                 [float(w) for w in args.windows_ms.split(",")], args.max_batch)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
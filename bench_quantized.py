@@ -0,0 +1,160 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import registry
+from benchmark import COLLECTION_NAME, build_corpus, make_claims, summarize
+from retrieval import (CODES_FILE, DOCS_FILE, EMBEDDINGS_FILE, SCALES_FILE, ChromaBackend, NumpyBackend,
+                       QuantizedBackend, build_numpy_index)
+
+# int8 QuantizedBackend vs the full-precision paths on benchmark.py's synthetic
+# corpus: recall@k against Chroma's collection.query and against exact float32
+# search, index bytes per million documents, resident memory after serving
+# queries (per mapped file, measured in a fresh interpreter) and query latency.
+
+RESIDENT = """
+import json, sys
+import numpy as np
+import registry
+from retrieval import NumpyBackend, QuantizedBackend
+
+def mapped_rss(suffix):
+    total, mapping = 0, ""
+    with open("/proc/self/smaps") as f:
+        for line in f:
+            fields = line.split()
+            if "-" in fields[0]:
+                mapping = fields[-1] if len(fields) > 5 else ""
+            elif fields[0] == "Rss:" and mapping.endswith(suffix):
+                total += int(fields[1]) * 1024
+    return total
+
+kind, path, queries_path = sys.argv[1:4]
+before = registry._rss_bytes()
+backend = QuantizedBackend(path) if kind == "int8" else NumpyBackend(path)
+queries = np.load(queries_path)
+for offset in range(0, len(queries), 32):
+    backend.query(query_embeddings=queries[offset:offset + 32], n_results=3)
+print(json.dumps({
+    "process_rss_delta": registry._rss_bytes() - before,
+    "float32_mapped": mapped_rss("/embeddings.npy"),
+    "int8_mapped": mapped_rss("/embeddings_int8.npy") + mapped_rss("/scales.npy")
+}))
+"""
+
+
+def resident_bytes(kind, path, queries_path):
+    """Resident bytes after serving the queries in a fresh interpreter, per mapped file and overall"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.dirname(os.path.abspath(__file__))] + sys.path))
+    output = subprocess.run(
+        [sys.executable, "-c", RESIDENT, kind, path, queries_path],
+        check=True, capture_output=True, text=True, env=env
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def recall(reference, candidate, tolerance=1e-4):
+    """
+    Share of the candidate top-k that is at least as close as the reference's
+    k-th hit. Tie-aware: the synthetic titles produce many equidistant
+    documents, and which of those fill the last slots is arbitrary.
+    """
+    hits = total = 0
+    for reference_distances, candidate_distances in zip(reference["distances"], candidate["distances"]):
+        if not reference_distances:
+            continue
+        cutoff = max(reference_distances) + tolerance
+        hits += sum(distance <= cutoff for distance in candidate_distances[:len(reference_distances)])
+        total += len(reference_distances)
+    return hits / total if total else 1.0
+
+
+def latency(backend, queries, k):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        backend.query(query_embeddings=[query], n_results=k)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def run(sizes, query_count, k, shortlist):
+    report = {"queries": query_count, "k": k, "shortlist": shortlist, "runs": []}
+    for size in sizes:
+        workdir = tempfile.mkdtemp(prefix="fc_bench_quantized_")
+        try:
+            print(f"Building synthetic corpus of {size} titles...")
+            chroma_path = os.path.join(workdir, "chroma")
+            index_path = os.path.join(workdir, "vector_index")
+            sample = build_corpus(chroma_path, size)
+            chroma = ChromaBackend(chroma_path, COLLECTION_NAME)
+            build_numpy_index(chroma.collection, index_path)
+            exact = NumpyBackend(index_path)
+            quantized = QuantizedBackend(index_path, shortlist=shortlist)
+
+            # Claims (verbatim, edited and unrelated), not bare titles, so the top-k is not trivial
+            queries = np.asarray(registry.get_embedding_function()(make_claims(sample, query_count)), dtype=np.float32)
+            queries_path = os.path.join(workdir, "queries.npy")
+            np.save(queries_path, queries)
+
+            reference = chroma.query(query_embeddings=queries.tolist(), n_results=k)
+            float32_bytes = os.path.getsize(os.path.join(index_path, EMBEDDINGS_FILE))
+            int8_bytes = (os.path.getsize(os.path.join(index_path, CODES_FILE))
+                          + os.path.getsize(os.path.join(index_path, SCALES_FILE)))
+            per_million = 1_000_000 / size
+            run_report = {
+                "corpus_size": size,
+                f"recall@{k}_vs_chroma": {
+                    "float32_exact": recall(reference, exact.query(query_embeddings=queries, n_results=k)),
+                    "int8": recall(reference, quantized.query(query_embeddings=queries, n_results=k))
+                },
+                f"recall@{k}_vs_exact": recall(exact.query(query_embeddings=queries, n_results=k),
+                                              quantized.query(query_embeddings=queries, n_results=k)),
+                "mb_per_million_docs": {
+                    "float32_vectors": float32_bytes * per_million / 1e6,
+                    "int8_vectors": int8_bytes * per_million / 1e6,
+                    "docs_json": os.path.getsize(os.path.join(index_path, DOCS_FILE)) * per_million / 1e6
+                },
+                # Not scaled per million: process RSS also holds docs.json objects and per-query scratch
+                "resident_mb": {
+                    kind: {name: value / 1e6 for name, value in resident_bytes(kind, index_path, queries_path).items()}
+                    for kind in ("numpy", "int8")
+                },
+                "latency": {"float32_exact": latency(exact, queries, k), "int8": latency(quantized, queries, k)}
+            }
+            report["runs"].append(run_report)
+            mb = run_report["mb_per_million_docs"]
+            print(f"  size={size} recall@{k} vs chroma: int8={run_report[f'recall@{k}_vs_chroma']['int8']:.3f} "
+                  f"float32={run_report[f'recall@{k}_vs_chroma']['float32_exact']:.3f}; "
+                  f"MB/1M docs: int8={mb['int8_vectors']:.0f} float32={mb['float32_vectors']:.0f}; "
+                  f"p50 int8={run_report['latency']['int8']['p50_ms']:.2f}ms "
+                  f"float32={run_report['latency']['float32_exact']['p50_ms']:.2f}ms")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall and memory of the int8 quantized embedding index")
+    parser.add_argument("--sizes", default="10000,100000", help="Comma-separated corpus sizes")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--shortlist", type=int, default=50, help="Candidates rescored in float32 per query")
+    parser.add_argument("--output", default="bench_quantized_results.json")
+    args = parser.parse_args()
+
+    report = run([int(s) for s in args.sizes.split(",")], args.queries, args.k, args.shortlist)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
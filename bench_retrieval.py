@@ -0,0 +1,115 @@
+import argparse
+import json
+import random
+import re
+import shutil
+import tempfile
+import time
+
+from benchmark import COLLECTION_NAME, build_corpus, summarize
+from bm25 import BM25Index
+from fact_checker import FactChecker
+
+# Recall@k and latency of vector-only vs hybrid (BM25 + vector, RRF) retrieval
+# on benchmark.py's synthetic corpus. Each query is derived from a known title,
+# which counts as the relevant document.
+
+TITLE_PARTS = re.compile(
+    r"Ministry of (?P<ministry>.+?) (?P<action>launches|approves|inaugurates|reviews|announces|signs MoU for|"
+    r"releases funds for) (?P<subject>.+?) worth Rs (?P<amount>\d+) crore in (?P<place>.+?) on "
+    r"(?P<day>\d+) (?P<month>\w+) (?P<year>\d{4})"
+)
+
+
+def make_queries(sample, count, seed=2):
+    """(query, relevant title, kind) triples: verbatim, reordered paraphrase and keyword-only"""
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        title = rng.choice(sample)
+        parts = TITLE_PARTS.fullmatch(title).groupdict()
+        kind = ("verbatim", "paraphrase", "keywords")[i % 3]
+        if kind == "verbatim":
+            query = title
+        elif kind == "paraphrase":
+            query = (f"{parts['subject'].capitalize()} in {parts['place']} worth Rs {parts['amount']} crore, "
+                     f"{parts['month']} {parts['year']}, {parts['ministry']} ministry")
+        else:
+            query = f"Rs {parts['amount']} crore {parts['place']} {parts['month']} {parts['year']}"
+        queries.append((query, title, kind))
+    return queries
+
+
+def evaluate(checker, queries, k):
+    hits, by_kind, latencies = 0, {}, []
+    for query, title, kind in queries:
+        start = time.perf_counter()
+        retrieved = checker.retrieve([query], n_results=k)[0]
+        latencies.append(time.perf_counter() - start)
+        found = title in retrieved["documents"]
+        hits += found
+        counts = by_kind.setdefault(kind, [0, 0])
+        counts[0] += found
+        counts[1] += 1
+
+    batch_start = time.perf_counter()
+    checker.retrieve([query for query, _, _ in queries], n_results=k)
+    batch_elapsed = time.perf_counter() - batch_start
+    return {
+        f"recall@{k}": hits / len(queries),
+        "recall_by_kind": {kind: found / total for kind, (found, total) in by_kind.items()},
+        "latency": summarize(latencies),
+        "batch_queries_per_s": len(queries) / batch_elapsed if batch_elapsed else 0.0
+    }
+
+
+def run(sizes, query_count, k):
+    report = {"queries": query_count, "k": k, "runs": []}
+    for size in sizes:
+        workdir = tempfile.mkdtemp(prefix="fc_bench_retrieval_")
+        try:
+            print(f"Building synthetic corpus of {size} titles...")
+            sample = build_corpus(workdir, size)
+            checker = FactChecker(chroma_path=workdir, collection_name=COLLECTION_NAME, groq_client=None)
+
+            build_start = time.perf_counter()
+            index = BM25Index()
+            corpus = checker.collection.get(include=["documents"])
+            for doc_id, doc in zip(corpus["ids"], corpus["documents"]):
+                index.add(doc_id, doc)
+            build_seconds = time.perf_counter() - build_start
+
+            queries = make_queries(sample, query_count)
+            vector = evaluate(checker, queries, k)
+            checker.lexical_index = index
+            hybrid = evaluate(checker, queries, k)
+            report["runs"].append({
+                "corpus_size": size,
+                "bm25_build_seconds": build_seconds,
+                "vector": vector,
+                "hybrid": hybrid
+            })
+            print(f"  size={size} recall@{k} vector={vector[f'recall@{k}']:.3f} "
+                  f"hybrid={hybrid[f'recall@{k}']:.3f} "
+                  f"p50 vector={vector['latency']['p50_ms']:.1f}ms hybrid={hybrid['latency']['p50_ms']:.1f}ms")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare vector-only and hybrid BM25 + vector retrieval")
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated corpus sizes")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("-k", type=int, default=3, help="Documents retrieved per query (recall@k)")
+    parser.add_argument("--output", default="bench_retrieval_results.json")
+    args = parser.parse_args()
+
+    report = run([int(s) for s in args.sizes.split(",")], args.queries, args.k)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
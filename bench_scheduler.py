@@ -0,0 +1,115 @@
+import argparse
+import json
+import threading
+import time
+
+import registry
+from benchmark import summarize
+from fact_checker import build_claim_prompt
+from llm_scheduler import LLMScheduler
+from stub_llm import start_stub_server
+
+# Concurrent LLM calls against a stub that enforces a requests-per-minute limit,
+# fails a fraction of requests with 503 and answers some slowly: bare client
+# calls vs the same calls through LLMScheduler (with and without hedging).
+# Reports success rate, latency percentiles and the scheduler's counters.
+
+PROMPT = build_claim_prompt("Government announces new metro line in Pune",
+                            '- "Union Cabinet approves Pune metro phase 2" (Source: PIB, Similarity: 0.81)')
+
+
+def load_test(create, call_count, concurrency):
+    latencies, failures = [], []
+    lock = threading.Lock()
+    remaining = [call_count]
+
+    def worker():
+        while True:
+            with lock:
+                if not remaining[0]:
+                    return
+                remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                create(model="stub", messages=[{"role": "user", "content": PROMPT}], temperature=0.1, max_tokens=400)
+            except Exception as e:
+                with lock:
+                    failures.append(type(e).__name__)
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        **summarize(latencies),
+        "success_rate": len(latencies) / call_count,
+        "failures": {name: failures.count(name) for name in set(failures)},
+        "calls_per_s": call_count / elapsed if elapsed else 0.0
+    }
+
+
+def run(call_count, concurrency, rpm, latency, error_rate, slow_rate, slow_latency, hedge_after):
+    scenarios = {
+        "bare": lambda client, budget: client.chat.completions.create,
+        "scheduler": lambda client, budget: LLMScheduler(client, requests_per_minute=budget).create,
+        "scheduler_hedged": lambda client, budget: LLMScheduler(client, requests_per_minute=budget,
+                                                                hedge_after=hedge_after).create
+    }
+    # More calls than the rate limit allows, then unlimited calls where only the slow tail matters
+    experiments = {
+        "over_budget": (rpm, ["bare", "scheduler"]),
+        "tail_latency": (0, ["bare", "scheduler", "scheduler_hedged"])
+    }
+    report = {"calls": call_count, "concurrency": concurrency, "stub_rpm": rpm, "error_rate": error_rate,
+              "slow_rate": slow_rate, "slow_latency": slow_latency, "hedge_after": hedge_after}
+    for experiment, (limit, names) in experiments.items():
+        report[experiment] = {}
+        for name in names:
+            # A fresh stub per scenario so each starts with a full rate-limit allowance
+            server, base_url = start_stub_server(latency=latency, requests_per_minute=limit, error_rate=error_rate,
+                                                 slow_rate=slow_rate, slow_latency=slow_latency)
+            try:
+                create = scenarios[name](registry.get_llm_client(base_url, "stub"),
+                                         limit or None)
+                result = load_test(create, call_count, concurrency)
+                scheduler = getattr(create, "__self__", None)
+                if isinstance(scheduler, LLMScheduler):
+                    result["scheduler"] = scheduler.stats()
+            finally:
+                server.shutdown()
+            report[experiment][name] = result
+            print(f"{experiment} / {name}: {100 * result['success_rate']:.1f}% ok, p50 {result.get('p50_ms', 0):.0f}ms, "
+                  f"p99 {result.get('p99_ms', 0):.0f}ms, {result['calls_per_s']:.1f} calls/s")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the rate-limit-aware LLM scheduler against a flaky stub")
+    parser.add_argument("--calls", type=int, default=900)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rpm", type=int, default=600,
+                        help="Stub rate limit (one minute's burst, then rpm/60 per second), also the scheduler's budget")
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.02, help="Fraction of stub calls failing with 503")
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="Fraction of stub calls taking --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=1.5)
+    parser.add_argument("--hedge-after", type=float, default=0.3, help="Seconds before a duplicate request is sent")
+    parser.add_argument("--output", default="bench_scheduler_results.json")
+    args = parser.parse_args()
+
+    report = run(args.calls, args.concurrency, args.rpm, args.latency, args.error_rate,
+                 args.slow_rate, args.slow_latency, args.hedge_after)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import json
+import shutil
+import tempfile
+import time
+
+from openai import OpenAI
+
+from benchmark import COLLECTION_NAME, build_corpus, make_claims, summarize
+from fact_checker import FactChecker
+from stub_llm import start_stub_server
+
+# Time to first verdict vs time to full result for verify_single_claim, with
+# and without streaming, against the local stub LLM. The stub's per-word delay
+# stands in for generation speed; the fast path is off so every claim reaches
+# the LLM.
+
+
+def measure(checker, claims, retrieved, stream):
+    first_verdict, full = [], []
+    for claim, hits in zip(claims, retrieved):
+        start = time.perf_counter()
+        seen = []
+
+        def on_update(partial):
+            if not seen:
+                seen.append(time.perf_counter() - start)
+
+        checker.verify_single_claim(claim, 0.0, hits, on_update=on_update if stream else None)
+        elapsed = time.perf_counter() - start
+        full.append(elapsed)
+        # Without streaming the verdict is only known once the whole reply is parsed
+        first_verdict.append(seen[0] if seen else elapsed)
+    return {"time_to_first_verdict": summarize(first_verdict), "time_to_full_result": summarize(full)}
+
+
+def run(claim_count, latency, token_delay):
+    server, base_url = start_stub_server(latency=latency, token_delay=token_delay)
+    workdir = tempfile.mkdtemp(prefix="fc_bench_streaming_")
+    try:
+        sample = build_corpus(workdir, 1000)
+        checker = FactChecker(
+            chroma_path=workdir,
+            collection_name=COLLECTION_NAME,
+            groq_client=OpenAI(api_key="stub", base_url=base_url),
+            max_workers=1,
+            fast_path=False
+        )
+        claims = make_claims(sample, claim_count)
+        retrieved = checker.retrieve(claims)
+        report = {
+            "claims": claim_count,
+            "latency": latency,
+            "token_delay": token_delay,
+            "non_streaming": measure(checker, claims, retrieved, stream=False),
+            "streaming": measure(checker, claims, retrieved, stream=True)
+        }
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+    for mode in ("non_streaming", "streaming"):
+        print(f"{mode}: first verdict p50 {report[mode]['time_to_first_verdict']['p50_ms']:.0f}ms, "
+              f"full result p50 {report[mode]['time_to_full_result']['p50_ms']:.0f}ms")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to first verdict with and without LLM streaming")
+    parser.add_argument("--claims", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub time to first token in seconds")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Stub seconds per generated word")
+    parser.add_argument("--output", default="bench_streaming_results.json")
+    args = parser.parse_args()
+
+    report = run(args.claims, args.latency, args.token_delay)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
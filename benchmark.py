@@ -0,0 +1,212 @@
+import argparse
+import json
+import math
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import OpenAI
+
+import registry
+from fact_checker import FactChecker, build_claim_prompt, robust_json_extractor
+from metrics import Metrics
+from stub_llm import start_stub_server
+
+# Offline benchmark of the verification pipeline: a synthetic pib_titles
+# collection of configurable size, a local stub LLM with configurable latency,
+# and per-stage p50/p95/p99 latencies plus end-to-end throughput per
+# concurrency level. Results are written as JSON so runs can be diffed.
+
+COLLECTION_NAME = "pib_titles"
+MINISTRIES = ["Finance", "Defence", "Railways", "Health and Family Welfare", "Education", "Home Affairs",
+              "External Affairs", "Agriculture", "Road Transport and Highways", "Power", "Jal Shakti"]
+ACTIONS = ["launches", "approves", "inaugurates", "reviews", "announces", "signs MoU for", "releases funds for"]
+SUBJECTS = ["national mission", "rural housing scheme", "bridge project", "digital payments drive",
+            "vaccination campaign", "skill development programme", "solar park", "metro rail corridor"]
+PLACES = ["Assam", "Gujarat", "Kerala", "New Delhi", "Uttar Pradesh", "Tamil Nadu", "Odisha", "Punjab",
+          "Maharashtra", "Bihar", "Ladakh", "Manipur"]
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September",
+          "October", "November", "December"]
+
+
+def synthetic_title(rng):
+    return (f"Ministry of {rng.choice(MINISTRIES)} {rng.choice(ACTIONS)} {rng.choice(SUBJECTS)} "
+            f"worth Rs {rng.randint(1, 999)} crore in {rng.choice(PLACES)} on "
+            f"{rng.randint(1, 28)} {rng.choice(MONTHS)} {rng.randint(2015, 2025)}")
+
+
+def build_corpus(chroma_path, size, seed=0, batch_size=5000):
+    """Create a synthetic pib_titles collection with size titles; returns a sample of them"""
+    rng = random.Random(seed)
+    client = registry.get_chroma_client(chroma_path)
+    collection = client.get_or_create_collection(
+        name=COLLECTION_NAME,
+        embedding_function=registry.get_embedding_function()
+    )
+    sample = []
+    for start in range(0, size, batch_size):
+        titles = [synthetic_title(rng) for _ in range(min(batch_size, size - start))]
+        collection.add(
+            ids=[f"title_{start + i}" for i in range(len(titles))],
+            documents=titles,
+            metadatas=[{"source": f"https://pib.gov.in/synthetic/{start + i}"} for i in range(len(titles))]
+        )
+        if len(sample) < 1000:
+            sample.extend(titles[:1000 - len(sample)])
+    return sample
+
+
+def make_claims(sample, count, seed=1):
+    """Mix of verbatim titles, titles with the place swapped, and unrelated text"""
+    rng = random.Random(seed)
+    claims = []
+    for i in range(count):
+        title = rng.choice(sample)
+        kind = i % 3
+        if kind == 0:
+            claims.append(title)
+        elif kind == 1:
+            place = next(p for p in PLACES if f"in {p} on" in title)
+            claims.append(title.replace(f"in {place}", f"in {rng.choice([p for p in PLACES if p != place])}"))
+        else:
+            claims.append(f"Prime Minister Modi announced a new {rng.choice(SUBJECTS)} in {rng.choice(PLACES)}")
+    return claims
+
+
+def summarize(samples):
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pct(p):
+        # Nearest-rank percentile
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": 1000 * sum(ordered) / len(ordered),
+        "p50_ms": 1000 * pct(50),
+        "p95_ms": 1000 * pct(95),
+        "p99_ms": 1000 * pct(99)
+    }
+
+
+def timed(stages, name, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    stages.setdefault(name, []).append(time.perf_counter() - start)
+    return result
+
+
+def measure_stages(checker, claims):
+    """Run each pipeline stage on its own for every claim and time it"""
+    stages = {}
+    embed = registry.get_embedding_function()
+    for claim in claims:
+        entities = timed(stages, "ner", checker.extract_entities, claim)
+        queries = [claim] + [entity_text for entity_text, _ in entities]
+        embeddings = timed(stages, "embedding", embed, queries)
+        results = timed(stages, "vector_query", checker.collection.query,
+                        query_embeddings=embeddings, n_results=3,
+                        include=["documents", "metadatas", "distances"])
+        evidence_str = "\n".join(
+            f'- "{doc}" (Source: {meta.get("source", "Unknown source")}, Similarity: {1 - distance / 2:.2f})'
+            for doc, meta, distance in zip(results["documents"][0], results["metadatas"][0], results["distances"][0])
+        )
+        prompt = timed(stages, "prompt_build", build_claim_prompt, claim, evidence_str)
+        content = timed(stages, "llm", checker._complete,
+                        messages=[{"role": "user", "content": prompt}], temperature=0.1, max_tokens=400)
+        timed(stages, "json_extract", robust_json_extractor, content)
+    return {name: summarize(samples) for name, samples in stages.items()}
+
+
+def measure_end_to_end(checker, claims, concurrency):
+    latencies = []
+
+    def run(claim):
+        start = time.perf_counter()
+        checker.verify_claim(claim)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(run, claims))
+    elapsed = time.perf_counter() - start
+    return {**summarize(latencies), "throughput_rps": len(claims) / elapsed if elapsed else 0.0}
+
+
+def run_benchmark(sizes, concurrency_levels, requests, latency, jitter, workers, batch_entities=False):
+    server, base_url = start_stub_server(latency=latency, jitter=jitter)
+    groq_client = OpenAI(api_key="stub", base_url=base_url)
+    results = {
+        "config": {"sizes": sizes, "concurrency": concurrency_levels, "requests": requests,
+                   "llm_latency_s": latency, "llm_jitter_s": jitter, "workers": workers,
+                   "batch_entities": batch_entities},
+        "runs": []
+    }
+    try:
+        for size in sizes:
+            chroma_path = tempfile.mkdtemp(prefix="bench_chroma_")
+            try:
+                start = time.perf_counter()
+                sample = build_corpus(chroma_path, size)
+                build_seconds = time.perf_counter() - start
+                metrics = Metrics(enabled=True)
+                checker = FactChecker(chroma_path, COLLECTION_NAME, groq_client, max_workers=workers,
+                                      metrics=metrics, batch_entities=batch_entities)
+                claims = make_claims(sample, requests)
+
+                run = {
+                    "corpus_size": size,
+                    "build_seconds": build_seconds,
+                    "stages": measure_stages(checker, claims),
+                    "end_to_end": {}
+                }
+                for concurrency in concurrency_levels:
+                    run["end_to_end"][str(concurrency)] = measure_end_to_end(checker, claims, concurrency)
+                # LLM calls and token usage across all runs for this corpus size
+                run["counters"] = metrics.snapshot()["counters"]
+                results["runs"].append(run)
+                print_run(run)
+            finally:
+                shutil.rmtree(chroma_path, ignore_errors=True)
+    finally:
+        server.shutdown()
+    return results
+
+
+def print_run(run):
+    print(f"\n=== corpus size {run['corpus_size']} (built in {run['build_seconds']:.1f}s) ===")
+    for name, stats in run["stages"].items():
+        print(f"{name:>14}: p50 {stats['p50_ms']:8.2f} ms  p95 {stats['p95_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms")
+    for concurrency, stats in run["end_to_end"].items():
+        print(f"  concurrency {concurrency:>3}: p50 {stats['p50_ms']:8.1f} ms  p99 {stats['p99_ms']:8.1f} ms  "
+              f"{stats['throughput_rps']:6.2f} req/s")
+    counters = run.get("counters", {})
+    print(f"  LLM calls {counters.get('llm_calls', 0)}, prompt tokens {counters.get('llm_prompt_tokens', 0)}, "
+          f"completion tokens {counters.get('llm_completion_tokens', 0)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the fact-checking pipeline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Corpus sizes (titles)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Concurrent requests")
+    parser.add_argument("--requests", type=int, default=50, help="Claims per measurement")
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub LLM mean latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Stub LLM latency jitter (s)")
+    parser.add_argument("--workers", type=int, default=4, help="FactChecker max_workers")
+    parser.add_argument("--batch-entities", action="store_true", help="Verify entities with one LLM call per request")
+    parser.add_argument("--output", default="bench_results.json", help="JSON results file")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes, args.concurrency, args.requests, args.latency, args.jitter, args.workers,
+                            args.batch_entities)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import csv
+import heapq
+import math
+import os
+import threading
+
+from fast_path import normalize, STOPWORDS
+
+# In-process BM25 inverted index over the PIB titles, used alongside Chroma so
+# exact names and numbers rank even when MiniLM similarity misses them. Document
+# text and metadata stay in Chroma; the index only maps terms to Chroma ids.
+
+TITLES_CSV = "data/pib_titles.csv"
+
+
+def tokenize(text):
+    return [token for token in normalize(text).split() if token not in STOPWORDS]
+
+
+class BM25Index:
+    def __init__(self, k1=1.5, b=0.75, min_idf=0.05):
+        self.k1 = k1
+        self.b = b
+        self.min_idf = min_idf
+        self.postings = {}      # term -> {doc index: term frequency}
+        self.doc_ids = []
+        self.doc_lengths = []
+        self.total_length = 0
+        self._index_of = {}
+        self._impact_cache = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def add(self, doc_id, text):
+        """Index one document; ids already present are skipped. Returns True if added."""
+        tokens = tokenize(text)
+        with self._lock:
+            if doc_id in self._index_of:
+                return False
+            index = len(self.doc_ids)
+            self._index_of[doc_id] = index
+            self.doc_ids.append(doc_id)
+            self.doc_lengths.append(len(tokens))
+            self.total_length += len(tokens)
+            self._impact_cache.clear()
+            for token in tokens:
+                postings = self.postings.setdefault(token, {})
+                postings[index] = postings.get(index, 0) + 1
+        return True
+
+    def update_from_csv(self, path=TITLES_CSV):
+        """Add every title in the scraped CSV that is not indexed yet; returns how many were added"""
+        from scrape_chroma import title_id
+        if not os.path.exists(path):
+            return 0
+        added = 0
+        with open(path, newline='', encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                title = row.get("title", "")
+                if title and self.add(title_id(title), title):
+                    added += 1
+        return added
+
+    @classmethod
+    def from_csv(cls, path=TITLES_CSV, **params):
+        index = cls(**params)
+        index.update_from_csv(path)
+        return index
+
+    def _impacts(self, term):
+        """Per-document BM25 term weight (without idf), cached until the next add()"""
+        impacts = self._impact_cache.get(term)
+        if impacts is None:
+            avg_length = self.total_length / len(self.doc_ids)
+            impacts = [
+                (index, tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * self.doc_lengths[index] / avg_length)))
+                for index, tf in self.postings[term].items()
+            ]
+            self._impact_cache[term] = impacts
+        return impacts
+
+    def search(self, query, k=10):
+        """Top-k (doc_id, score) by BM25"""
+        terms = set(tokenize(query))
+        with self._lock:
+            count = len(self.doc_ids)
+            if not count or not terms:
+                return []
+            scores = {}
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                # Terms in nearly every document barely change the ranking but cost a full scan
+                if idf < self.min_idf:
+                    continue
+                for index, impact in self._impacts(term):
+                    scores[index] = scores.get(index, 0.0) + idf * impact
+            top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [(self.doc_ids[index], score) for index, score in top]
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Fuse several ranked id lists; returns ids ordered by summed 1 / (k + rank)"""
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda doc_id: -scores[doc_id])
@@ -0,0 +1,213 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+# Chunked, streaming encryption shared by encrypt_chroma.py and decrypt_chroma.py.
+#
+# File format: MAGIC, then a 4-byte big-endian plaintext chunk size, then one
+# record per chunk: 4-byte big-endian token length followed by the Fernet token.
+# Each token encrypts an 8-byte chunk index and a last-chunk flag ahead of the
+# chunk, so decryption rejects reordered, duplicated or missing chunks and a
+# file cut off at a chunk boundary (an empty file is one empty last chunk).
+# Memory per file is bounded by the chunk size. Files written by the previous
+# single-token scripts (no MAGIC) are still decrypted.
+#
+# The manifest records a keyed hash of every plaintext chunk, so a re-encrypt
+# copies the existing token of every unchanged chunk instead of re-encrypting it,
+# and a decrypt skips files whose plaintext is already up to date.
+
+MAGIC = b"FCHUNK2\n"
+UNSEQUENCED_MAGIC = b"FCHUNK1\n"  # chunks without index / last flag; no longer accepted
+CHUNK_SIZE = 1024 * 1024
+MANIFEST_FILE = "app/chroma_manifest.json"
+_LENGTH = struct.Struct(">I")
+_CHUNK_HEADER = struct.Struct(">QB")  # chunk index, 1 if last
+
+
+def digest_key(key):
+    """Key for the manifest's chunk digests, derived from the Fernet key rather than reusing it"""
+    return HKDF(algorithm=hashes.SHA256(), length=32, salt=None,
+                info=b"chroma-manifest-chunk-digest").derive(base64.urlsafe_b64decode(key))
+
+
+def chunk_digest(hash_key, chunk):
+    # Keyed so the manifest does not let anyone confirm guesses about the plaintext
+    return hmac.new(hash_key, chunk, hashlib.sha256).hexdigest()
+
+
+def _read_chunks(f, chunk_size):
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _with_last(chunks):
+    """(chunk, is_last) pairs; an empty file is a single empty last chunk"""
+    previous = None
+    for chunk in chunks:
+        if previous is not None:
+            yield previous, False
+        previous = chunk
+    yield (previous if previous is not None else b""), True
+
+
+def _read_records(f):
+    """Yield the Fernet tokens of a chunked .enc file positioned after its header"""
+    while True:
+        header = f.read(_LENGTH.size)
+        if not header:
+            return
+        if len(header) < _LENGTH.size:
+            raise ValueError("truncated record header")
+        (length,) = _LENGTH.unpack(header)
+        yield f.read(length)
+
+
+def _plaintext_digests(hash_key, path, chunk_size):
+    with open(path, "rb") as f:
+        return [chunk_digest(hash_key, chunk) for chunk, _ in _with_last(_read_chunks(f, chunk_size))]
+
+
+def encrypt_file(key, path, previous=None, chunk_size=CHUNK_SIZE):
+    """
+    Encrypt path to path + ".enc" chunk by chunk and remove the plaintext.
+    previous is this file's manifest entry from the last run; chunks whose digest
+    is unchanged reuse the existing token. Returns the new manifest entry.
+    """
+    fernet = Fernet(key)
+    hash_key = digest_key(key)
+    enc_path = f"{path}.enc"
+    tmp_path = f"{enc_path}.tmp"
+    old_digests = []
+    if previous and previous.get("chunk_size") == chunk_size and os.path.exists(enc_path):
+        old_digests = previous.get("chunks", [])
+
+    digests = []
+    reused = 0
+    old_file = open(enc_path, "rb") if old_digests else None
+    try:
+        old_records = None
+        if old_file is not None:
+            if old_file.read(len(MAGIC)) == MAGIC:
+                old_file.read(_LENGTH.size)
+                old_records = _read_records(old_file)
+        with open(path, "rb") as src, open(tmp_path, "wb") as dst:
+            dst.write(MAGIC)
+            dst.write(_LENGTH.pack(chunk_size))
+            for i, (chunk, last) in enumerate(_with_last(_read_chunks(src, chunk_size))):
+                digest = chunk_digest(hash_key, chunk)
+                old_token = next(old_records, None) if old_records is not None else None
+                # An old token also fixes its index and last flag: reusable only at the same position
+                if (old_token and i < len(old_digests) and old_digests[i] == digest
+                        and (i == len(old_digests) - 1) == last):
+                    token = old_token
+                    reused += 1
+                else:
+                    token = fernet.encrypt(_CHUNK_HEADER.pack(i, last) + chunk)
+                dst.write(_LENGTH.pack(len(token)))
+                dst.write(token)
+                digests.append(digest)
+    finally:
+        if old_file is not None:
+            old_file.close()
+
+    os.replace(tmp_path, enc_path)
+    os.remove(path)
+    return {"chunk_size": chunk_size, "chunks": digests, "reused": reused}
+
+
+def decrypt_file(key, enc_path, expected=None, keep_encrypted=True):
+    """
+    Decrypt enc_path next to itself. Skips the work when the plaintext already
+    matches the manifest entry. Returns True if the file was (re)written.
+    Raises ValueError (or InvalidToken) for chunks out of sequence, a missing
+    last chunk or data after it; the existing plaintext is then left alone.
+    """
+    fernet = Fernet(key)
+    path = enc_path[:-4]
+    if expected and os.path.exists(path):
+        if _plaintext_digests(digest_key(key), path, expected["chunk_size"]) == expected["chunks"]:
+            return False
+
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(enc_path, "rb") as src, open(tmp_path, "wb") as dst:
+            magic = src.read(len(MAGIC))
+            if magic == MAGIC:
+                src.read(_LENGTH.size)
+                _decrypt_records(fernet, src, dst)
+            elif magic == UNSEQUENCED_MAGIC:
+                raise ValueError("unsequenced chunk format; restore the plaintext and re-run encrypt_chroma.py")
+            else:
+                # Legacy single-token file from the old scripts
+                src.seek(0)
+                dst.write(fernet.decrypt(src.read()))
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    if not keep_encrypted:
+        os.remove(enc_path)
+    return True
+
+
+def _decrypt_records(fernet, src, dst):
+    """Write the chunks of src to dst, checking each token's index and that the last one ends the file"""
+    expected_index, finished = 0, False
+    for token in _read_records(src):
+        if finished:
+            raise ValueError(f"data after the last chunk ({expected_index} chunks)")
+        plaintext = fernet.decrypt(token)
+        index, last = _CHUNK_HEADER.unpack_from(plaintext)
+        if index != expected_index:
+            raise ValueError(f"chunk {index} found where chunk {expected_index} was expected")
+        dst.write(plaintext[_CHUNK_HEADER.size:])
+        expected_index += 1
+        finished = bool(last)
+    if not finished:
+        raise ValueError(f"truncated: no last chunk after {expected_index} chunks")
+
+
+def load_manifest(path=MANIFEST_FILE):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+def run_parallel(func, jobs, max_workers=None):
+    """Run func(*job) for every job across a process pool; yields (job, result or exception)"""
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            try:
+                yield job, func(*job)
+            except Exception as e:
+                yield job, e
+        return
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+        futures = [(job, pool.submit(func, *job)) for job in jobs]
+        for job, future in futures:
+            try:
+                yield job, future.result()
+            except Exception as e:
+                yield job, e
@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from fast_path import dates, normalize, numbers, polarity
+
+# Claim-level result cache keyed on the claim's query embedding. A reworded
+# claim whose embedding is within the cosine threshold of one verified earlier
+# (with the same confidence threshold, the same numbers, dates, negations,
+# names and places, and against the same corpus) gets the earlier verdict back,
+# with provenance, instead of paying for retrieval and an LLM call. Search is an
+# exact scan of a fixed-size float32 matrix, which at a few thousand entries
+# takes well under a millisecond.
+
+
+FACT_ENTITY_LABELS = {"PERSON", "ORG", "GPE", "LOC"}
+
+
+def _facts(claim, entities=()):
+    """
+    Numbers, dates, negation / polarity markers and the people, organisations
+    and places (from the claim's spaCy entities) a reworded claim must keep to
+    count as the same claim ("X inaugurates Y" and "X never inaugurates Y", or
+    "Bridge inaugurated in Assam" and "... in Bihar", embed almost identically)
+    """
+    normalized = normalize(claim)
+    names = frozenset((ent.label_, normalize(ent.text)) for ent in entities or () if ent.label_ in FACT_ENTITY_LABELS)
+    return (frozenset(numbers(normalized)), frozenset(dates(normalized)), frozenset(polarity(normalized)),
+            names)
+
+
+class SemanticClaimCache:
+    def __init__(self, threshold=0.95, max_entries=5000):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._vectors = None  # allocated on the first add, once the dimension is known
+        self._entries = [None] * max_entries
+        self._lru = OrderedDict()  # slot -> None, least recently used first
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.audits = 0
+        self.disagreements = 0
+
+    def __len__(self):
+        return len(self._lru)
+
+    @staticmethod
+    def _unit(embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, claim, embedding, confidence_threshold, entities=()):
+        """
+        The cached result for a near-duplicate of claim (with "cached_from"
+        provenance), or None. entities are the claim's spaCy entities.
+        """
+        query = self._unit(embedding)
+        facts = _facts(claim, entities)
+        with self._lock:
+            if self._lru:
+                scores = self._vectors @ query
+                for slot in np.argsort(-scores):
+                    if scores[slot] < self.threshold:
+                        break
+                    entry = self._entries[slot]
+                    if entry is None or entry["confidence_threshold"] != confidence_threshold or entry["facts"] != facts:
+                        continue
+                    self._lru.move_to_end(slot)
+                    self.hits += 1
+                    return {**entry["result"], "cached_from": {
+                        "claim": entry["claim"],
+                        "similarity": float(scores[slot]),
+                        "verified_at": entry["verified_at"]
+                    }}
+            self.misses += 1
+            return None
+
+    def add(self, claim, embedding, confidence_threshold, result, entities=()):
+        """Remember a fresh verification; errors are never cached"""
+        if "error" in result or result.get("verdict") in (None, "Error"):
+            return
+        vector = self._unit(embedding)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot, _ = self._lru.popitem(last=False)
+                self.evictions += 1
+            self._vectors[slot] = vector
+            self._entries[slot] = {
+                "claim": claim,
+                "confidence_threshold": confidence_threshold,
+                "facts": _facts(claim, entities),
+                "result": result,
+                "verified_at": time.strftime("%Y-%m-%d %H:%M:%S")
+            }
+            self._lru[slot] = None
+
+    def clear(self):
+        """Drop every entry, e.g. after the corpus changed"""
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors[:] = 0  # empty slots never reach the threshold
+            self._entries = [None] * self.max_entries
+            self._lru.clear()
+            self._free = list(range(self.max_entries - 1, -1, -1))
+            self.invalidations += 1
+
+    def record_audit(self, cached_verdict, fresh_verdict):
+        with self._lock:
+            self.audits += 1
+            self.disagreements += cached_verdict != fresh_verdict
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._lru),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "audits": self.audits,
+                "disagreements": self.disagreements,
+                "disagreement_rate": self.disagreements / self.audits if self.audits else 0.0
+            }
@@ -0,0 +1,169 @@
+import re
+import threading
+import time
+
+import registry
+
+# Claim extraction stage between NER and retrieval: splits the user's input into
+# the claims that are retrieved and verified one by one. SentenceClaimExtractor
+# (the default) reuses the sentence boundaries of the spaCy parse already made
+# for NER. T5ClaimExtractor runs the Babelscape seq2seq claim extractor on CPU:
+# loaded on first use, fed length-sorted batches, generation capped.
+
+T5_CLAIM_MODEL = "Babelscape/t5-base-summarization-claim-extractor"
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _dedupe(claims):
+    """Drop empty and repeated claims (case-insensitive), keeping the first of each"""
+    seen, unique = set(), []
+    for claim in claims:
+        claim = claim.strip()
+        key = " ".join(claim.split()).casefold()
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(claim)
+    return unique
+
+
+class SentenceClaimExtractor:
+    """
+    One claim per sentence of at least min_words words. Input without such a
+    sentence (a short one-line claim) stays a single claim. Every sentence is
+    kept; FactChecker.max_claims decides how many are verified.
+    """
+
+    name = "sentences"
+
+    def __init__(self, min_words=4):
+        self.min_words = min_words
+
+    def sentences(self, text, doc=None):
+        if doc is not None and doc.has_annotation("SENT_START"):
+            return [sent.text.strip() for sent in doc.sents]
+        return _SENTENCE_END.split(text.strip())
+
+    def extract(self, text, doc=None):
+        claims = [sentence for sentence in self.sentences(text, doc) if len(sentence.split()) >= self.min_words]
+        return _dedupe(claims) or [text]
+
+    def extract_batch(self, texts, docs=None):
+        return [self.extract(text, doc) for text, doc in zip(texts, docs or [None] * len(texts))]
+
+    def stats(self):
+        return {"extractor": self.name}
+
+
+class T5ClaimExtractor:
+    """
+    Seq2seq claim extraction. Inputs longer than max_input_tokens are split on
+    sentence boundaries; the pieces of every input in a batch are sorted by
+    length and generated batch_size at a time, so little of each batch is
+    padding, with at most max_new_tokens per piece. One generate runs at a time.
+    An input the model finds no claim in is split into sentences instead.
+    """
+
+    name = "t5"
+
+    def __init__(self, model_name=T5_CLAIM_MODEL, batch_size=8, max_input_tokens=512, max_new_tokens=128,
+                 num_beams=1):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_input_tokens = max_input_tokens
+        self.max_new_tokens = max_new_tokens
+        self.num_beams = num_beams
+        self.segmenter = SentenceClaimExtractor(min_words=1)
+        self.fallback = SentenceClaimExtractor()
+        self._generate_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.pieces = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.generate_seconds = 0.0
+
+    def _model(self):
+        def load():
+            from transformers import T5ForConditionalGeneration, T5Tokenizer
+            tokenizer = T5Tokenizer.from_pretrained(self.model_name)
+            model = T5ForConditionalGeneration.from_pretrained(self.model_name).eval()
+            return tokenizer, model
+        return registry.get_or_load(f"claim_extractor:{self.model_name}", load)
+
+    def _pieces(self, text, doc, tokenizer):
+        """Sentence-aligned (piece, token count) pairs of at most max_input_tokens tokens each"""
+        pieces, current, length = [], [], 0
+        for sentence in self.segmenter.sentences(text, doc):
+            count = len(tokenizer.tokenize(sentence))
+            if current and length + count > self.max_input_tokens:
+                pieces.append((" ".join(current), length))
+                current, length = [], 0
+            current.append(sentence)
+            length += count
+        if current:
+            pieces.append((" ".join(current), length))
+        return pieces
+
+    def extract(self, text, doc=None):
+        return self.extract_batch([text], [doc])[0]
+
+    def extract_batch(self, texts, docs=None):
+        import torch
+        tokenizer, model = self._model()
+        docs = docs or [None] * len(texts)
+        pieces = [
+            (index, piece, length)
+            for index, (text, doc) in enumerate(zip(texts, docs))
+            for piece, length in self._pieces(text, doc, tokenizer)
+        ]
+        decoded = [None] * len(pieces)
+        # Length buckets: neighbours in this order pad to nearly the same length
+        order = sorted(range(len(pieces)), key=lambda position: pieces[position][2])
+        for start in range(0, len(order), self.batch_size):
+            positions = order[start:start + self.batch_size]
+            encoded = tokenizer([pieces[position][1] for position in positions], return_tensors="pt",
+                                padding=True, truncation=True, max_length=self.max_input_tokens)
+            with self._generate_lock, torch.inference_mode():
+                started = time.perf_counter()
+                generated = model.generate(**encoded, max_new_tokens=self.max_new_tokens, num_beams=self.num_beams)
+                elapsed = time.perf_counter() - started
+            with self._stats_lock:
+                self.batches += 1
+                self.pieces += len(positions)
+                self.input_tokens += int(encoded["attention_mask"].sum())
+                self.output_tokens += int((generated != tokenizer.pad_token_id).sum())
+                self.generate_seconds += elapsed
+            for position, output in zip(positions, tokenizer.batch_decode(generated, skip_special_tokens=True)):
+                decoded[position] = output
+
+        claims = [[] for _ in texts]
+        for (index, _, _), output in zip(pieces, decoded):
+            claims[index].extend(self.segmenter.sentences(output))
+        return [
+            _dedupe(found) or self.fallback.extract(text, doc)
+            for found, text, doc in zip(claims, texts, docs)
+        ]
+
+    def stats(self):
+        load = registry.report().get(f"claim_extractor:{self.model_name}", {})
+        with self._stats_lock:
+            return {
+                "extractor": self.name,
+                "load_seconds": load.get("load_seconds", 0.0),
+                "load_rss_bytes": load.get("rss_delta_bytes", 0),
+                "batches": self.batches,
+                "pieces": self.pieces,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "generate_seconds": self.generate_seconds
+            }
+
+
+def make_claim_extractor(kind="sentences", **params):
+    """Extractor by name, as selected in app.py / api_server.py"""
+    if kind == "sentences":
+        return SentenceClaimExtractor(**params)
+    if kind == "t5":
+        return T5ClaimExtractor(**params)
+    raise ValueError(f"Unknown claim extractor: {kind}")
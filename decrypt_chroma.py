@@ -1,35 +1,40 @@
 import os
-from cryptography.fernet import Fernet
+import argparse
+from chroma_crypto import decrypt_file, load_manifest, save_manifest, run_parallel, MANIFEST_FILE
 
 KEY_FILE = "app/chroma_key.key"
 CHROMA_PATH = "app/chroma_db"
 
-def decrypt_chroma_files():
+def decrypt_chroma_files(chroma_path=CHROMA_PATH, manifest_file=MANIFEST_FILE, max_workers=None):
     # Load key
     with open(KEY_FILE, "rb") as f:
         key = f.read()
-    fernet = Fernet(key)
-    
-    # Decrypt all .enc files
-    for root, _, files in os.walk(CHROMA_PATH):
+    manifest = load_manifest(manifest_file)
+
+    # Decrypt all .enc files; .enc copies are kept so the next encrypt pass can reuse unchanged chunks
+    jobs = []
+    for root, _, files in os.walk(chroma_path):
         for file in files:
             if not file.endswith(".enc"):
                 continue
-                
             encrypted_path = os.path.join(root, file)
-            original_path = encrypted_path[:-4]  # Remove .enc
-            
-            try:
-                with open(encrypted_path, "rb") as f:
-                    encrypted_data = f.read()
-                decrypted_data = fernet.decrypt(encrypted_data)
-                with open(original_path, "wb") as f:
-                    f.write(decrypted_data)
-                os.remove(encrypted_path)
-                print(f"Decrypted: {original_path}")
-            except Exception as e:
-                print(f"Error decrypting {encrypted_path}: {e}")
+            rel_path = os.path.relpath(encrypted_path[:-4], chroma_path)
+            jobs.append((key, encrypted_path, manifest.get(rel_path)))
+
+    for (_, encrypted_path, _), result in run_parallel(decrypt_file, jobs, max_workers):
+        if isinstance(result, Exception):
+            print(f"Error decrypting {encrypted_path}: {result}")
+        else:
+            print(f"{'Decrypted' if result else 'Unchanged'}: {encrypted_path[:-4]}")
+            entry = manifest.get(os.path.relpath(encrypted_path[:-4], chroma_path))
+            if entry is not None:
+                entry["decrypted"] = True
+
+    save_manifest(manifest, manifest_file)
 
 if __name__ == "__main__":
-    decrypt_chroma_files()
+    parser = argparse.ArgumentParser(description="Decrypt the ChromaDB directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+    decrypt_chroma_files(max_workers=args.workers)
     print("Decryption complete. ChromaDB ready for use.")
@@ -0,0 +1,90 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Shared query-embedding service. Concurrent callers (Streamlit sessions, API
+# requests) hand their one or two short strings to a single worker thread,
+# which gathers them for at most max_wait seconds or max_batch texts, runs one
+# batched encode and hands every caller back its own vectors.
+
+
+class MicroBatcher:
+    """
+    Drop-in for an embedding function: batcher(texts) -> one vector per text.
+    A request waits at most max_wait for company before its batch is encoded;
+    max_wait=0 only batches requests that queued while the previous encode ran.
+    """
+
+    def __init__(self, embed_fn, max_batch=32, max_wait=0.005):
+        self.embed_fn = embed_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def __call__(self, input):
+        return self.embed(input)
+
+    def embed(self, texts):
+        texts = list(texts)
+        if not texts:
+            return []
+        future = Future()
+        self._queue.put((texts, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, size = [first], len(first[0])
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._queue.put(None)  # finish this batch, stop on the next loop
+                    break
+                batch.append(request)
+                size += len(request[0])
+            self._encode(batch, size)
+
+    def _encode(self, batch, size):
+        try:
+            vectors = self.embed_fn([text for texts, _ in batch for text in texts])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        with self._lock:
+            self.batches += 1
+            self.items += size
+            self.largest_batch = max(self.largest_batch, size)
+        offset = 0
+        for texts, future in batch:
+            future.set_result(vectors[offset:offset + len(texts)])
+            offset += len(texts)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "queued": self._queue.qsize()
+            }
@@ -1,5 +1,7 @@
 import os
+import argparse
 from cryptography.fernet import Fernet
+from chroma_crypto import encrypt_file, load_manifest, save_manifest, run_parallel, MANIFEST_FILE
 
 KEY_FILE = "app/chroma_key.key"
 CHROMA_PATH = "app/chroma_db"
@@ -14,35 +16,50 @@ else:
     with open(KEY_FILE, "rb") as f:
         key = f.read()
 
-def encrypt_chroma_files():
+def encrypt_chroma_files(chroma_path=CHROMA_PATH, manifest_file=MANIFEST_FILE, max_workers=None):
     with open(KEY_FILE, "rb") as f:
         key = f.read()
-    fernet = Fernet(key)
+    manifest = load_manifest(manifest_file)
     encrypted_count = 0
     skipped_count = 0
+    reused_chunks = 0
 
-    for root, _, files in os.walk(CHROMA_PATH):
+    jobs = []
+    for root, _, files in os.walk(chroma_path):
         for file in files:
+            if file.endswith(".tmp"):
+                continue
             file_path = os.path.join(root, file)
             if file.endswith(".enc"):
+                # Plaintext was decrypted last time and has since been deleted by Chroma: drop the stale copy
+                rel_path = os.path.relpath(file_path[:-4], chroma_path)
+                if not os.path.exists(file_path[:-4]) and manifest.get(rel_path, {}).get("decrypted"):
+                    os.remove(file_path)
+                    del manifest[rel_path]
                 continue
-            try:
-                with open(file_path, "rb") as f:
-                    data = f.read()
-                encrypted = fernet.encrypt(data)
-                with open(f"{file_path}.enc", "wb") as f:
-                    f.write(encrypted)
-                os.remove(file_path)
-                print(f"Encrypted and removed: {file_path}")
-                encrypted_count += 1
-            except PermissionError:
-                print(f"Skipped (file in use): {file_path}")
-                skipped_count += 1
-            except Exception as e:
-                print(f"Error encrypting {file_path}: {e}")
-                skipped_count += 1
+            rel_path = os.path.relpath(file_path, chroma_path)
+            jobs.append((key, file_path, manifest.get(rel_path)))
+
+    # Files are encrypted in parallel, each streamed in fixed-size chunks
+    for (_, file_path, _), result in run_parallel(encrypt_file, jobs, max_workers):
+        if isinstance(result, PermissionError):
+            print(f"Skipped (file in use): {file_path}")
+            skipped_count += 1
+        elif isinstance(result, Exception):
+            print(f"Error encrypting {file_path}: {result}")
+            skipped_count += 1
+        else:
+            reused_chunks += result.pop("reused")
+            manifest[os.path.relpath(file_path, chroma_path)] = result
+            print(f"Encrypted and removed: {file_path}")
+            encrypted_count += 1
 
-    print(f"\nEncryption complete. {encrypted_count} files encrypted, {skipped_count} files skipped.")
+    save_manifest(manifest, manifest_file)
+    print(f"\nEncryption complete. {encrypted_count} files encrypted, {skipped_count} files skipped, "
+          f"{reused_chunks} unchanged chunks reused.")
 
 if __name__ == "__main__":
-    encrypt_chroma_files()
+    parser = argparse.ArgumentParser(description="Encrypt the ChromaDB directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+    encrypt_chroma_files(max_workers=args.workers)
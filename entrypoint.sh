@@ -1,15 +1,35 @@
 #!/bin/bash
 set -e
 
-# Optional: echo for debugging
-echo "Running scrape_chroma.py..."
-python scrape_chroma.py
+# BOOT_MODE=fast (default): if a persisted collection exists, serve it right away
+# and let the app scrape/ingest in the background. BOOT_MODE=full keeps the
+# original scrape -> encrypt -> decrypt sequence before starting.
+BOOT_MODE="${BOOT_MODE:-fast}"
 
-echo "Encrypting ChromaDB..."
-python encrypt_chroma.py
+if [ "$BOOT_MODE" = "fast" ] && [ -n "$(ls -A app/chroma_db 2>/dev/null)" ]; then
+    echo "Fast boot: serving last persisted ChromaDB, refreshing in the background..."
+    # The .enc copies are kept after every decrypt; only decrypt when the plaintext DB is missing
+    if [ ! -f app/chroma_db/chroma.sqlite3 ] && [ -n "$(find app/chroma_db -name '*.enc' -print -quit)" ]; then
+        echo "Decrypting ChromaDB..."
+        python decrypt_chroma.py
+    fi
+    export BACKGROUND_REFRESH=1
+else
+    # Optional: echo for debugging
+    echo "Running scrape_chroma.py..."
+    python scrape_chroma.py
 
-echo "Decrypting ChromaDB..."
-python decrypt_chroma.py
+    echo "Encrypting ChromaDB..."
+    python encrypt_chroma.py
+
+    echo "Decrypting ChromaDB..."
+    python decrypt_chroma.py
+fi
+
+# Only check the models are on disk (downloading the embedding model if needed);
+# serve.py loads them once, in the Streamlit process, as soon as it starts
+echo "Checking models..."
+python registry.py --prefetch
 
 echo "Starting Streamlit app..."
-streamlit run app.py --server.port=8501 --server.address=0.0.0.0
+python serve.py --server.port=8501 --server.address=0.0.0.0
@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import random
+
+from dotenv import load_dotenv
+
+import registry
+from claim_cache import SemanticClaimCache
+from eval_fast_path import CHROMA_PATH, COLLECTION_NAME, read_labeled
+from fact_checker import FactChecker
+
+load_dotenv()
+
+# Replays a stream of claims (e.g. a day of user input, with its rewordings)
+# through a FactChecker with the semantic claim cache, and re-verifies a sample
+# of the cache hits without it to see how often the reused verdict differs.
+
+
+def evaluate(cached_checker, fresh_checker, claims, confidence_threshold=0.5, audit_rate=0.2, seed=0):
+    rng = random.Random(seed)
+    report = {"inputs": 0, "claims": 0, "hits": 0, "audited": 0, "disagreements": []}
+    for text in claims:
+        if not text.strip():
+            continue
+        report["inputs"] += 1
+        # An input can hold several claims; every one of them is a cache lookup
+        for result in cached_checker.verify_claim(text, confidence_threshold)["claims"]:
+            report["claims"] += 1
+            if "cached_from" not in result:
+                continue
+            report["hits"] += 1
+            if rng.random() >= audit_rate:
+                continue
+            report["audited"] += 1
+            fresh = fresh_checker.verify_single_claim(result["claim"], confidence_threshold)
+            if fresh.get("verdict") != result["verdict"]:
+                report["disagreements"].append({
+                    "claim": result["claim"],
+                    "input": text,
+                    "cached_from": result["cached_from"]["claim"],
+                    "similarity": result["cached_from"]["similarity"],
+                    "cached": result["verdict"],
+                    "fresh": fresh.get("verdict")
+                })
+    report["hit_rate"] = report["hits"] / report["claims"] if report["claims"] else 0.0
+    report["disagreement_rate"] = len(report["disagreements"]) / report["audited"] if report["audited"] else 0.0
+    report["cache"] = cached_checker.claim_cache.stats()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure semantic claim cache hit rate and verdict disagreement")
+    parser.add_argument("input", help=".csv or .jsonl of claims in arrival order")
+    parser.add_argument("--text-field", default="claim")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Confidence threshold")
+    parser.add_argument("--similarity", type=float, default=0.95, help="Cache cosine similarity threshold")
+    parser.add_argument("--audit-rate", type=float, default=0.2, help="Share of hits re-verified without the cache")
+    parser.add_argument("--llm-base-url", default=os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1"))
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    llm_client = registry.get_llm_client(args.llm_base_url)
+    cached_checker = FactChecker(CHROMA_PATH, COLLECTION_NAME, llm_client,
+                                 claim_cache=SemanticClaimCache(threshold=args.similarity))
+    fresh_checker = FactChecker(CHROMA_PATH, COLLECTION_NAME, llm_client)
+    claims = (claim for claim, _ in read_labeled(args.input, args.text_field))
+    report = evaluate(cached_checker, fresh_checker, claims, args.threshold, args.audit_rate)
+
+    print(f"Inputs: {report['inputs']}, claims: {report['claims']}, "
+          f"cache hits: {report['hits']} ({report['hit_rate']:.1%}), "
+          f"disagreement on {report['audited']} audited hits: {report['disagreement_rate']:.1%}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
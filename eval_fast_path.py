@@ -0,0 +1,139 @@
+import argparse
+import csv
+import json
+import os
+
+from dotenv import load_dotenv
+from openai import OpenAI
+
+from fact_checker import FactChecker
+from fast_path import pre_verify
+
+load_dotenv()
+
+CHROMA_PATH = "app/chroma_db"
+COLLECTION_NAME = "pib_titles"
+
+
+# Built-in labelled regression set, checked against pre_verify directly (no index, no LLM):
+# (claim, top evidence title, similarity, rule expected or None when the LLM must decide[, other retrieved titles])
+_TITLE = ("Prime Minister inaugurates AIIMS Bilaspur worth Rs 1470 crore in Himachal Pradesh "
+          "on 5 October 2022")
+_GST = "GST revenue collection of Rs {} lakh crore in {} 2024"
+REGRESSION_CASES = [
+    (_TITLE, _TITLE, 0.99, "near_verbatim"),
+    (_TITLE.replace("1470", "1700"), _TITLE, 0.97, "contradiction"),
+    # Negated rewordings share every other token with the title
+    (_TITLE.replace("inaugurates", "never inaugurates"), _TITLE, 0.95, None),
+    (_TITLE.replace("inaugurates", "does not inaugurate"), _TITLE, 0.93, None),
+    (_TITLE.replace("inaugurates", "didn't inaugurate"), _TITLE, 0.93, None),
+    (_TITLE.replace("1470", "1700").replace("inaugurates", "never inaugurates"), _TITLE, 0.94, None),
+    ("Government inaugurates AIIMS Bilaspur in Himachal Pradesh",
+     "Government denies it inaugurates AIIMS Bilaspur in Himachal Pradesh", 0.92, None),
+    # A claim repeating only part of the title is not a restatement of it
+    ("Prime Minister inaugurates AIIMS Bilaspur", _TITLE, 0.85, None),
+    # Monthly releases: a lower-ranked title with the claim's figure means no contradiction
+    (_GST.format("1.78", "April"), _GST.format("1.73", "May"), 0.96, None, [_GST.format("1.78", "April")]),
+    (_GST.format("1.78", "April"), _GST.format("1.73", "May"), 0.96, "contradiction", [_GST.format("1.68", "March")])
+]
+
+
+def check_regressions(cases=REGRESSION_CASES):
+    """Failures of pre_verify on the built-in labelled cases (empty when all pass)"""
+    failures = []
+    for claim, evidence, similarity, expected, *other in cases:
+        decision = pre_verify(claim, evidence, similarity, other_evidence=other[0] if other else ())
+        rule = decision["rule"] if decision else None
+        if rule != expected:
+            failures.append({"claim": claim, "expected": expected, "got": rule})
+    return failures
+
+
+def read_labeled(path, text_field="claim", label_field="label"):
+    """Yield (claim, label) pairs from a CSV or JSONL file; label may be empty"""
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield record.get(text_field, ""), record.get(label_field, "")
+    else:
+        with open(path, newline='', encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                yield row.get(text_field, ""), row.get(label_field, "")
+
+
+def evaluate(fast_checker, llm_checker, records, confidence_threshold=0.5):
+    """
+    Run every claim through the fast path. For claims it settles, also ask the
+    LLM, and compare both with each other and with the label
+    """
+    report = {"claims": 0, "fast_path_hits": 0, "by_rule": {},
+              "llm_agreement": 0, "fast_path_correct": 0, "llm_correct": 0, "labeled_hits": 0}
+    disagreements = []
+    for claim, label in records:
+        if not claim.strip():
+            continue
+        report["claims"] += 1
+        fast = fast_checker.verify_single_claim(claim, confidence_threshold)
+        if "fast_path" not in fast:
+            continue
+        report["fast_path_hits"] += 1
+        report["by_rule"][fast["fast_path"]] = report["by_rule"].get(fast["fast_path"], 0) + 1
+        llm = llm_checker.verify_single_claim(claim, confidence_threshold)
+        if llm.get("verdict") == fast["verdict"]:
+            report["llm_agreement"] += 1
+        else:
+            disagreements.append({"claim": claim, "fast_path": fast["verdict"],
+                                  "llm": llm.get("verdict"), "label": label})
+        if label:
+            report["labeled_hits"] += 1
+            report["fast_path_correct"] += fast["verdict"] == label
+            report["llm_correct"] += llm.get("verdict") == label
+
+    hits = report["fast_path_hits"]
+    report["hit_rate"] = hits / report["claims"] if report["claims"] else 0.0
+    report["llm_agreement_rate"] = report["llm_agreement"] / hits if hits else 0.0
+    if report["labeled_hits"]:
+        report["fast_path_accuracy"] = report["fast_path_correct"] / report["labeled_hits"]
+        report["llm_accuracy_on_hits"] = report["llm_correct"] / report["labeled_hits"]
+    report["disagreements"] = disagreements
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure fast-path hit rate and agreement with LLM verdicts")
+    parser.add_argument("input", nargs="?",
+                        help="Labeled .csv or .jsonl with claim and label (True/False/Unverifiable); "
+                             "without it only the built-in regression cases are checked")
+    parser.add_argument("--text-field", default="claim")
+    parser.add_argument("--label-field", default="label")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    failures = check_regressions()
+    print(f"Regression cases: {len(REGRESSION_CASES) - len(failures)}/{len(REGRESSION_CASES)} pass")
+    for failure in failures:
+        print(f"  expected {failure['expected']}, got {failure['got']}: {failure['claim']}")
+    if not args.input:
+        raise SystemExit(1 if failures else 0)
+
+    groq_client = OpenAI(api_key=os.getenv("GROQ_API_KEY"), base_url="https://api.groq.com/openai/v1")
+    fast_checker = FactChecker(CHROMA_PATH, COLLECTION_NAME, groq_client, fast_path=True)
+    llm_checker = FactChecker(CHROMA_PATH, COLLECTION_NAME, groq_client, fast_path=False)
+    report = evaluate(fast_checker, llm_checker,
+                      read_labeled(args.input, args.text_field, args.label_field), args.threshold)
+
+    print(f"Claims: {report['claims']}, fast-path hits: {report['fast_path_hits']} ({report['hit_rate']:.1%}), "
+          f"agreement with LLM: {report['llm_agreement_rate']:.1%}")
+    if "fast_path_accuracy" in report:
+        print(f"On labeled hits: fast path accuracy {report['fast_path_accuracy']:.1%}, "
+              f"LLM accuracy {report['llm_accuracy_on_hits']:.1%}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
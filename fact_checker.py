@@ -1,14 +1,23 @@
 import os
-import chromadb
-from chromadb.utils import embedding_functions
 import json
 import re
 from openai import OpenAI
 import re
 import json
-import spacy
-from transformers import T5ForConditionalGeneration, T5Tokenizer
-from transformers import pipeline  
+from collections import deque
+import contextvars
+import queue
+import random
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+import registry
+from bm25 import reciprocal_rank_fusion
+from claim_extraction import SentenceClaimExtractor
+from fast_path import pre_verify
+from json_stream import IncrementalJSONParser
+from llm_scheduler import CancelScope, Cancelled, LLMScheduler
+from metrics import Metrics, collect_request_timings
+from retrieval import ChromaBackend
 
 def robust_json_extractor(response_content):
     # Preprocess: Remove markdown code blocks and extra whitespace
@@ -48,65 +57,8 @@ def robust_json_extractor(response_content):
         except:
             return {"error": "Failed to extract required keys", "raw": cleaned}
 
-class FactChecker:
-    def __init__(self, chroma_path, collection_name, groq_client):
-        self.client = chromadb.PersistentClient(path=chroma_path)
-        self.collection = self.client.get_collection(
-            name=collection_name,
-            embedding_function=embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name="all-MiniLM-L6-v2"
-            )
-        )
-        self.groq_client = groq_client
-        self.model_name = "llama3-8b-8192"
-        self.ner = spacy.load("en_core_web_sm")
-        
-
-        # self.claim_tokenizer = T5Tokenizer.from_pretrained("Babelscape/t5-base-summarization-claim-extractor")
-        # self.claim_model = T5ForConditionalGeneration.from_pretrained("Babelscape/t5-base-summarization-claim-extractor")
-
-    def extract_entities(self, text):
-        doc = self.ner(text)
-        return [(ent.text, ent.label_) for ent in doc.ents]
-
-    def extract_claims(self, text, threshold=0.5):
-        # tok_input = self.claim_tokenizer.batch_encode_plus([text], return_tensors="pt", padding=True)
-        # outputs = self.claim_model.generate(**tok_input)
-        # claims = self.claim_tokenizer.batch_decode(outputs, skip_special_tokens=True)
-        # claims = [claim.strip() for claim in claims if len(claim.strip()) > 0]
-        return [text]
-
-
-    def verify_single_claim(self, claim, confidence_threshold=0.5):
-        results = self.collection.query(
-            query_texts=[claim],
-            n_results=3,
-            include=["documents", "metadatas", "distances"]
-        )
-        zipped_results = sorted(
-            zip(results['documents'][0], results['metadatas'][0], results['distances'][0]),
-            key=lambda x: x[2]
-        )
-        evidence = []
-        for doc, meta, distance in zipped_results:
-            source = meta["source"] if meta and "source" in meta else "Unknown source"
-            similarity_score = 1 - (distance / 2)  # Assuming cosine distance in [0,2]
-            evidence.append(
-                f'"{doc}" (Source: {source}, Similarity: {similarity_score:.2f})'
-            )
-        avg_distance = sum(d for _, _, d in zipped_results) / len(zipped_results)
-        confidence = 1 - (avg_distance / 2)  # Normalize to 0-1 range
-
-        if confidence < confidence_threshold:
-            return {
-                "verdict": "Unverifiable",
-                "confidence": confidence,
-                "evidence": [e.split(" (Source:")[0] for e in evidence],
-                "reasoning": "Claim is too vague or lacks sufficient evidence"
-            }
-
-        evidence_str = "\n".join([f"- {e}" for e in evidence])
-        prompt = f""" You are a powerful fact checker. Analyze the claim below against the provided verified information. 
+def build_claim_prompt(claim, evidence_str):
+    return f""" You are a powerful fact checker. Analyze the claim below against the provided verified information. 
 Relying on the similarity scores, also carefully check whether all factual details in the claim (such as dates, names, locations, and events) exactly match atleast one of the evidence. If from first evidence, evidence is not sufficient, use the next evidence to verify the claim. 
 If there is any factual mismatch (for example, the date in the claim is different from the evidence), classify the claim as False. Any factual mismatch, even if the overall context is similar, should lead to a False classification.
 If the evidence is too vague or lacks strong matches, classify as Unverifiable.
@@ -136,15 +88,458 @@ Respond in JSON format:
     "reasoning": "Explanation of the verdict based on evidence and factual details"
 }}
 """
-        completion = self.groq_client.chat.completions.create(
+
+def build_entity_prompt(entity_text, evidence_str):
+    return f"""**Entity Verification Task**
+    Entity: "{entity_text}"
+
+    **Verified Evidence:**
+    {evidence_str}
+
+    **Instructions:**
+    1. Verify if this entity exists in official records
+    2. Check for exact matches of names/titles
+    3. Confirm associated details (locations, dates, roles)
+    4. Return JSON with: verdict (True/False/Unverified), confidence (0-1), reasoning
+
+    **JSON Response:"""
+
+def build_entity_batch_prompt(entity_blocks):
+    """Prompt verifying several (entity_text, evidence_str) pairs at once"""
+    sections = "\n\n".join(
+        f"""    **Entity {i}:** "{entity_text}"
+    **Verified Evidence:**
+    {evidence_str}"""
+        for i, (entity_text, evidence_str) in enumerate(entity_blocks, 1)
+    )
+    return f"""**Batch Entity Verification Task**
+
+{sections}
+
+    **Instructions:**
+    1. Verify if each entity exists in official records, using only its own evidence
+    2. Check for exact matches of names/titles
+    3. Confirm associated details (locations, dates, roles)
+    4. Return a JSON object {{"verdicts": [...]}} with one item per entity, in order, each with:
+       id (the entity number), verdict (True/False/Unverified), confidence (0-1), reasoning
+
+    **JSON Response:"""
+
+# Labels worth verifying on their own; CARDINAL, ORDINAL, PERCENT, TIME and QUANTITY rarely are
+DEFAULT_ENTITY_LABELS = {"PERSON", "NORP", "FAC", "ORG", "GPE", "LOC", "PRODUCT", "EVENT",
+                         "WORK_OF_ART", "LAW", "DATE", "MONEY"}
+# Ranking weight per label when more entities are found than max_entities
+ENTITY_SALIENCE = {"PERSON": 3.0, "ORG": 3.0, "GPE": 2.5, "EVENT": 2.5, "LAW": 2.5, "FAC": 2.0,
+                   "LOC": 2.0, "NORP": 1.5, "PRODUCT": 1.5, "WORK_OF_ART": 1.5, "DATE": 1.0, "MONEY": 1.0}
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+# CancelScope of the verify_claim_stream the current LLM call belongs to (None outside one)
+_llm_cancel = contextvars.ContextVar("llm_cancel", default=None)
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+def _segments(text, max_chars):
+    """Paragraph-aligned pieces of text of up to about max_chars characters; longer paragraphs split at sentence ends"""
+    current, length = [], 0
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        for piece in [paragraph] if len(paragraph) <= max_chars else _SENTENCE_END.split(paragraph):
+            piece = piece.strip()
+            if not piece:
+                continue
+            if current and length + len(piece) > max_chars:
+                yield "\n\n".join(current)
+                current, length = [], 0
+            current.append(piece)
+            length += len(piece)
+    if current:
+        yield "\n\n".join(current)
+
+def _squared_l2(a, b):
+    """Chroma's default "l2" collection distance"""
+    return float(sum((float(x) - float(y)) ** 2 for x, y in zip(a, b)))
+
+class FactChecker:
+    def __init__(self, chroma_path, collection_name, groq_client, max_workers=4, call_timeout=30, llm_cache=None,
+                 metrics=None, batch_entities=False, entity_labels=DEFAULT_ENTITY_LABELS,
+                 max_entities=5, fast_path=True, lexical_index=None, fusion_candidates=10, backend=None,
+                 embedder=None, scheduler=None, claim_cache=None, cache_audit_rate=0.0, claim_extractor=None,
+                 max_claims=None):
+        # Models and clients come from the process-wide registry, so building
+        # another FactChecker does not reload them.
+        # Vector search goes through a retrieval.py backend; the Chroma collection unless one is passed in.
+        self.collection_name = collection_name
+        self.backend = backend or ChromaBackend(chroma_path, collection_name)
+        # Query embeddings: the model directly, or a shared embedding_service.MicroBatcher
+        self.embedder = embedder or registry.get_embedding_function()
+        # Bumped by reload() whenever the underlying corpus has been refreshed
+        self.corpus_version = 0
+        self.groq_client = groq_client
+        self.model_name = "llama3-8b-8192"
+        self.ner = registry.get_ner()
+        # Cap on concurrent verify_single_* calls per request and per-call LLM timeout (seconds).
+        # max_workers=1 keeps the original sequential behaviour.
+        self.max_workers = max_workers
+        self.call_timeout = call_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers) if max_workers > 1 else None
+        # Optional llm_cache.LLMCache in front of the LLM calls
+        self.llm_cache = llm_cache
+        # Timing spans and counters; disabled unless a Metrics(enabled=True) is passed in
+        self.metrics = metrics or Metrics(enabled=False)
+        # Every LLM call goes through an llm_scheduler.LLMScheduler (rate budget, retries, hedging);
+        # by default one around groq_client that only retries
+        self.scheduler = scheduler or LLMScheduler(groq_client, metrics=self.metrics)
+        # Verify all entities of a request in one LLM call instead of one call each
+        self.batch_entities = batch_entities
+        # Entity selection: label allow-list (None keeps every label) and per-request cap (None = no cap)
+        self.entity_labels = set(entity_labels) if entity_labels is not None else None
+        self.max_entities = max_entities
+        # Settle near-verbatim matches and explicit contradictions without the LLM
+        self.fast_path = fast_path
+        # Optional bm25.BM25Index; when set, retrieve() fuses BM25 and vector rankings
+        # over the top fusion_candidates of each
+        self.lexical_index = lexical_index
+        self.fusion_candidates = fusion_candidates
+        # Optional claim_cache.SemanticClaimCache: reworded claims reuse an earlier verdict.
+        # A cache_audit_rate share of hits is verified afresh to measure disagreement.
+        self.claim_cache = claim_cache
+        self.cache_audit_rate = cache_audit_rate
+        # claim_extraction extractor splitting the input into independently verified claims;
+        # spaCy sentences by default, T5ClaimExtractor for the seq2seq model
+        self.claim_extractor = claim_extractor or SentenceClaimExtractor()
+        # Claims verified per request (None = no cap); the rest are returned under "claims_skipped"
+        self.max_claims = max_claims
+
+    @property
+    def collection(self):
+        """The Chroma collection behind the default backend (None for other backends)"""
+        return getattr(self.backend, "collection", None)
+
+    def reload(self):
+        """Switch to the latest state of the collection after a background refresh"""
+        self.backend.reload()
+        self.corpus_version += 1
+        if self.claim_cache is not None:
+            self.claim_cache.clear()  # cached verdicts were reached on the old evidence
+
+    def extract_entities(self, text):
+        with self.metrics.span("ner"):
+            doc = self.ner(text)
+        return self.select_entities(doc)[0]
+
+    def select_entities(self, doc):
+        """
+        Entity selection stage between NER and verification: keeps allow-listed
+        labels, merges overlapping spans, dedupes normalised text, ranks by
+        salience and caps the count. Returns (entities in document order, stats).
+        """
+        candidates = [
+            (ent.text, ent.label_, ent.start_char, ent.end_char) for ent in doc.ents
+            if self.entity_labels is None or ent.label_ in self.entity_labels
+        ]
+
+        # Merge overlapping spans, keeping the longer one
+        merged = []
+        for candidate in sorted(candidates, key=lambda c: (c[2], -(c[3] - c[2]))):
+            if merged and candidate[2] < merged[-1][3]:
+                if candidate[3] - candidate[2] > merged[-1][3] - merged[-1][2]:
+                    merged[-1] = candidate
+                continue
+            merged.append(candidate)
+
+        # Dedupe case- and whitespace-normalised text, counting mentions
+        unique = {}
+        for position, (entity_text, label, _, _) in enumerate(merged):
+            key = " ".join(entity_text.split()).casefold()
+            if key in unique:
+                unique[key]["mentions"] += 1
+            else:
+                unique[key] = {"entity": (entity_text, label), "position": position, "mentions": 1}
+
+        ranked = sorted(
+            unique.values(),
+            key=lambda u: -(ENTITY_SALIENCE.get(u["entity"][1], 1.0)
+                            + 0.5 * (u["mentions"] - 1)
+                            + 0.25 * len(u["entity"][0].split())
+                            - 0.05 * u["position"])
+        )
+        if self.max_entities is not None:
+            ranked = ranked[:self.max_entities]
+        selected = [u["entity"] for u in sorted(ranked, key=lambda u: u["position"])]
+
+        stats = {
+            "detected": len(doc.ents),
+            "verified": len(selected),
+            "calls_saved": len(doc.ents) - len(selected)
+        }
+        self.metrics.incr("entities_detected", stats["detected"])
+        self.metrics.incr("entity_calls_saved", stats["calls_saved"])
+        return selected, stats
+
+    def _claim_ents(self, doc, claims):
+        """
+        Per claim, its entities: those of doc (the request's NER parse) inside it,
+        so neither the fast path nor the claim cache parses it again. A claim that
+        is not a span of doc (e.g. a T5-generated one) is parsed on its own.
+        """
+        found = []
+        for claim in claims:
+            start = doc.text.find(claim)
+            if start < 0:
+                with self.metrics.span("ner"):
+                    found.append(list(self.ner(claim).ents))
+                continue
+            end = start + len(claim)
+            found.append([ent for ent in doc.ents if start <= ent.start_char and ent.end_char <= end])
+        return found
+
+    def extract_claims(self, text, threshold=0.5, doc=None):
+        """Claims to verify in text; doc is its spaCy parse when already available"""
+        return self.extract_claims_batch([text], [doc])[0]
+
+    def extract_claims_batch(self, texts, docs=None):
+        with self.metrics.span("claim_extraction"):
+            claims = self.claim_extractor.extract_batch(texts, docs)
+        self.metrics.incr("claims_extracted", sum(len(found) for found in claims))
+        return claims
+
+    def _cap_claims(self, claims):
+        """(claims to verify, claims skipped) under max_claims"""
+        if self.max_claims is None or len(claims) <= self.max_claims:
+            return claims, []
+        self.metrics.incr("claims_skipped", len(claims) - self.max_claims)
+        return claims[:self.max_claims], claims[self.max_claims:]
+
+
+    def _complete(self, messages, on_delta=None, **params):
+        """
+        Run a chat completion and return the message content, consulting the LLM cache first.
+        With on_delta the completion is streamed and on_delta(text) gets every chunk as it arrives
+        (a cached reply arrives as one chunk). Inside verify_claim_stream the call belongs to its
+        CancelScope: cancelling drops it if not yet sent and closes it mid-reply if streamed.
+        """
+        cancel = _llm_cancel.get()
+        if cancel is not None and cancel.is_set():
+            raise Cancelled()
+        key = None
+        if self.llm_cache is not None:
+            key = self.llm_cache.make_key(self.model_name, messages, **params)
+            cached = self.llm_cache.get(key)
+            if cached is not None:
+                self.metrics.incr("llm_cache_hits")
+                if on_delta is not None:
+                    on_delta(cached)
+                return cached
+        try:
+            with self.metrics.span("llm"):
+                if on_delta is None:
+                    completion = self.scheduler.create(
+                        model=self.model_name,
+                        messages=messages,
+                        timeout=self.call_timeout,
+                        cancel=cancel,
+                        **params
+                    )
+                else:
+                    content = self._stream_completion(messages, on_delta, cancel, **params)
+        except Cancelled:
+            self.metrics.incr("llm_cancelled")
+            raise
+        except Exception:
+            self.metrics.incr("llm_errors")
+            raise
+        self.metrics.incr("llm_calls")
+        if on_delta is None:
+            usage = getattr(completion, "usage", None)
+            if usage is not None:
+                self.metrics.incr("llm_prompt_tokens", usage.prompt_tokens or 0)
+                self.metrics.incr("llm_completion_tokens", usage.completion_tokens or 0)
+            content = completion.choices[0].message.content
+        if key is not None and content:
+            self.llm_cache.put(key, content)
+        return content
+
+    def _stream_completion(self, messages, on_delta, cancel=None, **params):
+        stream = self.scheduler.create(
             model=self.model_name,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1,
-            max_tokens=400
+            messages=messages,
+            timeout=self.call_timeout,
+            stream=True,
+            cancel=cancel,
+            **params
         )
-        response_content = completion.choices[0].message.content
-        parsed = robust_json_extractor(response_content)
+        if cancel is not None:
+            cancel.track(stream)
+        parts = []
+        try:
+            for chunk in stream:
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text:
+                    parts.append(text)
+                    on_delta(text)
+        except Exception as e:
+            if cancel is not None and cancel.is_set():
+                raise Cancelled() from e  # closed under us by CancelScope.set()
+            raise
+        finally:
+            if cancel is not None:
+                cancel.untrack(stream)
+        if cancel is not None and cancel.is_set():
+            raise Cancelled()  # a closed stream can also just end early
+        self.metrics.incr("llm_streamed_calls")
+        return "".join(parts)
+
+    def retrieve(self, queries, n_results=3, embeddings=None):
+        """
+        Retrieval stage: embeds all queries in one batch (unless their embeddings are
+        passed in) and runs a single backend query, returning one
+        {documents, metadatas, distances} slice per query.
+        With a lexical index the slices are the reciprocal-rank fusion of BM25 and vector hits.
+        """
+        if not queries:
+            return []
+        if embeddings is None:
+            with self.metrics.span("embedding"):
+                embeddings = self.embedder(list(queries))
+        if self.lexical_index is not None and len(self.lexical_index):
+            return self._hybrid_retrieve(queries, n_results, embeddings)
+        with self.metrics.span("vector_query"):
+            results = self.backend.query(query_embeddings=embeddings, n_results=n_results)
+        return [
+            {
+                "documents": results['documents'][i],
+                "metadatas": results['metadatas'][i],
+                "distances": results['distances'][i]
+            }
+            for i in range(len(queries))
+        ]
+
+    def _hybrid_retrieve(self, queries, n_results, embeddings):
+        pool = max(n_results, self.fusion_candidates)
+        # The query vectors are also needed to score BM25-only hits
+        with self.metrics.span("vector_query"):
+            results = self.backend.query(query_embeddings=embeddings, n_results=pool)
+        with self.metrics.span("bm25_query"):
+            rankings = [
+                reciprocal_rank_fusion([
+                    results['ids'][i],
+                    [doc_id for doc_id, _ in self.lexical_index.search(query, pool)]
+                ])
+                for i, query in enumerate(queries)
+            ]
+
+        # Documents only BM25 found: fetch them in one call and compute the distance Chroma would report
+        missing = {doc_id for ranking in rankings for doc_id in ranking[:n_results]} - {
+            doc_id for ids in results['ids'] for doc_id in ids
+        }
+        lexical_only = {}
+        if missing:
+            with self.metrics.span("vector_query"):
+                fetched = self.backend.get(sorted(missing))
+            for doc_id, doc, meta, embedding in zip(fetched['ids'], fetched['documents'],
+                                                    fetched['metadatas'], fetched['embeddings']):
+                lexical_only[doc_id] = (doc, meta, embedding)
+        self.metrics.incr("bm25_only_hits", len(lexical_only))
+
+        retrieved = []
+        for i, ranking in enumerate(rankings):
+            vector_hits = {
+                doc_id: (doc, meta, distance)
+                for doc_id, doc, meta, distance in zip(results['ids'][i], results['documents'][i],
+                                                       results['metadatas'][i], results['distances'][i])
+            }
+            # Ids BM25 knows but the collection does not (e.g. not yet re-ingested) are
+            # skipped, and the next fused hit takes their place
+            hits = []
+            for doc_id in ranking:
+                if len(hits) == n_results:
+                    break
+                if doc_id in vector_hits:
+                    hits.append(vector_hits[doc_id])
+                elif doc_id in lexical_only:
+                    doc, meta, embedding = lexical_only[doc_id]
+                    hits.append((doc, meta, _squared_l2(embeddings[i], embedding)))
+            retrieved.append({
+                "documents": [doc for doc, _, _ in hits],
+                "metadatas": [meta for _, meta, _ in hits],
+                "distances": [distance for _, _, distance in hits]
+            })
+        return retrieved
+
+    def verify_single_claim(self, claim, confidence_threshold=0.5, retrieved=None, on_update=None, claim_ents=None):
+        """
+        With on_update the LLM reply is streamed: on_update(partial) is called with
+        {"verdict", "confidence", "evidence", "reasoning", "partial": True} as soon as
+        the verdict is parsed and again as the reasoning grows. The return value is
+        unchanged and still comes from parsing the complete reply. claim_ents are the
+        claim's entities from the request's NER pass (see _claim_ents), so the fast
+        path does not parse the claim again.
+        """
+        if retrieved is None:
+            retrieved = self.retrieve([claim])[0]
+        zipped_results = sorted(
+            zip(retrieved['documents'], retrieved['metadatas'], retrieved['distances']),
+            key=lambda x: x[2]
+        )
+        evidence = []
+        for doc, meta, distance in zipped_results:
+            source = meta["source"] if meta and "source" in meta else "Unknown source"
+            similarity_score = 1 - (distance / 2)  # Assuming cosine distance in [0,2]
+            evidence.append(
+                f'"{doc}" (Source: {source}, Similarity: {similarity_score:.2f})'
+            )
+        avg_distance = sum(d for _, _, d in zipped_results) / len(zipped_results)
+        confidence = 1 - (avg_distance / 2)  # Normalize to 0-1 range
+
+        if confidence < confidence_threshold:
+            self.metrics.incr("unverifiable_short_circuits")
+            return {
+                "verdict": "Unverifiable",
+                "confidence": confidence,
+                "evidence": [e.split(" (Source:")[0] for e in evidence],
+                "reasoning": "Claim is too vague or lacks sufficient evidence"
+            }
+
+        if self.fast_path:
+            top_doc, _, top_distance = zipped_results[0]
+            with self.metrics.span("fast_path"):
+                decision = pre_verify(claim, top_doc, 1 - (top_distance / 2), self.ner,
+                                      other_evidence=[doc for doc, _, _ in zipped_results[1:]],
+                                      claim_ents=claim_ents)
+            if decision is not None:
+                self.metrics.incr("fast_path_hits")
+                return {
+                    "verdict": decision["verdict"],
+                    "confidence": confidence,
+                    "evidence": [e.split(" (Source:")[0] for e in evidence],
+                    "reasoning": decision["reasoning"],
+                    "fast_path": decision["rule"]
+                }
+            self.metrics.incr("fast_path_escalations")
+
+        evidence_str = "\n".join([f"- {e}" for e in evidence])
+        prompt = build_claim_prompt(claim, evidence_str)
+        try:
+            response_content = self._complete(
+                messages=[{"role": "user", "content": prompt}],
+                on_delta=self._claim_stream_handler(confidence, evidence, on_update) if on_update else None,
+                temperature=0.1,
+                max_tokens=400
+            )
+        except Exception as e:
+            # Retries are exhausted (or the error is not retryable): report it for this claim only
+            return self._failed_verification(e)
+        with self.metrics.span("json_extract"):
+            parsed = robust_json_extractor(response_content)
         if "error" in parsed:
+            self.metrics.incr("parse_fallbacks")
             return {
                 "error": parsed["error"],
                 "confidence": confidence,
@@ -160,27 +555,45 @@ Respond in JSON format:
                     "reasoning": parsed["reasoning"]
                 }
             else:
+                self.metrics.incr("parse_fallbacks")
                 return {
                     "error": f"Missing required keys: {[k for k in required_keys if k not in parsed]}",
                     "confidence": confidence,
                     "raw_response": response_content
                 }
 
-    def verify_single_entity(self, entity_text, confidence_threshold=0.5):
-        """Verify a single named entity against the fact database"""
-        # Vector similarity search
-        results = self.collection.query(
-            query_texts=[entity_text],
-            n_results=3,
-            include=["documents", "metadatas", "distances"]
-        )
-        
+    def _claim_stream_handler(self, confidence, evidence, on_update):
+        """on_delta callback feeding the incremental parser and reporting each new verdict/reasoning state"""
+        parser = IncrementalJSONParser()
+        last = {}
+
+        def on_delta(text):
+            parser.feed(text)
+            verdict = parser.fields.get("verdict")
+            if verdict is None:
+                return  # nothing worth showing before the verdict
+            update = {
+                "verdict": verdict,
+                "confidence": confidence,
+                "evidence": [e.split(" (Source:")[0] for e in evidence],
+                "reasoning": parser.partial("reasoning") or "",
+                "partial": True
+            }
+            if update != last:
+                last.clear()
+                last.update(update)
+                on_update(update)
+
+        return on_delta
+
+    def _entity_evidence(self, retrieved):
+        """Evidence list, average similarity and prompt-ready evidence string for one entity"""
         # Process evidence with similarity normalization
         evidence = []
         total_distance = 0
-        for doc, meta, distance in zip(results['documents'][0], 
-                                    results['metadatas'][0], 
-                                    results['distances'][0]):
+        for doc, meta, distance in zip(retrieved['documents'], 
+                                    retrieved['metadatas'], 
+                                    retrieved['distances']):
             similarity = 1 - (distance / 2)  # Convert cosine distance to similarity
             evidence.append({
                 "text": doc,
@@ -189,43 +602,45 @@ Respond in JSON format:
             })
             total_distance += distance
         
-        avg_similarity = 1 - (total_distance / len(results['distances'][0]) / 2)
+        avg_similarity = 1 - (total_distance / len(retrieved['distances']) / 2)
         
-        # Prepare LLM verification prompt
         evidence_str = "\n".join([
             f"- {e['text']} (Similarity: {e['similarity']:.2f})" 
             for e in evidence
         ])
-        
-        prompt = f"""**Entity Verification Task**
-    Entity: "{entity_text}"
+        return evidence, avg_similarity, evidence_str
 
-    **Verified Evidence:**
-    {evidence_str}
-
-    **Instructions:**
-    1. Verify if this entity exists in official records
-    2. Check for exact matches of names/titles
-    3. Confirm associated details (locations, dates, roles)
-    4. Return JSON with: verdict (True/False/Unverified), confidence (0-1), reasoning
+    def _entity_verdict(self, result, evidence, avg_similarity):
+        return {
+            "verdict": result.get("verdict", "Unverified"),
+            "confidence": min(max(result.get("confidence", avg_similarity), 0), 1),
+            "evidence": [e["text"] for e in evidence],
+            "reasoning": result.get("reasoning", "No reasoning provided")
+        }
 
-    **JSON Response:"""
+    def verify_single_entity(self, entity_text, confidence_threshold=0.5, retrieved=None):
+        """Verify a single named entity against the fact database"""
+        # Vector similarity search (skipped when verify_claim already retrieved in batch)
+        if retrieved is None:
+            retrieved = self.retrieve([entity_text])[0]
+        
+        evidence, avg_similarity, evidence_str = self._entity_evidence(retrieved)
+        prompt = build_entity_prompt(entity_text, evidence_str)
         
         try:
-            response = self.groq_client.chat.completions.create(
-                model=self.model_name,
+            response_content = self._complete(
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.2,
                 response_format={"type": "json_object"}
             )
             
-            result = json.loads(response.choices[0].message.content)
-            return {
-                "verdict": result.get("verdict", "Unverified"),
-                "confidence": min(max(result.get("confidence", avg_similarity), 0), 1),
-                "evidence": [e["text"] for e in evidence],
-                "reasoning": result.get("reasoning", "No reasoning provided")
-            }
+            try:
+                with self.metrics.span("json_extract"):
+                    result = json.loads(response_content)
+            except ValueError:
+                self.metrics.incr("parse_fallbacks")
+                raise
+            return self._entity_verdict(result, evidence, avg_similarity)
             
         except Exception as e:
             return {
@@ -235,42 +650,456 @@ Respond in JSON format:
                 "reasoning": f"Verification failed: {str(e)}"
             }
 
-    def verify_claim(self, text, confidence_threshold=0.5):
+    def verify_entities_batch(self, entity_texts, confidence_threshold=0.5, retrieved=None):
         """
-        Main method: takes input text, extracts entities and claims, 
-        verifies each, and returns JSON results
+        Verify several entities with one LLM call. The batch answer is only used
+        when its ids are exactly 1..n, each with a verdict; a missing, duplicated,
+        unknown or malformed id means the verdicts cannot be trusted to line up
+        with the entities, so every entity is then re-verified individually with
+        verify_single_entity. Returns one verification dict per entity, in order.
         """
-        # Extract entities and claims
-        entities = self.extract_entities(text)
-        claims = self.extract_claims(text)
-        
-        # Verify claims
-        claim_results = []
-        for claim in claims:
-            verification = self.verify_single_claim(claim, confidence_threshold)
-            claim_results.append({
-                "claim": claim,
-                "verdict": verification.get("verdict", "Error"),
-                "confidence": verification.get("confidence", 0),
-                "evidence": verification.get("evidence", []),
-                "reasoning": verification.get("reasoning", "Analysis failed")
-            })
-        
-        # Verify entities
-        entity_results = []
-        for entity_text, entity_label in entities:
-            verification = self.verify_single_entity(entity_text, confidence_threshold)
-            entity_results.append({
-                "entity": entity_text,
-                "type": entity_label,
-                "verdict": verification.get("verdict", "Error"),
-                "confidence": verification.get("confidence", 0),
-                "evidence": verification.get("evidence", []),
-                "reasoning": verification.get("reasoning", "Analysis failed")
-            })
-        
+        if retrieved is None:
+            retrieved = self.retrieve(entity_texts)
+        prepared = [self._entity_evidence(hits) for hits in retrieved]
+        prompt = build_entity_batch_prompt([
+            (entity_text, evidence_str) for entity_text, (_, _, evidence_str) in zip(entity_texts, prepared)
+        ])
+
+        verdicts = {}
+        try:
+            response_content = self._complete(
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.2,
+                response_format={"type": "json_object"}
+            )
+            with self.metrics.span("json_extract"):
+                items = json.loads(response_content).get("verdicts", [])
+            valid = [item for item in items
+                     if isinstance(item, dict) and "verdict" in item and str(item.get("id", "")).strip().isdigit()]
+            ids = [int(str(item["id"]).strip()) for item in valid]
+            if len(valid) == len(items) and sorted(ids) == list(range(1, len(entity_texts) + 1)):
+                verdicts = dict(zip(ids, valid))
+            else:
+                self.metrics.incr("batch_id_mismatches")
+        except Exception:
+            self.metrics.incr("parse_fallbacks")
+
+        results = []
+        for i, (entity_text, hits, (evidence, avg_similarity, _)) in enumerate(zip(entity_texts, retrieved, prepared), 1):
+            if i in verdicts:
+                results.append(self._entity_verdict(verdicts[i], evidence, avg_similarity))
+            else:
+                self.metrics.incr("batch_entity_fallbacks")
+                results.append(self.verify_single_entity(entity_text, confidence_threshold, hits))
+        return results
+
+    def _format_claim_result(self, claim, verification):
+        result = {
+            "claim": claim,
+            "verdict": verification.get("verdict", "Error"),
+            "confidence": verification.get("confidence", 0),
+            "evidence": verification.get("evidence", []),
+            "reasoning": verification.get("reasoning", "Analysis failed")
+        }
+        for key in ("fast_path", "cached_from"):
+            if key in verification:
+                result[key] = verification[key]
+        return result
+
+    def _format_entity_result(self, entity_text, entity_label, verification):
+        return {
+            "entity": entity_text,
+            "type": entity_label,
+            "verdict": verification.get("verdict", "Error"),
+            "confidence": verification.get("confidence", 0),
+            "evidence": verification.get("evidence", []),
+            "reasoning": verification.get("reasoning", "Analysis failed")
+        }
+
+    def _collect(self, future):
+        """Wait for a submitted verification; failures become an error verdict instead of aborting the request"""
+        try:
+            return future.result()
+        except Exception as e:
+            return self._failed_verification(e)
+
+    def _failed_verification(self, error):
         return {
-            "entities": entity_results,
-            "claims": claim_results
+            "verdict": "Error",
+            "confidence": 0,
+            "evidence": [],
+            "reasoning": f"Verification failed: {str(error)}"
         }
 
+    def _retrieve_with_cache(self, queries, is_claim, confidence_threshold, claim_ents=None):
+        """
+        Embeds every query in one batch, looks the claims (is_claim[i]) up in the
+        semantic claim cache and retrieves evidence for everything else. Returns
+        per-query (retrieved, cached, embeddings) lists: retrieved is None where a
+        claim was a cache hit, cached is None everywhere else. claim_ents[i] are
+        the entities of claim i (from _claim_ents), part of its cache key.
+        """
+        claim_ents = claim_ents or [None] * len(queries)
+        if self.claim_cache is None or not any(is_claim):
+            return self.retrieve(queries), [None] * len(queries), [None] * len(queries)
+        with self.metrics.span("embedding"):
+            embeddings = list(self.embedder(list(queries)))
+        with self.metrics.span("claim_cache"):
+            cached = [
+                self.claim_cache.lookup(query, embedding, confidence_threshold, ents) if claim else None
+                for query, embedding, claim, ents in zip(queries, embeddings, is_claim, claim_ents)
+            ]
+        hits = sum(hit is not None for hit in cached)
+        self.metrics.incr("claim_cache_hits", hits)
+        self.metrics.incr("claim_cache_misses", sum(is_claim) - hits)
+        pending = [i for i, hit in enumerate(cached) if hit is None]
+        fetched = self.retrieve([queries[i] for i in pending], embeddings=[embeddings[i] for i in pending])
+        retrieved = [None] * len(queries)
+        for i, hits in zip(pending, fetched):
+            retrieved[i] = hits
+        return retrieved, cached, embeddings
+
+    def _verify_claim_cached(self, claim, confidence_threshold, retrieved, on_update, cached, embedding,
+                             claim_ents=None, corpus_version=None):
+        """
+        verify_single_claim behind the semantic claim cache. corpus_version is
+        the one read before retrieved was fetched; the verdict is only cached if
+        no reload() happened since.
+        """
+        if cached is not None:
+            if random.random() >= self.cache_audit_rate:
+                return cached
+            # Audit: verify afresh (retrieving again) and compare with the cached verdict
+            fresh = self.verify_single_claim(claim, confidence_threshold, None, on_update, claim_ents)
+            self.claim_cache.record_audit(cached.get("verdict"), fresh.get("verdict"))
+            self.metrics.incr("claim_cache_audits")
+            return fresh
+        if corpus_version is None or retrieved is None:
+            corpus_version = self.corpus_version
+        result = self.verify_single_claim(claim, confidence_threshold, retrieved, on_update, claim_ents)
+        # Evidence fetched before a reload() is the old corpus; don't cache its verdict past the clear
+        if self.claim_cache is not None and embedding is not None and corpus_version == self.corpus_version:
+            self.claim_cache.add(claim, embedding, confidence_threshold, result, claim_ents)
+        return result
+
+    def _start_verification(self, claims, entities, confidence_threshold, retrieved, on_claim_update=None,
+                            cached=None, claim_embeddings=None, claim_ents=None, corpus_version=None):
+        """
+        Start verifying already-extracted claims and entities against their
+        retrieved evidence; returns a callable that collects the result dict.
+        on_claim_update(index, partial) streams each claim's LLM verdict early.
+        cached / claim_embeddings come from _retrieve_with_cache, claim_ents from _claim_ents;
+        corpus_version is self.corpus_version as read before that retrieval.
+        """
+        claim_retrieved = retrieved[:len(claims)]
+        entity_retrieved = retrieved[len(claims):]
+        cached = cached or [None] * len(claims)
+        claim_embeddings = claim_embeddings or [None] * len(claims)
+        claim_ents = claim_ents or [None] * len(claims)
+
+        batch_entities = self.batch_entities and len(entities) > 1
+        entity_texts = [entity_text for entity_text, _ in entities]
+
+        def claim_updates(index):
+            return (lambda partial: on_claim_update(index, partial)) if on_claim_update else None
+
+        if self._executor is None:
+            claim_results = [
+                self._format_claim_result(claim, self._verify_claim_cached(
+                    claim, confidence_threshold, hits, claim_updates(i), cached[i], claim_embeddings[i],
+                    claim_ents[i], corpus_version
+                ))
+                for i, (claim, hits) in enumerate(zip(claims, claim_retrieved))
+            ]
+            if batch_entities:
+                verifications = self.verify_entities_batch(entity_texts, confidence_threshold, entity_retrieved)
+            else:
+                verifications = [
+                    self.verify_single_entity(entity_text, confidence_threshold, hits)
+                    for entity_text, hits in zip(entity_texts, entity_retrieved)
+                ]
+            entity_results = [
+                self._format_entity_result(entity_text, entity_label, verification)
+                for (entity_text, entity_label), verification in zip(entities, verifications)
+            ]
+            result = {
+                "entities": entity_results,
+                "claims": claim_results
+            }
+            return lambda: result
+
+        # Submit every claim and entity at once; the pool bounds how many LLM calls are in flight
+        # Each task runs in a copy of the caller's context so per-request timing spans follow it
+        claim_futures = [
+            self._executor.submit(contextvars.copy_context().run,
+                                  self._verify_claim_cached, claim, confidence_threshold, hits, claim_updates(i),
+                                  cached[i], claim_embeddings[i], claim_ents[i], corpus_version)
+            for i, (claim, hits) in enumerate(zip(claims, claim_retrieved))
+        ]
+        if batch_entities:
+            batch_future = self._executor.submit(contextvars.copy_context().run,
+                                                 self.verify_entities_batch, entity_texts,
+                                                 confidence_threshold, entity_retrieved)
+        else:
+            entity_futures = [
+                self._executor.submit(contextvars.copy_context().run,
+                                      self.verify_single_entity, entity_text, confidence_threshold, hits)
+                for entity_text, hits in zip(entity_texts, entity_retrieved)
+            ]
+
+        def collect():
+            # Collect in submission order so the output matches the sequential path
+            claim_results = [
+                self._format_claim_result(claim, self._collect(future))
+                for claim, future in zip(claims, claim_futures)
+            ]
+            if batch_entities:
+                try:
+                    verifications = batch_future.result()
+                except Exception as e:
+                    verifications = [self._failed_verification(e)] * len(entities)
+            else:
+                verifications = [self._collect(future) for future in entity_futures]
+            entity_results = [
+                self._format_entity_result(entity_text, entity_label, verification)
+                for (entity_text, entity_label), verification in zip(entities, verifications)
+            ]
+            return {
+                "entities": entity_results,
+                "claims": claim_results
+            }
+
+        return collect
+
+    def verify_claim(self, text, confidence_threshold=0.5, include_timings=False, on_claim_update=None):
+        """
+        Main method: takes input text, extracts entities and claims, 
+        verifies each, and returns JSON results.
+        With include_timings=True the result also carries per-stage "timings".
+        on_claim_update(claim_index, partial) is called from worker threads as each
+        claim's streamed verdict and reasoning arrive (see verify_single_claim).
+        """
+        if include_timings:
+            result, timings = collect_request_timings(self.verify_claim, text, confidence_threshold,
+                                                      on_claim_update=on_claim_update)
+            result["timings"] = timings
+            return result
+
+        # Extract entities and claims
+        with self.metrics.span("ner"):
+            doc = self.ner(text)
+        entities, selection = self.select_entities(doc)
+        claims, skipped = self._cap_claims(self.extract_claims(text, doc=doc))
+        claim_ents = self._claim_ents(doc, claims)
+
+        # One batched embedding + vector query for every claim and entity in the request
+        # (cached claims skip the vector query)
+        corpus_version = self.corpus_version
+        retrieved, cached, embeddings = self._retrieve_with_cache(
+            claims + [entity_text for entity_text, _ in entities],
+            [True] * len(claims) + [False] * len(entities), confidence_threshold,
+            claim_ents + [None] * len(entities)
+        )
+        result = self._start_verification(claims, entities, confidence_threshold, retrieved, on_claim_update,
+                                          cached[:len(claims)], embeddings[:len(claims)],
+                                          claim_ents, corpus_version)()
+        result["entity_selection"] = selection
+        result["claims_skipped"] = skipped  # extracted but not verified (over max_claims)
+        return result
+
+    def verify_claim_stream(self, text, confidence_threshold=0.5, cancel=None, segment_chars=4000,
+                            max_in_flight=None):
+        """
+        Generator version of verify_claim for long inputs. The text is read in
+        paragraph-aligned segments of about segment_chars characters and events
+        are yielded as soon as they are ready:
+          {"event": "queued", "kind": "claim" | "entity", "id", "text"}    in document order
+          {"event": "update", "kind": "claim", "id", "result"}             streamed verdict, "partial": True
+          {"event": "result", "kind": "claim" | "entity", "id", "result"}  in completion order
+          {"event": "summary", "claims", "entities", "claims_skipped", "verdicts", "entity_selection",
+           "cancelled"}                                                   last
+        Ids ("claim-0", "entity-0", ...) count claims and entities in document
+        order, so the same text always gets the same ids. The next segment is
+        only read once at most max_in_flight verifications (2 x max_workers by
+        default) are outstanding, and nothing is kept after it is yielded, so
+        memory does not grow with the document. Every claim of every segment is
+        verified unless max_claims is set; like max_entities it then caps the
+        whole document, and "claims_skipped" in the summary counts the rest. cancel is an llm_scheduler.CancelScope (a new
+        one by default): setting it, or closing the generator, drops queued
+        verifications and stops the LLM calls in flight.
+        """
+        cancel = cancel if cancel is not None else CancelScope()
+        max_in_flight = max_in_flight or 2 * self.max_workers
+        # Worker tasks run in copies of this context, so their LLM calls see the scope
+        context = contextvars.copy_context()
+        context.run(_llm_cancel.set, cancel)
+        events = queue.Queue()
+        pending = {}  # future -> ("claim", id, claim) | ("entity", id, (text, label)) | ("entities", ids, entities)
+        counts = {"claims": 0, "entities": 0, "claims_skipped": 0}
+        verdicts = {}
+        selection = {"detected": 0, "verified": 0, "calls_saved": 0}
+        seen_entities = set()
+
+        def submit(describe, fn, *args):
+            if self._executor is None:
+                future = Future()
+                try:
+                    future.set_result(context.copy().run(fn, *args))
+                except Exception as e:
+                    future.set_exception(e)
+            else:
+                future = self._executor.submit(context.copy().run, fn, *args)
+            pending[future] = describe
+            future.add_done_callback(events.put)
+
+        def claim_updates(claim_id):
+            return lambda partial: events.put(
+                {"event": "update", "kind": "claim", "id": claim_id, "result": partial}
+            )
+
+        def results(future):
+            kind, ids, items = pending.pop(future)
+            if kind == "claim":
+                return [("claim", ids, self._format_claim_result(items, self._collect(future)))]
+            if kind == "entity":
+                return [("entity", ids, self._format_entity_result(*items, self._collect(future)))]
+            try:
+                verifications = future.result()
+            except Exception as e:
+                verifications = [self._failed_verification(e)] * len(items)
+            return [
+                ("entity", entity_id, self._format_entity_result(entity_text, label, verification))
+                for entity_id, (entity_text, label), verification in zip(ids, items, verifications)
+            ]
+
+        def drain(limit):
+            """Yield events until at most limit verifications are outstanding (or the scope is cancelled)"""
+            while len(pending) > limit and not cancel.is_set():
+                try:
+                    item = events.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if not isinstance(item, Future):
+                    yield item
+                    continue
+                for kind, item_id, result in results(item):
+                    if kind == "claim":
+                        verdict = result["verdict"]
+                        verdicts[verdict] = verdicts.get(verdict, 0) + 1
+                    yield {"event": "result", "kind": kind, "id": item_id, "result": result}
+
+        try:
+            for segment in _segments(text, segment_chars):
+                if cancel.is_set():
+                    break
+                with self.metrics.span("ner"):
+                    doc = self.ner(segment)
+                candidates, stats = self.select_entities(doc)
+                selection["detected"] += stats["detected"]
+                entities = []
+                for entity_text, label in candidates:
+                    key = " ".join(entity_text.split()).casefold()
+                    if key in seen_entities or (self.max_entities is not None
+                                                and len(seen_entities) >= self.max_entities):
+                        continue
+                    seen_entities.add(key)
+                    entities.append((entity_text, label))
+                claims = self.extract_claims(segment, doc=doc)
+                if self.max_claims is not None:
+                    room = max(self.max_claims - counts["claims"], 0)
+                    if len(claims) > room:
+                        counts["claims_skipped"] += len(claims) - room
+                        self.metrics.incr("claims_skipped", len(claims) - room)
+                        claims = claims[:room]
+
+                claim_ids = [f"claim-{counts['claims'] + i}" for i in range(len(claims))]
+                entity_ids = [f"entity-{counts['entities'] + i}" for i in range(len(entities))]
+                counts["claims"] += len(claims)
+                counts["entities"] += len(entities)
+                for claim_id, claim in zip(claim_ids, claims):
+                    yield {"event": "queued", "kind": "claim", "id": claim_id, "text": claim}
+                for entity_id, (entity_text, _) in zip(entity_ids, entities):
+                    yield {"event": "queued", "kind": "entity", "id": entity_id, "text": entity_text}
+
+                claim_ents = self._claim_ents(doc, claims)
+                corpus_version = self.corpus_version
+                retrieved, cached, embeddings = self._retrieve_with_cache(
+                    claims + [entity_text for entity_text, _ in entities],
+                    [True] * len(claims) + [False] * len(entities), confidence_threshold,
+                    claim_ents + [None] * len(entities)
+                )
+                for i, (claim_id, claim) in enumerate(zip(claim_ids, claims)):
+                    submit(("claim", claim_id, claim), self._verify_claim_cached, claim, confidence_threshold,
+                           retrieved[i], claim_updates(claim_id), cached[i], embeddings[i], claim_ents[i],
+                           corpus_version)
+                entity_retrieved = retrieved[len(claims):]
+                if self.batch_entities and len(entities) > 1:
+                    submit(("entities", entity_ids, entities), self.verify_entities_batch,
+                           [entity_text for entity_text, _ in entities], confidence_threshold, entity_retrieved)
+                else:
+                    for entity_id, entity, hits in zip(entity_ids, entities, entity_retrieved):
+                        submit(("entity", entity_id, entity), self.verify_single_entity, entity[0],
+                               confidence_threshold, hits)
+                yield from drain(max_in_flight)
+            yield from drain(0)
+
+            selection["verified"] = len(seen_entities)
+            selection["calls_saved"] = selection["detected"] - selection["verified"]
+            yield {
+                "event": "summary",
+                **counts,
+                "verdicts": verdicts,
+                "entity_selection": selection,
+                "cancelled": cancel.is_set()
+            }
+        finally:
+            if pending:
+                # Cancelled, or the consumer stopped reading: stop everything still running
+                cancel.set()
+                for future in list(pending):
+                    future.cancel()
+
+    def verify_many(self, texts, confidence_threshold=0.5, batch_size=32):
+        """
+        Bulk verification: yields one verify_claim-style result per input text,
+        in input order. Texts are processed batch_size at a time with a single
+        nlp.pipe pass and a single batched retrieval per batch, while the LLM
+        calls of the previous batch are still in flight on the worker pool.
+        """
+        pending = deque()
+        for batch in _batched(texts, batch_size):
+            prepared = []
+            queries = []
+            is_claim = []
+            all_claim_ents = []
+            docs = list(self.ner.pipe(batch, batch_size=batch_size))
+            for doc, claims in zip(docs, self.extract_claims_batch(batch, docs)):
+                entities, selection = self.select_entities(doc)
+                claims, skipped = self._cap_claims(claims)
+                claim_ents = self._claim_ents(doc, claims)
+                prepared.append((claims, entities, selection, skipped, claim_ents))
+                queries.extend(claims + [entity_text for entity_text, _ in entities])
+                is_claim.extend([True] * len(claims) + [False] * len(entities))
+                all_claim_ents.extend(claim_ents + [None] * len(entities))
+
+            corpus_version = self.corpus_version
+            retrieved, cached, embeddings = self._retrieve_with_cache(queries, is_claim, confidence_threshold,
+                                                                      all_claim_ents)
+            offset = 0
+            for claims, entities, selection, skipped, claim_ents in prepared:
+                count = len(claims) + len(entities)
+                claims_end = offset + len(claims)
+                pending.append((self._start_verification(
+                    claims, entities, confidence_threshold, retrieved[offset:offset + count], None,
+                    cached[offset:claims_end], embeddings[offset:claims_end], claim_ents, corpus_version
+                ), selection, skipped))
+                offset += count
+
+            # Keep at most one batch queued behind the one being collected
+            while len(pending) > batch_size:
+                collect, selection, skipped = pending.popleft()
+                yield {**collect(), "entity_selection": selection, "claims_skipped": skipped}
+
+        while pending:
+            collect, selection, skipped = pending.popleft()
+            yield {**collect(), "entity_selection": selection, "claims_skipped": skipped}
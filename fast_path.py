@@ -0,0 +1,189 @@
+import re
+import unicodedata
+
+# Rule-based pre-verifier for verify_single_claim. It compares a claim with the
+# top evidence title and only settles the two cases it can call with high
+# precision: a near-verbatim restatement (True) and a near-verbatim copy that
+# changes a number, date or named entity (False) when no other retrieved title
+# has the claim's value. Everything else returns None and goes to the LLM,
+# including any pair where one side is negated and the other is not.
+
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "at", "to", "for", "by", "with", "and", "or", "from", "as",
+    "is", "are", "was", "were", "be", "been", "has", "have", "had", "its", "it", "this", "that",
+    "shri", "smt", "dr"
+}
+MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3, "apr": 4, "april": 4,
+    "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7, "aug": 8, "august": 8, "sep": 9, "sept": 9,
+    "september": 9, "oct": 10, "october": 10, "nov": 11, "november": 11, "dec": 12, "december": 12
+}
+# Entity labels compared between claim and evidence
+CHECKED_LABELS = {"PERSON", "ORG", "GPE", "LOC", "FAC", "EVENT", "LAW", "NORP"}
+
+# Negations and polarity-reversing verbs, mapped to one marker per meaning. Claim and
+# evidence must carry the same markers: "X never inaugurates Y" shares every other
+# token with "X inaugurates Y". ("t" is what normalize() leaves of "didn't", "can't".)
+POLARITY_MARKERS = {
+    **dict.fromkeys(["not", "no", "never", "none", "nor", "neither", "without", "cannot", "nothing", "t"], "not"),
+    **dict.fromkeys(["deny", "denies", "denied", "refute", "refutes", "refuted", "dismisses", "dismissed"], "deny"),
+    **dict.fromkeys(["fail", "fails", "failed"], "fail"),
+    **dict.fromkeys(["reject", "rejects", "rejected", "refuse", "refuses", "refused"], "reject"),
+    **dict.fromkeys(["cancel", "cancels", "cancelled", "canceled", "scrap", "scraps", "scrapped",
+                     "withdraw", "withdraws", "withdrew", "withdrawn", "halt", "halts", "halted"], "cancel"),
+    **dict.fromkeys(["fake", "false", "misleading", "hoax"], "false")
+}
+
+SUPPORT_SIMILARITY = 0.80
+SUPPORT_COVERAGE = 0.95
+SUPPORT_EVIDENCE_COVERAGE = 0.85  # share of the evidence's tokens the claim must repeat
+CONTRADICT_SIMILARITY = 0.75
+CONTRADICT_COVERAGE = 0.70
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = re.sub(r"(?<=\d),(?=\d)", "", text)  # 1,500 -> 1500
+    text = re.sub(r"[^\w\s.]", " ", text)
+    text = re.sub(r"(?<!\d)\.|\.(?!\d)", " ", text)
+    return " ".join(text.split())
+
+
+def content_tokens(normalized):
+    return {token for token in normalized.split() if token not in STOPWORDS}
+
+
+def numbers(normalized):
+    """Numeric tokens other than years and days of a month (those are compared as dates)"""
+    tokens = normalized.split()
+    return {
+        token for i, token in enumerate(tokens)
+        if re.fullmatch(r"\d+(?:\.\d+)?", token) and not _is_year(token)
+        and not (i + 1 < len(tokens) and tokens[i + 1] in MONTHS)
+    }
+
+
+def dates(normalized):
+    """Set of (year, month, day) parts mentioned, each possibly None"""
+    found = set()
+    tokens = normalized.split()
+    for i, token in enumerate(tokens):
+        if token in MONTHS:
+            month = MONTHS[token]
+            day = tokens[i - 1] if i > 0 and tokens[i - 1].isdigit() and int(tokens[i - 1]) <= 31 else None
+            year = tokens[i + 1] if i + 1 < len(tokens) and _is_year(tokens[i + 1]) else None
+            found.add((year, month, day))
+    found.update((year, None, None) for year in tokens if _is_year(year))
+    return found
+
+
+def polarity(normalized):
+    """Negation / polarity markers present in a normalized text"""
+    return {POLARITY_MARKERS[token] for token in normalized.split() if token in POLARITY_MARKERS}
+
+
+def _is_year(token):
+    return token.isdigit() and len(token) == 4 and 1900 <= int(token) <= 2100
+
+
+def _entities(ner, text, ents=None):
+    """Checked entity names by label, from ents when the caller already parsed text"""
+    if ents is None:
+        if ner is None:
+            return {}
+        ents = ner(text).ents
+    by_label = {}
+    for ent in ents:
+        if ent.label_ in CHECKED_LABELS:
+            by_label.setdefault(ent.label_, set()).add(normalize(ent.text))
+    return by_label
+
+
+def _years(date_set):
+    return {year for year, _, _ in date_set if year}
+
+
+def _has_any(normalized, differing):
+    """True if a text mentions any of the claim's values that differ from the top evidence"""
+    return bool(
+        differing["numbers"] & numbers(normalized)
+        or differing["years"] & _years(dates(normalized))
+        or differing["days"] & {(m, d) for _, m, d in dates(normalized) if m and d}
+        or any(name in normalized for name in differing["names"])
+    )
+
+
+def pre_verify(claim, evidence_text, similarity, ner=None, other_evidence=(), claim_ents=None):
+    """
+    Returns {"verdict", "reasoning", "rule"} when the claim can be settled
+    against evidence_text (the top retrieved title) without the LLM, otherwise
+    None. other_evidence are the other retrieved titles: a contradiction is only
+    returned when none of them has the claim's differing value. claim_ents are
+    the claim's entities from a parse the caller already made; without them
+    ner is run on the claim.
+    """
+    if similarity < CONTRADICT_SIMILARITY:
+        return None
+    claim_norm, evidence_norm = normalize(claim), normalize(evidence_text)
+    claim_tokens, evidence_tokens = content_tokens(claim_norm), content_tokens(evidence_norm)
+    if not claim_tokens:
+        return None
+    coverage = len(claim_tokens & evidence_tokens) / len(claim_tokens)
+    if coverage < CONTRADICT_COVERAGE:
+        return None
+    if polarity(claim_norm) != polarity(evidence_norm):
+        return None  # one side negates (or denies, cancels, ...) what the other states
+    evidence_coverage = len(claim_tokens & evidence_tokens) / len(evidence_tokens) if evidence_tokens else 0.0
+
+    claim_numbers, evidence_numbers = numbers(claim_norm), numbers(evidence_norm)
+    claim_dates, evidence_dates = dates(claim_norm), dates(evidence_norm)
+    claim_entities, evidence_entities = _entities(ner, claim, claim_ents), _entities(ner, evidence_text)
+
+    # A detail of the same kind present in both texts but with different values
+    mismatches = []
+    differing = {"numbers": set(), "years": set(), "days": set(), "names": set()}
+    if claim_numbers and evidence_numbers and not claim_numbers <= evidence_numbers:
+        differing["numbers"] = claim_numbers - evidence_numbers
+        mismatches.append(f"numbers {sorted(differing['numbers'])} not in evidence")
+    claim_years, evidence_years = _years(claim_dates), _years(evidence_dates)
+    if claim_years and evidence_years and not claim_years <= evidence_years:
+        differing["years"] = claim_years - evidence_years
+        mismatches.append(f"year {sorted(differing['years'])} differs from evidence")
+    claim_days = {(m, d) for _, m, d in claim_dates if m and d}
+    evidence_days = {(m, d) for _, m, d in evidence_dates if m and d}
+    if claim_days and evidence_days and not claim_days <= evidence_days:
+        differing["days"] = claim_days - evidence_days
+        mismatches.append("date differs from evidence")
+    for label, names in claim_entities.items():
+        other = evidence_entities.get(label)
+        missing = {n for n in names - (other or set()) if n not in evidence_norm}
+        if other and missing:
+            differing["names"] |= missing
+            mismatches.append(f"{label} {sorted(missing)} not in evidence")
+
+    if mismatches:
+        # PIB titles are formulaic: the top hit may be last month's release while another
+        # retrieved title carries the claim's figure or date; let the LLM weigh them
+        if any(_has_any(normalize(text), differing) for text in other_evidence):
+            return None
+        return {
+            "verdict": "False",
+            "reasoning": "Claim closely matches the top evidence but " + "; ".join(mismatches) + ".",
+            "rule": "contradiction"
+        }
+
+    details_match = (
+        claim_numbers <= evidence_numbers
+        and claim_years <= evidence_years
+        and claim_days <= evidence_days
+        and all(names <= evidence_entities.get(label, set()) or all(n in evidence_norm for n in names)
+                for label, names in claim_entities.items())
+    )
+    if (similarity >= SUPPORT_SIMILARITY and coverage >= SUPPORT_COVERAGE
+            and evidence_coverage >= SUPPORT_EVIDENCE_COVERAGE and details_match):
+        return {
+            "verdict": "True",
+            "reasoning": "Claim restates the top evidence with all numbers, dates and names matching.",
+            "rule": "near_verbatim"
+        }
+    return None
@@ -0,0 +1,260 @@
+import argparse
+import atexit
+import csv
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+# User feedback on verdicts, kept in SQLite (WAL mode) instead of a flat CSV.
+# record() only puts the row on a bounded in-memory queue; one writer thread
+# commits whatever has queued up in a single transaction (group commit), so
+# the Streamlit thread never touches the disk and processes sharing the file
+# never interleave partial rows. The query helpers run on indexed columns.
+# Feedback on a multi-claim input is stored as one row per extracted claim,
+# each with that claim's own verdict; "input" keeps the text the user entered.
+
+FEEDBACK_DB = "data/feedback.sqlite"
+LEGACY_CSV = "data/feedback_log.csv"
+
+_COLUMNS = ("created", "claim", "verdict", "confidence", "evidence", "reasoning", "feedback", "helpful", "input")
+_INSERT = f"INSERT INTO feedback ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+
+
+def is_helpful(feedback):
+    """1 for a thumbs-up, 0 for a thumbs-down, None if the answer is not recognised"""
+    text = str(feedback).strip().lower()
+    if text.startswith("👍") or text in ("yes", "1", "true"):
+        return 1
+    if text.startswith("👎") or text in ("no", "0", "false"):
+        return 0
+    return None
+
+
+def _verifications_of(text, result):
+    """(claim, verification) pairs feedback on result refers to: one per claim of a verify_claim result"""
+    claims = result.get("claims")
+    if claims:
+        return [(verification.get("claim") or text, verification) for verification in claims]
+    return [(text, result)]
+
+
+class FeedbackStore:
+    def __init__(self, path=FEEDBACK_DB, max_queue=1000, batch_size=200, flush_interval=0.2,
+                 legacy_csv=LEGACY_CSV):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.commits = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # durable at each checkpoint; safe with WAL
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS feedback (
+                id INTEGER PRIMARY KEY,
+                created TEXT NOT NULL,
+                claim TEXT NOT NULL,
+                verdict TEXT,
+                confidence REAL,
+                evidence TEXT,
+                reasoning TEXT,
+                feedback TEXT,
+                helpful INTEGER,
+                input TEXT
+            )"""
+        )
+        # Stores created before per-claim rows have no input column
+        if "input" not in {column[1] for column in self._conn.execute("PRAGMA table_info(feedback)")}:
+            self._conn.execute("ALTER TABLE feedback ADD COLUMN input TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_feedback_created ON feedback(created)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_feedback_verdict ON feedback(verdict, helpful)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_feedback_claim ON feedback(claim, helpful)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS imports (source TEXT PRIMARY KEY, rows INTEGER, imported TEXT)"
+        )
+        self._conn.commit()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="feedback-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        if legacy_csv:
+            self.import_csv(legacy_csv)
+
+    def record(self, text, result, feedback, timeout=0.05):
+        """
+        Queue feedback on the verification of text: one row per claim in result,
+        with that claim's verdict. False if any row was dropped (queue stayed full).
+        """
+        created = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        helpful = is_helpful(feedback)
+        queued = True
+        for claim, verification in _verifications_of(text, result):
+            row = (
+                created,
+                claim,
+                verification.get("verdict", ""),
+                verification.get("confidence"),
+                json.dumps(verification.get("evidence", []), ensure_ascii=False),
+                verification.get("reasoning", ""),
+                feedback,
+                helpful,
+                text
+            )
+            try:
+                self._queue.put(row, timeout=timeout)
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+                queued = False
+        return queued
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                self._queue.task_done()
+                return
+            rows = [first]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(rows) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    row = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if row is None:
+                    stop = True
+                    break
+                rows.append(row)
+            self._write(rows)
+            for _ in range(len(rows) + stop):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, rows):
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.executemany(_INSERT, rows)
+            except sqlite3.Error as e:
+                self.dropped += len(rows)
+                print(f"Feedback write failed, {len(rows)} rows lost: {e}")
+                return
+            self.written += len(rows)
+            self.commits += 1
+
+    def flush(self):
+        """Block until everything queued so far is committed"""
+        self._queue.join()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def import_csv(self, path=LEGACY_CSV):
+        """One-shot import of a store_feedback_csv log; returns rows imported (0 if already done)"""
+        source = os.path.abspath(path)
+        if not os.path.exists(path):
+            return 0
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM imports WHERE source = ?", (source,)).fetchone():
+                return 0
+        rows = []
+        with open(path, newline='', encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    confidence = float(row["confidence"])
+                except (KeyError, TypeError, ValueError):
+                    confidence = None
+                rows.append((
+                    row.get("datetime", ""),
+                    row.get("claim", ""),
+                    row.get("verdict", ""),
+                    confidence,
+                    json.dumps([e for e in (row.get("evidence") or "").split("|") if e], ensure_ascii=False),
+                    row.get("reasoning", ""),
+                    row.get("feedback", ""),
+                    is_helpful(row.get("feedback", "")),
+                    row.get("claim", "")
+                ))
+        # The imports row commits with the data: a crash cannot import twice, and a
+        # replica importing at the same time rolls back on the primary key
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.executemany(_INSERT, rows)
+                    self._conn.execute("INSERT INTO imports (source, rows, imported) VALUES (?, ?, ?)",
+                                       (source, len(rows), datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+            except sqlite3.IntegrityError:
+                return 0
+        return len(rows)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def accuracy_by_day(self, days=30):
+        """Share of thumbs-up per day over the last days days, oldest first"""
+        rows = self._query(
+            """SELECT substr(created, 1, 10) AS day, COUNT(*), SUM(helpful)
+               FROM feedback WHERE helpful IS NOT NULL AND created >= date('now', 'localtime', ?)
+               GROUP BY day ORDER BY day""",
+            (f"-{days} days",)
+        )
+        return [{"day": day, "votes": votes, "helpful": helpful, "accuracy": helpful / votes}
+                for day, votes, helpful in rows]
+
+    def thumbs_down_by_verdict(self):
+        """Thumbs-down rate for each verdict the checker gave"""
+        rows = self._query(
+            """SELECT verdict, COUNT(*), COUNT(*) - SUM(helpful)
+               FROM feedback WHERE helpful IS NOT NULL GROUP BY verdict ORDER BY verdict"""
+        )
+        return {verdict or "Unknown": {"votes": votes, "thumbs_down": down, "rate": down / votes}
+                for verdict, votes, down in rows}
+
+    def most_disputed(self, limit=10):
+        """Claims with the most thumbs-down, with their latest verdict"""
+        rows = self._query(
+            """SELECT claim, COUNT(*) - SUM(helpful) AS down, COUNT(*),
+                      (SELECT verdict FROM feedback AS latest WHERE latest.claim = feedback.claim
+                       ORDER BY latest.id DESC LIMIT 1)
+               FROM feedback WHERE helpful IS NOT NULL
+               GROUP BY claim HAVING down > 0 ORDER BY down DESC, COUNT(*) DESC LIMIT ?""",
+            (limit,)
+        )
+        return [{"claim": claim, "thumbs_down": down, "votes": votes, "verdict": verdict}
+                for claim, down, votes, verdict in rows]
+
+    def stats(self):
+        with self._lock:
+            return {"written": self.written, "dropped": self.dropped, "commits": self.commits,
+                    "queued": self._queue.qsize()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import and summarise verdict feedback")
+    parser.add_argument("--db", default=FEEDBACK_DB)
+    parser.add_argument("--import-csv", default=LEGACY_CSV, help="Legacy feedback_log.csv to import once")
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+
+    store = FeedbackStore(args.db, legacy_csv=None)
+    print(f"Imported {store.import_csv(args.import_csv)} rows from {args.import_csv}")
+    for day in store.accuracy_by_day(args.days):
+        print(f"{day['day']}: {100 * day['accuracy']:.0f}% helpful ({day['votes']} votes)")
+    for verdict, stats in store.thumbs_down_by_verdict().items():
+        print(f"{verdict}: {100 * stats['rate']:.0f}% thumbs-down ({stats['votes']} votes)")
+    for item in store.most_disputed():
+        print(f"{item['thumbs_down']} x 👎 [{item['verdict']}] {item['claim']}")
+    store.close()
@@ -0,0 +1,65 @@
+import json
+import re
+
+# Incremental parsing of a JSON object that is still streaming in from the LLM,
+# so fields such as "verdict" can be used before the rest of the reply arrives.
+# Only top-level fields are tracked; robust_json_extractor still parses the
+# complete reply.
+
+_KEY = re.compile(r'\s*[{,]\s*"((?:\\.|[^"\\])*)"\s*:\s*', re.DOTALL)
+_DECODER = json.JSONDecoder(strict=False)  # models emit raw newlines inside strings
+
+
+class IncrementalJSONParser:
+    def __init__(self):
+        self.buffer = ""
+        self.fields = {}
+        self._pos = None  # where the next unparsed "key": value starts
+
+    def feed(self, chunk):
+        """Add streamed text; returns the top-level fields completed by it"""
+        self.buffer += chunk
+        if self._pos is None:
+            start = self.buffer.find("{")  # skip any ```json fence or preamble
+            if start < 0:
+                return {}
+            self._pos = start
+        completed = {}
+        while True:
+            match = _KEY.match(self.buffer, self._pos)
+            if not match or match.end() >= len(self.buffer):
+                break
+            value_start = match.end()
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, value_start)
+            except ValueError:
+                break  # value still incomplete
+            if self.buffer[value_start] not in '"[{' and (end >= len(self.buffer) or self.buffer[end] not in ',}] \t\r\n'):
+                break  # a number or literal needs its delimiter, or it may still grow
+            key = _unescape(match.group(1))
+            self.fields[key] = completed[key] = value
+            self._pos = end
+        return completed
+
+    def partial(self, key):
+        """The value of key if complete, or the text so far of a string value still streaming in"""
+        if key in self.fields:
+            return self.fields[key]
+        if self._pos is None:
+            return None
+        match = _KEY.match(self.buffer, self._pos)
+        if not match or _unescape(match.group(1)) != key or not self.buffer.startswith('"', match.end()):
+            return None
+        raw = self.buffer[match.end() + 1:]
+        # Drop a trailing escape sequence that has not fully arrived
+        if (len(raw) - len(raw.rstrip("\\"))) % 2:
+            raw = raw[:-1]
+        raw = re.sub(r'(?<!\\)((?:\\\\)*)\\u[0-9a-fA-F]{0,3}$', r'\1', raw)
+        return _unescape(raw)
+
+
+def _unescape(raw):
+    try:
+        return json.loads(f'"{raw}"', strict=False)
+    except ValueError:
+        return raw
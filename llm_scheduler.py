@@ -0,0 +1,343 @@
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from email.utils import parsedate_to_datetime
+
+import openai
+
+from metrics import Metrics
+
+# Rate-limit-aware front end for chat completions. Every LLM call of a
+# FactChecker goes through LLMScheduler.create: token buckets keep the process
+# inside its requests- and tokens-per-minute budget, 429 / 5xx / connection
+# failures are retried with jittered exponential backoff (never sooner than the
+# server's Retry-After), and slow non-streaming calls can be hedged with one
+# duplicate request, the first reply winning. A CancelScope abandons a group
+# of calls: queued ones raise Cancelled, streamed replies are closed.
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+DEFAULT_COMPLETION_TOKENS = 256  # budgeted for calls that do not set max_tokens
+
+
+def estimate_tokens(messages, max_tokens=None):
+    """Rough token cost of a call for the budget: ~4 characters per prompt token plus the reply"""
+    prompt_chars = sum(len(str(m.get("content", ""))) for m in messages)
+    return prompt_chars // 4 + (max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+
+def retry_after_seconds(response):
+    """Seconds the server asked us to wait (Retry-After / retry-after-ms), or None"""
+    if response is None:
+        return None
+    headers = response.headers
+    for header, divisor in (("retry-after-ms", 1000), ("retry-after", 1)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return max(float(value) / divisor, 0.0)
+        except ValueError:
+            pass
+    try:
+        return max(parsedate_to_datetime(headers.get("retry-after")).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _sleep(seconds, cancel):
+    """time.sleep that returns True as soon as cancel is set (cancel may be None)"""
+    if cancel is None:
+        time.sleep(seconds)
+        return False
+    return cancel.wait(seconds)
+
+
+class Cancelled(Exception):
+    """The call was given up through its CancelScope"""
+
+
+class CancelScope:
+    """
+    Cancellation for a group of LLM calls, e.g. one streaming verification.
+    set() makes calls still waiting for budget, a slot or a retry raise
+    Cancelled and closes the replies being streamed, so their connections
+    stop. Works wherever a threading.Event is expected (is_set / wait).
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._streams = set()
+
+    def set(self):
+        with self._lock:
+            self._event.set()
+            streams, self._streams = self._streams, set()
+        for stream in streams:
+            try:
+                stream.close()
+            except Exception:
+                pass  # the reader thread sees the broken stream and raises Cancelled
+
+    def is_set(self):
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        return self._event.wait(timeout)
+
+    def track(self, stream):
+        """Close stream when the scope is cancelled (right away if it already is)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._streams.add(stream)
+                return
+        stream.close()
+
+    def untrack(self, stream):
+        with self._lock:
+            self._streams.discard(stream)
+
+
+class TokenBucket:
+    """
+    Refills rate_per_minute units per minute, holding at most capacity (one
+    minute's worth by default). reserve() may run the bucket into debt and
+    returns how long the caller has to wait, so waiting callers go in arrival order.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount):
+        with self._lock:
+            self._refill()
+            self.level -= min(amount, self.capacity)  # an oversized call still goes through eventually
+            return max(-self.level / self.rate, 0.0)
+
+    def try_take(self, amount):
+        """Take amount only if it is available right now"""
+        with self._lock:
+            self._refill()
+            if self.level < amount:
+                return False
+            self.level -= amount
+            return True
+
+    def refund(self, amount):
+        """Give back an over-estimate (a negative amount charges an under-estimate)"""
+        with self._lock:
+            self._refill()
+            self.level = min(self.capacity, self.level + amount)
+
+    def pause(self, seconds):
+        """The server says we are over budget: hand out nothing for the next seconds"""
+        with self._lock:
+            self._refill()
+            self.level = min(self.level, -seconds * self.rate)
+
+    def available(self):
+        with self._lock:
+            self._refill()
+            return self.level
+
+
+class LLMScheduler:
+    """
+    Drop-in for client.chat.completions.create shared by every caller in the
+    process. requests_per_minute / tokens_per_minute / max_concurrency of None
+    mean no limit. hedge_after (seconds) sends a duplicate of a non-streaming
+    call that has not answered by then, if the budget allows one right away.
+    """
+
+    def __init__(self, client, requests_per_minute=None, tokens_per_minute=None, max_concurrency=None,
+                 max_retries=4, base_delay=0.5, max_delay=30.0, hedge_after=None, metrics=None):
+        self.client = client
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_after = hedge_after
+        self._hedge_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge") if hedge_after else None
+        self.metrics = metrics or Metrics(enabled=False)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._in_flight = 0
+        self._counts = dict.fromkeys(
+            ["calls", "retries", "throttled", "budget_waits", "hedges", "hedge_wins", "failures", "cancelled"], 0
+        )
+        self._wait_seconds = 0.0
+
+    def create(self, cancel=None, **params):
+        """
+        chat.completions.create(**params) within budget, with retries. Once cancel
+        (a CancelScope or threading.Event) is set, a call still waiting for budget,
+        a slot or its next attempt raises Cancelled.
+        """
+        estimate = estimate_tokens(params.get("messages", []), params.get("max_tokens"))
+        self._count("calls")
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._acquire(estimate, cancel)
+                if self._hedge_pool is not None and not params.get("stream"):
+                    completion = self._hedged(estimate, params)
+                else:
+                    completion = self._call(params)
+            except Cancelled:
+                self._count("cancelled")
+                raise
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None or attempt == self.max_retries:
+                    self._count("failures")
+                    raise
+                self._count("retries", "llm_retries")
+                if _sleep(delay, cancel):
+                    self._count("cancelled")
+                    raise Cancelled() from e
+                continue
+            self._settle(estimate, completion)
+            return completion
+
+    def _count(self, name, metric=None):
+        with self._lock:
+            self._counts[name] += 1
+        if metric:
+            self.metrics.incr(metric)
+
+    def _acquire(self, estimate, cancel=None):
+        """Wait for request and token budget, then for a free slot; the caller then owns a slot"""
+        if cancel is not None and cancel.is_set():
+            raise Cancelled()
+        with self._lock:
+            self._queued += 1
+        try:
+            with self.metrics.span("llm_queue"):
+                delay = 0.0
+                if self.requests is not None:
+                    delay = self.requests.reserve(1)
+                if self.tokens is not None:
+                    delay = max(delay, self.tokens.reserve(estimate))
+                if delay > 0:
+                    self._count("budget_waits", "llm_budget_waits")
+                    with self._lock:
+                        self._wait_seconds += delay
+                    if _sleep(delay, cancel):
+                        self._refund(estimate)
+                        raise Cancelled()
+                if self._slots is not None:
+                    while not self._slots.acquire(timeout=None if cancel is None else 0.1):
+                        if cancel.is_set():
+                            self._refund(estimate)
+                            raise Cancelled()
+        finally:
+            with self._lock:
+                self._queued -= 1
+
+    def _try_acquire(self, estimate):
+        """Non-blocking _acquire for hedges: budget and a slot now, or nothing"""
+        if self._slots is not None and not self._slots.acquire(blocking=False):
+            return False
+        if self.requests is not None and not self.requests.try_take(1):
+            self._release()
+            return False
+        if self.tokens is not None and not self.tokens.try_take(estimate):
+            if self.requests is not None:
+                self.requests.refund(1)
+            self._release()
+            return False
+        return True
+
+    def _refund(self, estimate):
+        """Give back the budget reserved for a call that was never sent"""
+        if self.requests is not None:
+            self.requests.refund(1)
+        if self.tokens is not None:
+            self.tokens.refund(estimate)
+
+    def _release(self):
+        if self._slots is not None:
+            self._slots.release()
+
+    def _call(self, params):
+        """One HTTP request on a slot taken by _acquire; a stream gives its slot back once the reply starts"""
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self.client.chat.completions.create(**params)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._release()
+
+    def _hedged(self, estimate, params):
+        primary = self._hedge_pool.submit(self._call, params)
+        try:
+            return primary.result(timeout=self.hedge_after)
+        except FutureTimeout:
+            pass
+        if not self._try_acquire(estimate):
+            return primary.result()
+        self._count("hedges", "llm_hedges")
+        hedge = self._hedge_pool.submit(self._call, params)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count("hedge_wins", "llm_hedge_wins")
+                    return future.result()
+        raise primary.exception()
+
+    def _retry_delay(self, error, attempt):
+        """Seconds to wait before retrying error, or None if it should not be retried"""
+        if isinstance(error, openai.APIStatusError):
+            if error.status_code not in RETRYABLE_STATUS:
+                return None
+        elif not isinstance(error, openai.APIConnectionError):  # includes APITimeoutError
+            return None
+        # Full jitter keeps callers that failed together from retrying together
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        retry_after = retry_after_seconds(getattr(error, "response", None))
+        if getattr(error, "status_code", None) == 429:
+            self._count("throttled", "llm_throttled")
+            if retry_after is not None and self.requests is not None:
+                self.requests.pause(retry_after)  # hold back every caller, not just this one
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                return None  # fail now rather than hold the request for minutes
+            delay = retry_after + random.uniform(0, self.base_delay)
+        return delay
+
+    def _settle(self, estimate, completion):
+        """Correct the token budget with the reported usage (streams keep the estimate)"""
+        usage = getattr(completion, "usage", None)
+        if self.tokens is not None and usage is not None and usage.total_tokens:
+            self.tokens.refund(estimate - usage.total_tokens)
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "queued": self._queued,
+                "in_flight": self._in_flight,
+                **self._counts,
+                "budget_wait_seconds": self._wait_seconds
+            }
+        if self.requests is not None:
+            stats["requests_available"] = self.requests.available()
+        if self.tokens is not None:
+            stats["tokens_available"] = self.tokens.available()
+        return stats
@@ -0,0 +1,183 @@
+import bisect
+import contextvars
+import csv
+import os
+import threading
+import time
+from datetime import datetime
+
+# Lightweight instrumentation for the verification pipeline: timing spans,
+# counters, Prometheus text export and a rolling CSV log. When disabled (and no
+# request asked for its timings) span() returns a shared no-op object, so the
+# cost is one attribute check and one ContextVar lookup per call site.
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_CSV = "data/metrics_log.csv"
+
+# Per-request span list, set by FactChecker.verify_claim(include_timings=True)
+_request_spans = contextvars.ContextVar("request_spans", default=None)
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    def __init__(self, metrics, name, request_spans):
+        self.metrics = metrics
+        self.name = name
+        self.request_spans = request_spans
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        if self.metrics.enabled:
+            self.metrics.observe(self.name, elapsed)
+        if self.request_spans is not None:
+            self.request_spans.append((self.name, elapsed))
+        return False
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q):
+        """Upper bucket bound containing the q-quantile (the last finite bound for the overflow bucket)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+
+class Metrics:
+    def __init__(self, enabled=False, buckets=DEFAULT_BUCKETS, csv_path=METRICS_CSV,
+                 csv_interval=60, csv_max_bytes=5 * 1024 * 1024):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self.csv_path = csv_path
+        self.csv_interval = csv_interval
+        self.csv_max_bytes = csv_max_bytes
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._last_export = time.time()
+
+    def span(self, name):
+        request_spans = _request_spans.get()
+        if not self.enabled and request_spans is None:
+            return _NOOP
+        return _Span(self, name, request_spans)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = _Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def incr(self, name, value=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            stages = {
+                name: {
+                    "count": h.count,
+                    "sum_seconds": h.total,
+                    "p50_seconds": h.quantile(0.5),
+                    "p95_seconds": h.quantile(0.95),
+                    "p99_seconds": h.quantile(0.99)
+                }
+                for name, h in self._histograms.items()
+            }
+            return {"stages": stages, "counters": dict(self._counters)}
+
+    def to_prometheus(self):
+        """Render histograms and counters in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            if self._histograms:
+                lines.append("# HELP factchecker_stage_seconds Time spent in each verification stage")
+                lines.append("# TYPE factchecker_stage_seconds histogram")
+            for name, h in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f'factchecker_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'factchecker_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {h.count}')
+                lines.append(f'factchecker_stage_seconds_sum{{stage="{name}"}} {h.total}')
+                lines.append(f'factchecker_stage_seconds_count{{stage="{name}"}} {h.count}')
+            for name, value in sorted(self._counters.items()):
+                lines.append(f"# TYPE factchecker_{name}_total counter")
+                lines.append(f"factchecker_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def export_csv(self):
+        """Append one row per stage to the rolling CSV, rotating it to .1 once it grows past csv_max_bytes"""
+        snapshot = self.snapshot()
+        if os.path.exists(self.csv_path) and os.path.getsize(self.csv_path) > self.csv_max_bytes:
+            os.replace(self.csv_path, f"{self.csv_path}.1")
+        new_file = not os.path.exists(self.csv_path)
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with open(self.csv_path, "a", newline='', encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(["datetime", "name", "count", "sum_seconds", "p50_seconds", "p95_seconds", "p99_seconds"])
+            for name, stats in sorted(snapshot["stages"].items()):
+                writer.writerow([now, name, stats["count"], f"{stats['sum_seconds']:.6f}",
+                                 stats["p50_seconds"], stats["p95_seconds"], stats["p99_seconds"]])
+            for name, value in sorted(snapshot["counters"].items()):
+                writer.writerow([now, name, value, "", "", "", ""])
+        self._last_export = time.time()
+
+    def maybe_export_csv(self):
+        """Export at most once every csv_interval seconds; cheap to call after every request"""
+        if self.enabled and time.time() - self._last_export >= self.csv_interval:
+            self.export_csv()
+
+
+def collect_request_timings(func, *args, **kwargs):
+    """
+    Run func with per-request span collection on and return (result, timings), where
+    timings holds every span plus per-stage totals in milliseconds
+    """
+    spans = []
+    token = _request_spans.set(spans)
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        _request_spans.reset(token)
+    totals = {}
+    for name, seconds in spans:
+        totals[name] = totals.get(name, 0.0) + seconds * 1000
+    return result, {
+        "spans": [{"stage": name, "ms": seconds * 1000} for name, seconds in spans],
+        "total_ms_by_stage": totals
+    }
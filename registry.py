@@ -0,0 +1,167 @@
+import os
+import sys
+import threading
+import time
+
+# Process-wide registry of heavy resources (spaCy pipeline, embedding model,
+# Chroma clients). Each resource is loaded lazily, exactly once per process,
+# and shared by every FactChecker / Streamlit session in that process.
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+NER_MODEL = "en_core_web_sm"
+CHROMA_PATH = "app/chroma_db"
+
+_resources = {}
+_stats = {}
+_locks = {}
+_registry_lock = threading.Lock()
+
+
+def _rss_bytes():
+    """Current resident set size of this process (0 if it cannot be read)"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except Exception:
+        return 0
+
+
+def get_or_load(name, loader):
+    """Return the resource registered under name, calling loader() the first time only"""
+    if name in _resources:
+        return _resources[name]
+    with _registry_lock:
+        lock = _locks.setdefault(name, threading.Lock())
+    with lock:
+        if name not in _resources:
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            _resources[name] = loader()
+            _stats[name] = {
+                "load_seconds": time.perf_counter() - start,
+                "rss_delta_bytes": max(_rss_bytes() - rss_before, 0)
+            }
+    return _resources[name]
+
+
+def get_ner(model=NER_MODEL):
+    import spacy
+    return get_or_load(f"ner:{model}", lambda: spacy.load(model))
+
+
+def get_embedding_function(model_name=EMBEDDING_MODEL):
+    from chromadb.utils import embedding_functions
+    return get_or_load(
+        f"embedding:{model_name}",
+        lambda: embedding_functions.SentenceTransformerEmbeddingFunction(model_name=model_name)
+    )
+
+
+def get_embedding_service(model_name=EMBEDDING_MODEL, max_batch=32, max_wait=0.005):
+    """Micro-batching front end to the embedding model, shared by every caller in the process"""
+    from embedding_service import MicroBatcher
+    return get_or_load(
+        f"embedding_service:{model_name}",
+        lambda: MicroBatcher(get_embedding_function(model_name), max_batch=max_batch, max_wait=max_wait)
+    )
+
+
+def get_llm_client(base_url, api_key=None, max_connections=32):
+    """
+    One pooled OpenAI-compatible client per endpoint, with keep-alive connections
+    shared by every caller. The SDK's own retries are off: llm_scheduler retries.
+    """
+    import httpx
+    from openai import DefaultHttpxClient, OpenAI
+    return get_or_load(
+        f"llm:{base_url}",
+        lambda: OpenAI(
+            api_key=api_key or os.getenv("GROQ_API_KEY") or "stub",
+            base_url=base_url,
+            max_retries=0,
+            http_client=DefaultHttpxClient(
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+            )
+        )
+    )
+
+
+def get_chroma_client(path=CHROMA_PATH):
+    import chromadb
+    return get_or_load(f"chroma:{os.path.abspath(path)}", lambda: chromadb.PersistentClient(path=path))
+
+
+def warmup(chroma_path=CHROMA_PATH):
+    """Load every resource up front so the first request does not pay for it"""
+    get_ner()
+    embedding_function = get_embedding_function()
+    # Run one encode so lazily-initialised model weights are actually resident
+    embedding_function(["warmup"])
+    if os.path.exists(chroma_path):
+        get_chroma_client(chroma_path)
+    return report()
+
+
+_warmup_thread = None
+
+
+def start_warmup(chroma_path=CHROMA_PATH):
+    """
+    warmup() in a daemon thread, at most once per process, so the models load
+    while the server starts; a session arriving earlier waits on the same
+    per-resource locks instead of loading a second copy
+    """
+    global _warmup_thread
+    with _registry_lock:
+        if _warmup_thread is not None:
+            return _warmup_thread
+
+        def run():
+            try:
+                loaded = warmup(chroma_path)
+            except Exception as e:
+                print(f"Warm-up failed (resources load on first use instead): {e}")
+                return
+            print("Warm-up complete: " + ", ".join(f"{name} {stats['load_seconds']:.1f}s"
+                                                   for name, stats in loaded.items()))
+
+        _warmup_thread = threading.Thread(target=run, name="registry-warmup", daemon=True)
+        _warmup_thread.start()
+        return _warmup_thread
+
+
+def prefetch(model_name=EMBEDDING_MODEL, ner_model=NER_MODEL):
+    """
+    Make sure the models are on disk without loading them: checks the spaCy
+    package is installed and downloads the embedding model into the Hugging
+    Face cache. Loading happens once, in the serving process.
+    """
+    import spacy
+    from huggingface_hub import snapshot_download
+    if not spacy.util.is_package(ner_model):
+        raise RuntimeError(f"spaCy model {ner_model} is not installed (python -m spacy download {ner_model})")
+    repo = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    # PyTorch weights and configs only, not the ONNX / OpenVINO / TF / Flax exports
+    return snapshot_download(repo, ignore_patterns=["onnx/*", "openvino/*", "tf_model*", "flax_model*",
+                                                    "rust_model*", "*.h5", "*.msgpack"])
+
+
+def report():
+    """Load time and resident-memory delta for every resource loaded so far"""
+    return {name: dict(stats) for name, stats in _stats.items()}
+
+
+if __name__ == "__main__":
+    if "--prefetch" in sys.argv:
+        print(f"Models present, embedding model at {prefetch()}")
+        sys.exit(0)
+    for name, stats in warmup().items():
+        print(f"{name}: loaded in {stats['load_seconds']:.2f}s, "
+              f"+{stats['rss_delta_bytes'] / 1024 / 1024:.1f} MB RSS")
@@ -0,0 +1,327 @@
+import json
+import os
+
+import numpy as np
+
+import registry
+
+# Retrieval backends behind FactChecker.retrieve. Every backend answers
+# query()/get() in Chroma's result shape (one list per query for query(), flat
+# lists for get()), and distances are Chroma's default squared L2, so the
+# similarity maths downstream does not depend on the backend.
+
+NUMPY_INDEX_PATH = "data/vector_index"
+EMBEDDINGS_FILE = "embeddings.npy"
+CODES_FILE = "embeddings_int8.npy"
+SCALES_FILE = "scales.npy"
+DOCS_FILE = "docs.json"
+
+
+class RetrievalBackend:
+    """Interface: query() for top-k by vector, get() by id, reload() after the corpus changes"""
+
+    def query(self, query_texts=None, query_embeddings=None, n_results=3):
+        """Returns {"ids", "documents", "metadatas", "distances"}, each a list per query"""
+        raise NotImplementedError
+
+    def get(self, ids):
+        """Returns {"ids", "documents", "metadatas", "embeddings"} for the ids that exist"""
+        raise NotImplementedError
+
+    def count(self):
+        raise NotImplementedError
+
+    def reload(self):
+        pass
+
+
+class ChromaBackend(RetrievalBackend):
+    """The persistent Chroma collection (HNSW index); the default backend"""
+
+    def __init__(self, chroma_path, collection_name):
+        self.client = registry.get_chroma_client(chroma_path)
+        self.collection_name = collection_name
+        self.reload()
+
+    def reload(self):
+        self.collection = self.client.get_collection(
+            name=self.collection_name,
+            embedding_function=registry.get_embedding_function()
+        )
+
+    def query(self, query_texts=None, query_embeddings=None, n_results=3):
+        if query_embeddings is not None:
+            return self.collection.query(query_embeddings=query_embeddings, n_results=n_results,
+                                         include=["documents", "metadatas", "distances"])
+        return self.collection.query(query_texts=list(query_texts), n_results=n_results,
+                                     include=["documents", "metadatas", "distances"])
+
+    def get(self, ids):
+        return self.collection.get(ids=list(ids), include=["documents", "metadatas", "embeddings"])
+
+    def count(self):
+        return self.collection.count()
+
+
+class _IndexSnapshot:
+    """
+    One generation of the on-disk index. reload() builds a new snapshot and
+    swaps it in with a single assignment; a query reads self._index once, so it
+    never mixes the documents of one generation with the vectors of another.
+    """
+
+    def __init__(self, ids, documents, metadatas, embeddings):
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.embeddings = embeddings
+        self.position = {doc_id: i for i, doc_id in enumerate(ids)}
+
+
+class NumpyBackend(RetrievalBackend):
+    """
+    Exact search over L2-normalised float32 embeddings in a memory-mapped .npy
+    file, scanned block_size rows at a time: one matrix product per block and
+    a running top-k per query, so a batch of queries never holds a score for
+    every document. Opening the index maps the file rather than reading it, so
+    it loads almost instantly when the pages are already cached.
+    """
+
+    def __init__(self, path=NUMPY_INDEX_PATH, block_size=16384):
+        self.path = path
+        self.block_size = block_size
+        self._index = None
+        self.reload()
+
+    def reload(self):
+        index = self._load()
+        if index is not None:
+            self._index = index
+
+    def _load(self):
+        """A snapshot of the files on disk, or None when caught mid-rebuild (the current one keeps serving)"""
+        with open(os.path.join(self.path, DOCS_FILE), encoding="utf-8") as f:
+            docs = json.load(f)
+        embeddings = np.load(os.path.join(self.path, EMBEDDINGS_FILE), mmap_mode="r")
+        if embeddings.shape[0] != len(docs["ids"]):
+            # docs.json is replaced last
+            if self._index is not None:
+                return None
+            raise ValueError(f"{self.path}: {embeddings.shape[0]} embeddings for {len(docs['ids'])} documents")
+        return _IndexSnapshot(docs["ids"], docs["documents"], docs["metadatas"], embeddings)
+
+    def query(self, query_texts=None, query_embeddings=None, n_results=3):
+        index = self._index
+        if query_embeddings is None:
+            query_embeddings = registry.get_embedding_function()(list(query_texts))
+        queries = _normalize(np.asarray(query_embeddings, dtype=np.float32))
+        k = min(n_results, len(index.ids))
+        if k == 0:
+            return self._results(index, [[] for _ in queries], [[] for _ in queries])
+        top, top_scores = _scan_top_k(len(index.ids), k, self.block_size,
+                                      lambda start, end: queries @ index.embeddings[start:end].T)
+        return self._results(index, top, top_scores)
+
+    @staticmethod
+    def _results(index, top, top_scores):
+        """Chroma-shaped results from per-query candidate positions and their cosine scores"""
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for candidates, candidate_scores in zip(top, top_scores):
+            order = np.argsort(-np.asarray(candidate_scores))
+            ordered = [candidates[i] for i in order]
+            results["ids"].append([index.ids[i] for i in ordered])
+            results["documents"].append([index.documents[i] for i in ordered])
+            results["metadatas"].append([index.metadatas[i] for i in ordered])
+            # Squared L2 between unit vectors, i.e. what Chroma reports for its default space
+            results["distances"].append([float(max(2 - 2 * candidate_scores[i], 0.0)) for i in order])
+        return results
+
+    def get(self, ids):
+        index = self._index
+        positions = [index.position[doc_id] for doc_id in ids if doc_id in index.position]
+        return {
+            "ids": [index.ids[i] for i in positions],
+            "documents": [index.documents[i] for i in positions],
+            "metadatas": [index.metadatas[i] for i in positions],
+            "embeddings": index.embeddings[positions]
+        }
+
+    def count(self):
+        return len(self._index.ids)
+
+
+class QuantizedBackend(NumpyBackend):
+    """
+    Scans per-vector scaled int8 codes (388 bytes per 384-dim title instead of
+    1536) to shortlist candidates, then rescores the shortlist exactly against
+    the float32 embeddings. The codes are memory-mapped; the shortlisted float32
+    rows are read with pread, so the float32 file never becomes resident in the
+    process (mapping even a few rows can pull in whole large folios).
+    """
+
+    def __init__(self, path=NUMPY_INDEX_PATH, shortlist=50, block_size=16384):
+        self.shortlist = shortlist
+        super().__init__(path, block_size)
+
+    def _load(self):
+        index = super()._load()
+        if index is None:
+            return None
+        codes = np.load(os.path.join(self.path, CODES_FILE), mmap_mode="r")
+        scales = np.load(os.path.join(self.path, SCALES_FILE), mmap_mode="r")
+        if codes.shape[0] != len(index.ids) or scales.shape[0] != len(index.ids):
+            if self._index is not None:
+                return None  # caught mid-rebuild
+            raise ValueError(f"{self.path}: quantized index does not match {len(index.ids)} documents")
+        index.codes = codes
+        index.scales = scales
+        # Own descriptor per index generation: a rebuild replaces the file, this keeps reading the old one.
+        # It is never closed explicitly; it closes when the last query holding this snapshot lets go of it.
+        index.float_file = open(os.path.join(self.path, EMBEDDINGS_FILE), "rb")
+        index.row_bytes = index.embeddings.shape[1] * index.embeddings.itemsize
+        index.data_offset = index.embeddings.offset
+        return index
+
+    @staticmethod
+    def _float_rows(index, positions):
+        fd = index.float_file.fileno()
+        data = b"".join(os.pread(fd, index.row_bytes, index.data_offset + int(i) * index.row_bytes)
+                        for i in positions)
+        return np.frombuffer(data, dtype=np.float32).reshape(len(positions), -1)
+
+    def query(self, query_texts=None, query_embeddings=None, n_results=3):
+        index = self._index
+        if query_embeddings is None:
+            query_embeddings = registry.get_embedding_function()(list(query_texts))
+        queries = _normalize(np.asarray(query_embeddings, dtype=np.float32))
+        k = min(n_results, len(index.ids))
+        if k == 0:
+            return self._results(index, [[] for _ in queries], [[] for _ in queries])
+
+        # Approximate scores block by block, keeping only the running shortlist per query
+        shortlist, _ = _scan_top_k(
+            len(index.ids), min(max(self.shortlist, k), len(index.ids)), self.block_size,
+            lambda start, end: (queries @ index.codes[start:end].astype(np.float32).T) * index.scales[start:end]
+        )
+
+        top, top_scores = [], []
+        for query, candidates in zip(queries, shortlist):
+            candidates = np.sort(candidates)  # ascending file offsets
+            exact = self._float_rows(index, candidates) @ query
+            best = _top_k(exact[None, :], k)[0]
+            top.append(candidates[best])
+            top_scores.append(exact[best])
+        return self._results(index, top, top_scores)
+
+
+def _scan_top_k(count, k, block_size, block_scores):
+    """
+    Positions and scores of the k highest of count scores per query, where
+    block_scores(start, end) scores rows start..end for every query. Each
+    block's own top-k is merged into the running top-k, so scratch memory is
+    one block plus k per query rather than a score for every row.
+    """
+    top = top_scores = None
+    for start in range(0, count, block_size):
+        end = min(start + block_size, count)
+        scores = block_scores(start, end)
+        best = _top_k(scores, min(k, end - start))
+        candidates = best + start
+        candidate_scores = np.take_along_axis(scores, best, axis=1)
+        if top is not None:
+            candidates = np.concatenate([top, candidates], axis=1)
+            candidate_scores = np.concatenate([top_scores, candidate_scores], axis=1)
+        keep = _top_k(candidate_scores, min(k, candidates.shape[1]))
+        top = np.take_along_axis(candidates, keep, axis=1)
+        top_scores = np.take_along_axis(candidate_scores, keep, axis=1)
+    return top, top_scores
+
+
+def _top_k(scores, k):
+    """Unordered positions of the k highest scores in each row"""
+    if k < scores.shape[1]:
+        return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+
+
+def quantize(embeddings):
+    """Symmetric per-vector int8 quantization; returns (codes, scales) with embeddings ~= codes * scales"""
+    scales = np.abs(embeddings).max(axis=1) / 127
+    scales[scales == 0] = 1
+    codes = np.clip(np.rint(embeddings / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def iter_collection(collection, include, page_size=5000):
+    """Yield collection.get() pages; a single get() of a large collection exceeds SQLite's variable limit"""
+    for offset in range(0, collection.count(), page_size):
+        yield collection.get(include=include, limit=page_size, offset=offset)
+
+
+def build_numpy_index(collection, path=NUMPY_INDEX_PATH):
+    """
+    Export a Chroma collection to the NumpyBackend / QuantizedBackend files
+    (float32 embeddings, int8 codes + scales, docs) page by page, writing the
+    arrays straight into memory-mapped .npy files; returns the document count
+    """
+    os.makedirs(path, exist_ok=True)
+    count = collection.count()
+    ids, documents, metadatas = [], [], []
+    arrays = {}
+    for page in iter_collection(collection, ["documents", "metadatas", "embeddings"]):
+        embeddings = _normalize(np.asarray(page["embeddings"], dtype=np.float32).reshape(len(page["ids"]), -1))
+        if not arrays:
+            dim = embeddings.shape[1]
+            arrays = {
+                EMBEDDINGS_FILE: np.lib.format.open_memmap(os.path.join(path, EMBEDDINGS_FILE) + ".tmp", mode="w+",
+                                                           dtype=np.float32, shape=(count, dim)),
+                CODES_FILE: np.lib.format.open_memmap(os.path.join(path, CODES_FILE) + ".tmp", mode="w+",
+                                                      dtype=np.int8, shape=(count, dim)),
+                SCALES_FILE: np.lib.format.open_memmap(os.path.join(path, SCALES_FILE) + ".tmp", mode="w+",
+                                                       dtype=np.float32, shape=(count,))
+            }
+        start, end = len(ids), len(ids) + len(page["ids"])
+        arrays[EMBEDDINGS_FILE][start:end] = embeddings
+        arrays[CODES_FILE][start:end], arrays[SCALES_FILE][start:end] = quantize(embeddings)
+        ids.extend(page["ids"])
+        documents.extend(page["documents"])
+        metadatas.extend(meta or {} for meta in page["metadatas"])
+    if not arrays:
+        return 0
+    for array in arrays.values():
+        array.flush()
+    arrays.clear()
+
+    docs_path = os.path.join(path, DOCS_FILE)
+    with open(docs_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"ids": ids, "documents": documents, "metadatas": metadatas}, f, ensure_ascii=False)
+    for name in (EMBEDDINGS_FILE, CODES_FILE, SCALES_FILE):
+        os.replace(os.path.join(path, name) + ".tmp", os.path.join(path, name))
+    os.replace(docs_path + ".tmp", docs_path)
+    return len(ids)
+
+
+def open_backend(kind, chroma_path, collection_name):
+    """
+    Backend by name: "chroma" (default), "numpy" or "int8" (the last two fall
+    back to Chroma if the index was never built)
+    """
+    if kind in ("numpy", "int8"):
+        if os.path.exists(os.path.join(NUMPY_INDEX_PATH, CODES_FILE if kind == "int8" else EMBEDDINGS_FILE)):
+            return QuantizedBackend(NUMPY_INDEX_PATH) if kind == "int8" else NumpyBackend(NUMPY_INDEX_PATH)
+        print(f"No NumPy index at {NUMPY_INDEX_PATH}; using Chroma. Run scrape_chroma.py to build it.")
+    return ChromaBackend(chroma_path, collection_name)
+
+
+if __name__ == "__main__":
+    count = build_numpy_index(
+        registry.get_chroma_client(registry.CHROMA_PATH).get_collection(
+            name="pib_titles", embedding_function=registry.get_embedding_function()
+        )
+    )
+    print(f"Exported {count} embeddings to {NUMPY_INDEX_PATH}")
@@ -1,14 +1,26 @@
 import os
 import requests
 from bs4 import BeautifulSoup
-import chromadb
-from chromadb.utils import embedding_functions
 import gc
 import csv
+import hashlib
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from llm_cache import invalidate_llm_cache
+from retrieval import build_numpy_index, iter_collection
+import registry
 
 # === CONFIGURATION ===
 CHROMA_PATH = "app/chroma_db"
 COLLECTION_NAME = "pib_titles"
+RSS_URLS = [
+    "https://www.pib.gov.in/RssMain.aspx?ModId=6&Lang=1&Regid=3",
+    "https://www.pib.gov.in/RssMain.aspx?ModId=8&Lang=1&Regid=3"
+]
+# ETag/Last-Modified per feed; kept next to the index so a fresh DB refetches everything
+FEED_STATE_FILE = os.path.join(CHROMA_PATH, "feed_state.json")
 
 def save_titles_to_csv(titles, filename="pib_titles.csv"):
     with open(filename, mode="w", newline='', encoding="utf-8") as csvfile:
@@ -18,53 +30,210 @@ def save_titles_to_csv(titles, filename="pib_titles.csv"):
             writer.writerow([title, source])
     print(f"Saved {len(titles)} titles to {filename}")
 
-def scrape_and_store():
-    RSS_URLS = [
-        "https://www.pib.gov.in/RssMain.aspx?ModId=6&Lang=1&Regid=3",
-        "https://www.pib.gov.in/RssMain.aspx?ModId=8&Lang=1&Regid=3"
-    ]
+STABLE_ID = re.compile(r"title_[0-9a-f]{40}")
+
+def title_id(title):
+    """Stable document id derived from the title text"""
+    return "title_" + hashlib.sha1(title.encode("utf-8")).hexdigest()
+
+def migrate_legacy_ids(collection, legacy_ids, batch_size=5000):
+    """
+    Re-key documents stored under the old positional title_{i} ids to title_id(title),
+    keeping their embeddings and metadata; the old ids are deleted only once copied.
+    Returns the number of documents under stable ids afterwards.
+    """
+    migrated = set()
+    for start in range(0, len(legacy_ids), batch_size):
+        page = collection.get(ids=legacy_ids[start:start + batch_size],
+                              include=["documents", "metadatas", "embeddings"])
+        rows = {}
+        for document, metadata, embedding in zip(page["documents"], page["metadatas"], page["embeddings"]):
+            if document:
+                rows[title_id(document)] = (document, metadata or {}, embedding)
+        if rows:
+            collection.upsert(
+                ids=list(rows),
+                documents=[document for document, _, _ in rows.values()],
+                metadatas=[metadata for _, metadata, _ in rows.values()],
+                embeddings=[embedding for _, _, embedding in rows.values()]
+            )
+            migrated.update(rows)
+    collection.delete(ids=legacy_ids)
+    return len(migrated)
+
+def load_feed_state():
+    if not os.path.exists(FEED_STATE_FILE):
+        return {}
+    try:
+        with open(FEED_STATE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_feed_state(state):
+    os.makedirs(os.path.dirname(FEED_STATE_FILE), exist_ok=True)
+    with open(FEED_STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+def fetch_feed(url, cached):
+    """
+    Conditional GET of one RSS feed. Returns (items, validators), where items is
+    None when the feed is unchanged (304) or could not be fetched.
+    """
+    headers = {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+    try:
+        response = requests.get(url, timeout=10, headers=headers)
+        if response.status_code == 304:
+            return None, cached
+        response.raise_for_status()
+        soup = BeautifulSoup(response.content, "xml")
+        items = []
+        for item in soup.find_all("item"):
+            title_tag = item.find("title")
+            link_tag = item.find("link")
+            if title_tag and title_tag.text and link_tag and link_tag.text:
+                items.append((title_tag.text.strip(), link_tag.text.strip()))
+        validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified")
+        }
+        return items, validators
+    except Exception as e:
+        print(f"Error fetching {url}: {e}")
+        return None, cached
 
-    all_titles_sources = set()
-    for url in RSS_URLS:
-        try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, "xml")
-            items = soup.find_all("item")
-            for item in items:
-                title_tag = item.find("title")
-                link_tag = item.find("link")
-                if title_tag and title_tag.text and link_tag and link_tag.text:
-                    all_titles_sources.add((title_tag.text.strip(), link_tag.text.strip()))
-        except Exception as e:
-            print(f"Error fetching {url}: {e}")
-
-    all_titles_sources = list(all_titles_sources)
-    print(f"Fetched {len(all_titles_sources)} unique titles.")
-
-    # Save to CSV
-    save_titles_to_csv(all_titles_sources, filename="data/pib_titles.csv")
-
-
-    # Prepare for ChromaDB
-    documents = [title for title, source in all_titles_sources]
-    metadatas = [{"source": source} for title, source in all_titles_sources]
-    ids = [f"title_{i}" for i in range(len(all_titles_sources))]
-
-    # Store in ChromaDB
-    client = chromadb.PersistentClient(path=CHROMA_PATH)
+def scrape_and_store(lexical_index=None):
+    """Ingest new PIB titles; a bm25.BM25Index passed in is extended with the same titles"""
+    feed_state = load_feed_state()
+    with ThreadPoolExecutor(max_workers=len(RSS_URLS)) as pool:
+        fetched = list(pool.map(lambda url: fetch_feed(url, feed_state.get(url, {})), RSS_URLS))
+
+    stats = {"added": 0, "skipped": 0, "updated": 0}
+    changed = [items for items, _ in fetched if items is not None]
+    if not changed:
+        print("All feeds unchanged since last run; nothing to ingest.")
+        return stats
+
+    # Dedupe by stable id (later feeds win on conflicting sources)
+    titles_by_id = {}
+    for items in changed:
+        for title, source in items:
+            titles_by_id[title_id(title)] = (title, source)
+    print(f"Fetched {len(titles_by_id)} unique titles.")
+
+    client = registry.get_chroma_client(CHROMA_PATH)
     collection = client.get_or_create_collection(
         name=COLLECTION_NAME,
-        embedding_function=embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name="all-MiniLM-L6-v2"
-        )
+        embedding_function=registry.get_embedding_function()
     )
-    collection.add(documents=documents, ids=ids, metadatas=metadatas)
 
-    # Explicitly close client
+    # Move documents stored under the old positional title_{i} ids to stable ids, including
+    # titles no longer in (or unchanged in) the feeds
+    legacy_ids = [doc_id for doc_id in collection.get(include=[])["ids"] if not STABLE_ID.fullmatch(doc_id)]
+    if legacy_ids:
+        migrated = migrate_legacy_ids(collection, legacy_ids)
+        print(f"Moved {len(legacy_ids)} documents with legacy positional ids to {migrated} stable ids.")
+
+    ids = list(titles_by_id)
+    existing = collection.get(ids=ids, include=["metadatas"])
+    existing_sources = {
+        doc_id: (meta or {}).get("source")
+        for doc_id, meta in zip(existing["ids"], existing["metadatas"])
+    }
+
+    new_ids = [doc_id for doc_id in ids if doc_id not in existing_sources]
+    moved_ids = [
+        doc_id for doc_id in ids
+        if doc_id in existing_sources and existing_sources[doc_id] != titles_by_id[doc_id][1]
+    ]
+
+    # Only unseen titles are embedded; a changed source is a metadata-only update
+    if new_ids:
+        collection.upsert(
+            ids=new_ids,
+            documents=[titles_by_id[doc_id][0] for doc_id in new_ids],
+            metadatas=[{"source": titles_by_id[doc_id][1]} for doc_id in new_ids]
+        )
+        if lexical_index is not None:
+            for doc_id in new_ids:
+                lexical_index.add(doc_id, titles_by_id[doc_id][0])
+    if moved_ids:
+        collection.update(
+            ids=moved_ids,
+            metadatas=[{"source": titles_by_id[doc_id][1]} for doc_id in moved_ids]
+        )
+    stats["added"] = len(new_ids)
+    stats["updated"] = len(moved_ids)
+    stats["skipped"] = len(ids) - len(new_ids) - len(moved_ids)
+
+    if new_ids or moved_ids or legacy_ids:
+        # Keep the CSV backup in sync with the whole collection, not just this run
+        save_titles_to_csv(
+            [
+                (doc, (meta or {}).get("source", ""))
+                for page in iter_collection(collection, ["documents", "metadatas"])
+                for doc, meta in zip(page["documents"], page["metadatas"])
+            ],
+            filename="data/pib_titles.csv"
+        )
+        # Refresh the memory-mapped float32 + int8 indexes read by retrieval.NumpyBackend / QuantizedBackend
+        build_numpy_index(collection)
+        # Cached verdicts were computed against the old evidence
+        invalidate_llm_cache()
+
+    save_feed_state({
+        url: validators for url, (_, validators) in zip(RSS_URLS, fetched) if validators
+    })
+    print(f"Ingestion complete. {stats['added']} added, {stats['skipped']} skipped, {stats['updated']} updated.")
+
+    # Explicitly release the collection handle
     del collection
-    del client
     gc.collect()
+    return stats
+
+_refresh_thread = None
+_refresh_stats = None
+_refresh_callbacks = []
+_refresh_lock = threading.Lock()
+
+def start_background_refresh(on_complete=None, lexical_index=None):
+    """
+    Run scrape_and_store in a daemon thread, at most once per process, so the app
+    can serve from the last persisted collection while fresh titles are ingested.
+    Each caller's on_complete(stats) is called after a successful refresh, right
+    away if the refresh already finished; lexical_index is passed through to
+    scrape_and_store by the call that starts the thread.
+    """
+    global _refresh_thread
+    with _refresh_lock:
+        finished = _refresh_stats
+        if on_complete is not None and finished is None:
+            _refresh_callbacks.append(on_complete)
+        if _refresh_thread is None:
+            def run():
+                global _refresh_stats
+                try:
+                    stats = scrape_and_store(lexical_index)
+                except Exception as e:
+                    print(f"Background refresh failed: {e}")
+                    return
+                with _refresh_lock:
+                    _refresh_stats = stats
+                    callbacks = list(_refresh_callbacks)
+                    _refresh_callbacks.clear()
+                for callback in callbacks:
+                    callback(stats)
+
+            _refresh_thread = threading.Thread(target=run, name="pib-refresh", daemon=True)
+            _refresh_thread.start()
+        thread = _refresh_thread
+    if on_complete is not None and finished is not None:
+        on_complete(finished)
+    return thread
 
 if __name__ == "__main__":
     scrape_and_store()
@@ -0,0 +1,23 @@
+import os
+import sys
+
+from dotenv import load_dotenv
+from streamlit.web import cli as stcli
+
+import registry
+from scrape_chroma import start_background_refresh
+
+load_dotenv()
+
+# Container entry point: runs the Streamlit server in this process, so work
+# started here is shared with app.py's sessions. The models are warmed up, and
+# on a fast boot (BACKGROUND_REFRESH=1) the PIB refresh is started, while
+# Streamlit starts listening rather than when the first session arrives.
+# Arguments are passed through to "streamlit run app.py".
+
+if __name__ == "__main__":
+    registry.start_warmup()
+    if os.getenv("BACKGROUND_REFRESH") == "1":
+        start_background_refresh()
+    sys.argv = ["streamlit", "run", "app.py", *sys.argv[1:]]
+    sys.exit(stcli.main())
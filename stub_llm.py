@@ -0,0 +1,188 @@
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Minimal OpenAI-compatible chat completions server standing in for Groq, so the
+# API server and benchmarks can run without network access or an API key.
+# Point an OpenAI client at http://127.0.0.1:<port>/v1. Requests with
+# "stream": true get the reply as server-sent chunks, one word at a time.
+# Groq's failure modes can be switched on for testing retries and hedging: a
+# requests-per-minute limit answered with 429 + Retry-After, random 503s and a
+# slow tail.
+
+CLAIM_RESPONSE = {
+    "verdict": "True",
+    "evidence": ["Stub evidence"],
+    "reasoning": ("Stub response: the claim matches the first evidence item. The names, dates and "
+                  "locations mentioned in the claim all appear in that evidence with the same values, "
+                  "and none of the other retrieved items contradicts it, so the claim is classified as True.")
+}
+ENTITY_RESPONSE = {
+    "verdict": "True",
+    "confidence": 0.9,
+    "reasoning": "Stub response: entity found in official records."
+}
+
+
+def stub_reply(prompt):
+    if "Batch Entity Verification Task" in prompt:
+        count = len(re.findall(r"\*\*Entity \d+:\*\*", prompt))
+        return json.dumps({"verdicts": [{"id": i, **ENTITY_RESPONSE} for i in range(1, count + 1)]})
+    if "Entity Verification Task" in prompt:
+        return json.dumps(ENTITY_RESPONSE)
+    return json.dumps(CLAIM_RESPONSE)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    jitter = 0.0
+    token_delay = 0.0  # per streamed chunk; non-streaming replies wait for all of them
+    requests_per_minute = 0  # 0 = no rate limit
+    error_rate = 0.0
+    slow_rate = 0.0
+    slow_latency = 0.0
+    _budget = None  # [requests left, last refill time], per server
+    _budget_lock = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _retry_after(self):
+        """
+        Seconds until the next request fits the per-minute limit, or None if this
+        one fits. The allowance refills continuously, up to one minute's worth.
+        """
+        if not self.requests_per_minute:
+            return None
+        rate = self.requests_per_minute / 60.0
+        with self._budget_lock:
+            now = time.monotonic()
+            level = min(self.requests_per_minute, self._budget[0] + (now - self._budget[1]) * rate)
+            self._budget[1] = now
+            if level < 1:
+                self._budget[0] = level
+                return (1 - level) / rate
+            self._budget[0] = level - 1
+            return None
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        prompt = request.get("messages", [{}])[-1].get("content", "")
+
+        retry_after = self._retry_after()
+        if retry_after is not None:
+            self._send_json(429, {"error": {"message": "Rate limit reached for requests", "type": "requests",
+                                            "code": "rate_limit_exceeded"}},
+                            {"Retry-After": f"{retry_after:.3f}"})
+            return
+        if random.random() < self.error_rate:
+            self._send_json(503, {"error": {"message": "Service unavailable", "type": "internal_server_error"}})
+            return
+        latency = self.slow_latency if random.random() < self.slow_rate else self.latency
+        time.sleep(max(latency + random.uniform(-self.jitter, self.jitter), 0))
+
+        content = stub_reply(prompt)
+        pieces = re.findall(r"\s*\S+", content)
+        if request.get("stream"):
+            self._stream(request, pieces)
+            return
+        time.sleep(self.token_delay * len(pieces))
+        prompt_tokens = len(prompt.split())
+        completion_tokens = len(content.split())
+        self._send_json(200, {
+            "id": "stub-completion",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
+
+
+    def _stream(self, request, pieces):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        for i, piece in enumerate(pieces + [None]):
+            if i:
+                time.sleep(self.token_delay)
+            chunk = {
+                "id": "stub-completion",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": piece} if piece is not None else {},
+                    "finish_reason": None if piece is not None else "stop"
+                }]
+            }
+            try:
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            except (BrokenPipeError, ConnectionResetError):
+                return  # the client closed the stream (e.g. a cancelled verification)
+        self.wfile.write(b"data: [DONE]\n\n")
+
+
+def start_stub_server(host="127.0.0.1", port=0, latency=0.0, jitter=0.0, token_delay=0.0,
+                      requests_per_minute=0, error_rate=0.0, slow_rate=0.0, slow_latency=0.0):
+    """Start the stub in a background thread; returns (server, base_url)"""
+    handler = type("ConfiguredStubHandler", (StubHandler,), {
+        "latency": latency, "jitter": jitter, "token_delay": token_delay,
+        "requests_per_minute": requests_per_minute, "error_rate": error_rate,
+        "slow_rate": slow_rate, "slow_latency": slow_latency,
+        "_budget": [requests_per_minute, time.monotonic()], "_budget_lock": threading.Lock()
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stub LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- jitter in seconds")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds per generated word")
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute before answering 429 (0 = no limit)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 503")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fraction of requests taking --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.host, args.port, args.latency, args.jitter, args.token_delay,
+                                         args.rpm, args.error_rate, args.slow_rate, args.slow_latency)
+    print(f"Stub LLM serving at {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
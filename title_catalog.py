@@ -0,0 +1,60 @@
+import bisect
+import csv
+import os
+
+from bm25 import TITLES_CSV, tokenize
+
+# In-memory view of the scraped PIB titles for the app's "All Claims" browser:
+# the titles in CSV order plus a token index, so searching and paging cost the
+# same however large the corpus grows. Built once per version of the CSV.
+
+
+class TitleCatalog:
+    def __init__(self, titles):
+        self.titles = titles
+        self.postings = {}  # token -> row numbers, ascending
+        for row, title in enumerate(titles):
+            for token in dict.fromkeys(tokenize(title)):
+                self.postings.setdefault(token, []).append(row)
+        self.vocabulary = sorted(self.postings)
+
+    def __len__(self):
+        return len(self.titles)
+
+    @classmethod
+    def from_csv(cls, path=TITLES_CSV):
+        if not os.path.exists(path):
+            return cls([])
+        with open(path, newline='', encoding="utf-8") as f:
+            return cls([row["title"] for row in csv.DictReader(f) if row.get("title")])
+
+    def _rows_with_prefix(self, prefix):
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        rows = set()
+        for token in self.vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            rows.update(self.postings[token])
+        return rows
+
+    def search(self, query):
+        """
+        Row numbers of the titles containing every word of query, in CSV order.
+        The last word also matches as a prefix, so partly typed words find titles.
+        A query without searchable words matches every title.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return range(len(self.titles))
+        *words, last = tokens
+        rows = self._rows_with_prefix(last)
+        # Intersect starting from the rarest word
+        for postings in sorted((self.postings.get(word, []) for word in set(words)), key=len):
+            if not rows:
+                break
+            rows.intersection_update(postings)
+        return sorted(rows)
+
+    def page(self, rows, page, page_size):
+        """Titles on the given 0-based page of rows"""
+        return [self.titles[row] for row in rows[page * page_size:(page + 1) * page_size]]